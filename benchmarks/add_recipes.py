@@ -0,0 +1,36 @@
+"""Measure how long ItemGraph.add_recipes takes for a large number
+of recipes, about half of which are alternative recipes that get
+skipped.
+
+Usage: python benchmarks/add_recipes.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import sys
+import time
+
+from crafterlib import Item, Recipe
+from crafterlib.graph import ItemGraph
+
+from synthetic import make_items, make_recipes
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe) for recipe in make_recipes(num_items, num_recipes)]
+    item_names = [item.name for item in items]
+
+    print(f"{num_recipes} recipes, {num_items} items")
+    for backend in ("networkx", "compact"):
+        start = time.perf_counter()
+        item_graph = ItemGraph(backend=backend)
+        item_graph.add_items(item_names)
+        summary = item_graph.add_recipes(recipes)
+        seconds = time.perf_counter() - start
+        print(f"  {backend:8}: {seconds:6.3f} s "
+              f"({summary.added} added, {len(summary.skipped)} skipped)")
+
+if __name__ == "__main__":
+    main()
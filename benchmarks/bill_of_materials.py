@@ -0,0 +1,71 @@
+"""Compare recursive amount queries through ItemGraph's bill of
+materials with multiplying weights along a networkx Dijkstra path.
+
+Usage: python benchmarks/bill_of_materials.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from crafterlib import Item, Recipe
+from crafterlib.graph import ItemGraph
+
+from synthetic import make_items, make_recipes
+
+NUM_QUERIES = 200
+
+def timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"  {label:36} {time.perf_counter() - start:8.3f} s")
+
+def dijkstra_amount(graph: nx.DiGraph, ingredient: str, product: str) -> float | None:
+    try:
+        path = nx.dijkstra_path(graph, ingredient, product)
+    except nx.NetworkXNoPath:
+        return None
+    amount = 1.0
+    for u, v in zip(path, path[1:]):
+        amount *= graph.edges[u, v]["weight"]
+    return amount
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe) for recipe in make_recipes(num_items, num_recipes)]
+    names = [item.name for item in items]
+
+    print(f"{num_recipes} recipes, {num_items} items, {NUM_QUERIES} queries each")
+    for backend in ("networkx", "compact"):
+        item_graph = ItemGraph(backend=backend)
+        item_graph.add_items(names)
+        item_graph.add_recipes(recipes)
+        graph = item_graph.graph
+        bill = item_graph.get_bill_of_materials()
+
+        rng = random.Random(0)
+        products = [rng.choice(names) for _ in range(NUM_QUERIES)]
+        pairs = [(rng.choice(bill.basic_items), product) for product in products]
+
+        print(f"{backend}:")
+        item_graph.clear_caches()
+        timed("build bill of materials", item_graph.get_bill_of_materials)
+        print(f"  {'stored amounts':36} {item_graph.get_bill_of_materials().matrix.nnz:8}")
+        # Loop variables are bound through default arguments.
+        timed("get_total_amount",
+              lambda item_graph=item_graph, pairs=pairs:
+                  [item_graph.get_total_amount(u, v) for u, v in pairs])
+        timed("nx.dijkstra_path amounts",
+              lambda graph=graph, pairs=pairs: [dijkstra_amount(graph, u, v) for u, v in pairs])
+        timed("get_basic_breakdown",
+              lambda item_graph=item_graph, products=products:
+                  [item_graph.get_basic_breakdown(v) for v in products])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time get_amount_craftable_with(recursive=True) on deep synthetic
+crafting trees, get_craftable_products against asking
+get_amount_craftable_with about every item, and the NumPy batch
+version against a loop over many inventories.
+
+Usage: python benchmarks/craftable.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from crafterlib import GameCraftingData, Item, Recipe
+from crafterlib.craftutils import (get_amount_craftable_with, get_amount_craftable_with_batch,
+                                   get_craftable_products)
+
+from synthetic import make_items, make_recipes
+
+NUM_QUERIES = 20
+NUM_BASIC = 200
+NUM_INVENTORIES = 1000
+NUM_BATCH_PRODUCTS = 20
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe)
+               for recipe in make_recipes(num_items, num_recipes, num_basic=NUM_BASIC)]
+    game_data = GameCraftingData("synthetic", items, recipes)
+    game_data.item_graph.get_reachability_index()
+
+    rng = random.Random(0)
+    names = [item.name for item in items]
+    inventory = {name: 1e12 for name in names[:NUM_BASIC]}
+    # Products from the upper half, which have deep crafting trees.
+    products = [rng.choice(names[num_items // 2:]) for _ in range(NUM_QUERIES)]
+
+    print(f"{num_recipes} recipes, {num_items} items, {NUM_QUERIES} queries")
+    start = time.perf_counter()
+    for product in products:
+        get_amount_craftable_with(game_data, inventory, product, recursive=True)
+    seconds = time.perf_counter() - start
+    depths = [game_data.item_graph.get_crafting_depth(product) for product in products]
+    print(f"  crafting depth {min(depths)}-{max(depths)}, "
+          f"{len(game_data.item_graph.get_ancestors(products[0]))} items in the first tree")
+    print(f"  recursive craftable:  {seconds / NUM_QUERIES:8.3f} s per query")
+
+    # A player inventory: a few basic and intermediate items.
+    held = {name: 64 for name in rng.sample(names[:NUM_BASIC], 40) + rng.sample(names, 20)}
+    start = time.perf_counter()
+    every_item = {}
+    for product in names:
+        amount = get_amount_craftable_with(game_data, held, product)
+        if amount > 0:
+            every_item[product] = amount
+    scalar_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    craftable = get_craftable_products(game_data, held)
+    discovery_seconds = time.perf_counter() - start
+    assert craftable == every_item
+    print(f"  {len(craftable)} products craftable from {len(held)} held items:")
+    print(f"    every item:              {scalar_seconds:8.4f} s")
+    print(f"    get_craftable_products:  {discovery_seconds:8.4f} s")
+    start = time.perf_counter()
+    craftable = get_craftable_products(game_data, held, recursive=True)
+    recursive_seconds = time.perf_counter() - start
+    print(f"    recursive, {len(craftable):4} products: {recursive_seconds:8.4f} s")
+
+    np_rng = np.random.default_rng(0)
+    inventories = np.zeros((NUM_INVENTORIES, len(game_data.item_names)))
+    inventories[:, :NUM_BASIC] = np_rng.integers(0, 10_000, size=(NUM_INVENTORIES, NUM_BASIC))
+    batch_products = products[:NUM_BATCH_PRODUCTS]
+    print(f"  {NUM_INVENTORIES} inventories x {len(batch_products)} products:")
+    for recursive in (False, True):
+        start = time.perf_counter()
+        get_amount_craftable_with_batch(game_data, inventories, batch_products, recursive)
+        batch_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for row in inventories:
+            ingredients = dict(zip(game_data.item_names[:NUM_BASIC], row[:NUM_BASIC]))
+            for product in batch_products:
+                get_amount_craftable_with(game_data, ingredients, product, recursive)
+        loop_seconds = time.perf_counter() - start
+        mode = "recursive" if recursive else "direct"
+        print(f"    {mode:9} loop:  {loop_seconds:8.3f} s")
+        print(f"    {mode:9} batch: {batch_seconds:8.3f} s")
+
+if __name__ == "__main__":
+    main()
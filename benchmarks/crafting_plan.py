@@ -0,0 +1,70 @@
+"""Time make_crafting_plan for many desired products at once on
+synthetic "modpack sized" game data, and keeping a plan up to date
+with IncrementalCraftingPlan while the inventory changes.
+
+Usage: python benchmarks/crafting_plan.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import sys
+import time
+
+from crafterlib import GameCraftingData, Item, Recipe
+from crafterlib.craftutils import IncrementalCraftingPlan, make_crafting_plan
+
+from synthetic import make_items, make_recipes
+
+NUM_TARGETS = [1, 10, 100, 500]
+NUM_EVENTS = 1000
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe) for recipe in make_recipes(num_items, num_recipes)]
+    game_data = GameCraftingData("synthetic", items, recipes)
+    start = time.perf_counter()
+    game_data.build_derived()
+    game_data.item_graph.get_condensation()
+    print(f"{num_recipes} recipes, {num_items} items")
+    print(f"  indexes (once):       {time.perf_counter() - start:8.3f} s")
+
+    rng = random.Random(0)
+    names = [item.name for item in items]
+    for num_targets in NUM_TARGETS:
+        # Products from the low end, like the tools and machines of
+        # early game progression, with moderately deep trees.
+        targets = {name: rng.randint(1, 64) for name in rng.sample(names[200:2000], num_targets)}
+        start = time.perf_counter()
+        plan = make_crafting_plan(game_data, targets)
+        seconds = time.perf_counter() - start
+        print(f"  {num_targets:4} products: {seconds * 1000:8.1f} ms, "
+              f"{len(plan.ingredients)} items in the plan")
+
+    # Inventory changes while the last plan is in progress.
+    plan = IncrementalCraftingPlan(game_data, targets)
+    items = list(plan.ingredients())
+    events = [{rng.choice(items): rng.randint(-16, 16)} for _ in range(NUM_EVENTS)]
+    start = time.perf_counter()
+    touched = 0
+    for delta in events:
+        for item in plan.update_inventory(delta):
+            plan.amounts(item)
+            touched += 1
+    update_seconds = time.perf_counter() - start
+    inventory = {}
+    start = time.perf_counter()
+    for delta in events[:NUM_EVENTS // 10]:
+        for item, amount in delta.items():
+            inventory[item] = max(inventory.get(item, 0) + amount, 0)
+        IncrementalCraftingPlan(game_data, targets, inventory).to_plan()
+    rebuild_seconds = (time.perf_counter() - start) * 10
+    print(f"  {NUM_EVENTS} inventory changes, {num_targets} products:")
+    print(f"    rebuilding the plan:  {rebuild_seconds * 1000 / NUM_EVENTS:8.3f} ms per change")
+    print(f"    update_inventory:     {update_seconds * 1000 / NUM_EVENTS:8.3f} ms per change, "
+          f"{touched / NUM_EVENTS:.1f} items touched")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare the networkx and compact ItemGraph backends: memory,
+build time and traversal time.
+
+Usage: python benchmarks/graph_backends.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from crafterlib import GameCraftingData, load_data_for_game
+from crafterlib.graph import ItemGraph
+
+from synthetic import write_game
+
+NUM_PATH_QUERIES = 50
+NUM_PATH_SOURCES = 5
+
+def build_graph(game_data: GameCraftingData, backend: str) -> ItemGraph:
+    item_graph = ItemGraph(backend=backend)
+    item_graph.add_items(item.name for item in game_data.items)
+    item_graph.add_recipes(game_data.recipes)
+    # Force the compact backend to build its CSR arrays.
+    item_graph.num_edges()
+    return item_graph
+
+def bench_backend(game_data: GameCraftingData, backend: str) -> None:
+    gc.collect()
+    tracemalloc.start()
+    item_graph = build_graph(game_data, backend)
+    gc.collect()
+    graph_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del item_graph
+
+    start = time.perf_counter()
+    item_graph = build_graph(game_data, backend)
+    build_seconds = time.perf_counter() - start
+
+    item_names = [item.name for item in game_data.items]
+    start = time.perf_counter()
+    for item in item_names:
+        item_graph.get_recipe_for(item)
+        item_graph.get_products_using(item)
+    neighbor_seconds = time.perf_counter() - start
+
+    rng = random.Random(0)
+    queries = [(rng.choice(item_names[:200]), rng.choice(item_names[-1000:]))
+               for _ in range(NUM_PATH_QUERIES)]
+    start = time.perf_counter()
+    for source, target in queries:
+        item_graph.shortest_path(source, target)
+    path_seconds = time.perf_counter() - start
+
+    # Many queries from a few sources, as when listing recipe chains.
+    sources = item_names[:NUM_PATH_SOURCES]
+    chain_queries = [(source, rng.choice(item_names[-1000:]))
+                     for source in sources for _ in range(NUM_PATH_QUERIES)]
+    start = time.perf_counter()
+    for source, _ in chain_queries:
+        item_graph.backend.shortest_path_tree(source)
+    uncached_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for source, target in chain_queries:
+        item_graph.shortest_path(source, target)
+    tree_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in item_names[-NUM_PATH_QUERIES:]:
+        item_graph.get_reverse_reachable_subgraph(item)
+    subgraph_seconds = time.perf_counter() - start
+
+    print(f"{backend}:")
+    print(f"  graph memory:             {graph_bytes / 2**20:8.1f} MiB")
+    print(f"  build:                    {build_seconds:8.3f} s")
+    print(f"  neighbors of all items:   {neighbor_seconds:8.3f} s")
+    print(f"  {NUM_PATH_QUERIES} shortest paths:       {path_seconds:8.3f} s")
+    num_chain_queries = len(chain_queries)
+    print(f"  {num_chain_queries} paths from {NUM_PATH_SOURCES} items:")
+    print(f"    one search per path:    {uncached_seconds:8.3f} s")
+    print(f"    cached path trees:      {tree_seconds:8.3f} s")
+    print(f"  {NUM_PATH_QUERIES} reverse subgraphs:    {subgraph_seconds:8.3f} s")
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_items = num_recipes // 2
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        write_game(root_dir, "synthetic", num_items, num_recipes)
+        print(f"{num_recipes} recipes, {num_items} items")
+        game_data = load_data_for_game("synthetic", root_dir)
+        for backend in ("networkx", "compact"):
+            bench_backend(game_data, backend)
+
+if __name__ == "__main__":
+    main()
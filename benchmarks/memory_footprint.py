@@ -0,0 +1,44 @@
+"""Measure how much memory a loaded GameCraftingData keeps alive.
+
+Usage: python benchmarks/memory_footprint.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import gc
+import sys
+import tempfile
+import tracemalloc
+
+from crafterlib import load_data_for_game
+
+from synthetic import write_game
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_items = num_recipes // 2
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        write_game(root_dir, "synthetic", num_items, num_recipes, num_recipe_files=4)
+
+        gc.collect()
+        tracemalloc.start()
+        game_data = load_data_for_game("synthetic", root_dir)
+        gc.collect()
+        data_bytes, _ = tracemalloc.get_traced_memory()
+
+        num_item_edges = game_data.item_graph.num_edges()
+        gc.collect()
+        total_bytes, _ = tracemalloc.get_traced_memory()
+
+        num_recipe_edges = game_data.recipe_graph.num_edges()
+        gc.collect()
+        recipe_graph_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{num_recipes} recipes, {num_items} items")
+    print(f"  items/recipes/grids: {data_bytes / 2**20:8.1f} MiB")
+    print(f"  with item graph:     {total_bytes / 2**20:8.1f} MiB, {num_item_edges} edges")
+    print(f"  with recipe graph:   {recipe_graph_bytes / 2**20:8.1f} MiB, {num_recipe_edges} edges")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Time make_optimal_crafting_plan on synthetic game data with
+alternative recipes, where the products depend on thousands of
+recipes.
+
+Usage: python benchmarks/optimal_plan.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import sys
+import time
+
+from crafterlib import GameCraftingData, Item, Recipe
+from crafterlib._internal.simplex import has_highs
+from crafterlib.craftutils import make_optimal_crafting_plan
+
+from synthetic import make_items, make_recipes
+
+NUM_TARGETS = [1, 10]
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe)
+               for recipe in make_recipes(num_items, num_recipes, num_basic=num_items // 10)]
+    game_data = GameCraftingData("synthetic", items, recipes, lazy=False)
+    print(f"{num_recipes} recipes, {num_items} items")
+
+    rng = random.Random(0)
+    names = [item.name for item in items]
+    inventory = {name: rng.randint(1, 64) for name in rng.sample(names, 50)}
+    solvers = ["simplex", "highs"] if has_highs() else ["simplex"]
+    for num_targets in NUM_TARGETS:
+        # Products from the high end, whose recipes reach down through
+        # most of the game.
+        targets = {name: rng.randint(1, 64) for name in rng.sample(names[-200:], num_targets)}
+        for solver in solvers:
+            for integer in (False, True):
+                for stock in ({}, inventory):
+                    start = time.perf_counter()
+                    plan = make_optimal_crafting_plan(game_data, targets, stock, integer=integer,
+                                                      solver=solver)
+                    seconds = time.perf_counter() - start
+                    print(f"  {num_targets:3} products, {solver:7}, "
+                          f"{'integer' if integer else 'linear ':7}, "
+                          f"{'inventory' if stock else 'no inventory':12}: "
+                          f"{seconds * 1000:8.1f} ms, "
+                          f"{len(plan.crafts)} recipes used, cost {plan.cost:.6g}"
+                          f"{'' if plan.optimal else ', search cut short'}")
+
+if __name__ == "__main__":
+    main()
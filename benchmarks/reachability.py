@@ -0,0 +1,64 @@
+"""Compare reachability queries through ItemGraph's reachability
+index with plain networkx traversals.
+
+Usage: python benchmarks/reachability.py [num_recipes]
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from crafterlib import Item, Recipe
+from crafterlib.graph import ItemGraph
+
+from synthetic import make_items, make_recipes
+
+NUM_QUERIES = 200
+
+def timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"  {label:36} {time.perf_counter() - start:8.3f} s")
+
+def main():
+    num_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_items = num_recipes // 2
+
+    items = [Item.from_dict(item) for item in make_items(num_items)]
+    recipes = [Recipe.from_dict(recipe) for recipe in make_recipes(num_items, num_recipes)]
+    rng = random.Random(0)
+    names = [item.name for item in items]
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(NUM_QUERIES)]
+    sample = [rng.choice(names) for _ in range(NUM_QUERIES)]
+
+    print(f"{num_recipes} recipes, {num_items} items, {NUM_QUERIES} queries each")
+    for backend in ("networkx", "compact"):
+        item_graph = ItemGraph(backend=backend)
+        item_graph.add_items(names)
+        item_graph.add_recipes(recipes)
+        graph = item_graph.graph
+
+        print(f"{backend}:")
+        timed("build index", item_graph.get_reachability_index)
+        # Loop variables are bound through default arguments.
+        timed("can_reach",
+              lambda item_graph=item_graph: [item_graph.can_reach(u, v) for u, v in pairs])
+        timed("nx.has_path", lambda graph=graph: [nx.has_path(graph, u, v) for u, v in pairs])
+        timed("get_descendants",
+              lambda item_graph=item_graph: [item_graph.get_descendants(u) for u in sample])
+        timed("nx.descendants", lambda graph=graph: [nx.descendants(graph, u) for u in sample])
+        timed("get_ancestors",
+              lambda item_graph=item_graph: [item_graph.get_ancestors(u) for u in sample])
+        timed("nx.ancestors", lambda graph=graph: [nx.ancestors(graph, u) for u in sample])
+        timed("reverse reachable subgraph (view)",
+              lambda item_graph=item_graph:
+                  [item_graph.get_reverse_reachable_subgraph(u, copy=False) for u in sample])
+        timed("reverse reachable subgraph (copy)",
+              lambda item_graph=item_graph:
+                  [item_graph.get_reverse_reachable_subgraph(u) for u in sample])
+
+if __name__ == "__main__":
+    main()
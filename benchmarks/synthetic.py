@@ -0,0 +1,76 @@
+"""Generate synthetic "modpack sized" game data for the benchmarks
+in this folder.
+
+The generated recipes form a layered DAG: every item is crafted from
+one to four items with a lower index, so there are long crafting
+chains and lots of shared intermediates, like in real modpacks.
+
+SPDX-License-Identifier: MIT
+"""
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+CATEGORIES = ["Crafting", "Smelting", "Brewing", "Assembling"]
+MACHINES = ["Crafting Table", "Furnace", "Brewing Stand", "Assembler"]
+
+def make_items(num_items: int) -> List[Dict[str, Any]]:
+    return [{"id": i, "name": f"Item {i}", "sources": ["Crafting"]} for i in range(num_items)]
+
+def make_recipes(num_items: int,
+                 num_recipes: int,
+                 num_basic: int = 200,
+                 seed: int = 0) -> List[Dict[str, Any]]:
+    """Make `num_recipes` recipes over `num_items` items.
+
+    The first `num_basic` items are never crafted. Every other item
+    gets a recipe; any remaining recipes are alternative recipes
+    for random items.
+    """
+    rng = random.Random(seed)
+    recipes = []
+    for recipe_id in range(num_recipes):
+        if num_basic + recipe_id < num_items:
+            product = num_basic + recipe_id
+        else:
+            product = rng.randrange(num_basic, num_items)
+        num_ingredients = rng.randint(1, 4)
+        ingredients = rng.sample(range(product), min(num_ingredients, product))
+        machine = rng.randrange(len(MACHINES))
+        recipes.append({
+            "id": recipe_id,
+            "category": CATEGORIES[machine],
+            "requirements": {MACHINES[machine]: 1},
+            "ingredients": {f"Item {i}": rng.randint(1, 4) for i in ingredients},
+            "products": {f"Item {product}": rng.choice([1, 1, 1, 2, 4])},
+        })
+    return recipes
+
+def write_game(root_dir: str | Path,
+               game: str,
+               num_items: int,
+               num_recipes: int,
+               num_recipe_files: int = 1,
+               seed: int = 0) -> Path:
+    """Write a synthetic game to `root_dir/games/<game>` and
+    return the path of its data folder.
+    """
+    data_dir = Path(root_dir) / "games" / game
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    with (data_dir / "items.json").open("w", encoding="utf-8") as fp:
+        json.dump(make_items(num_items), fp)
+
+    recipes = make_recipes(num_items, num_recipes, seed=seed)
+    recipe_files = []
+    for file_index in range(num_recipe_files):
+        filename = f"recipes_{file_index}.json"
+        with (data_dir / filename).open("w", encoding="utf-8") as fp:
+            json.dump(recipes[file_index::num_recipe_files], fp)
+        recipe_files.append(filename)
+
+    root = {"game": game, "item_files": ["items.json"], "recipe_files": recipe_files}
+    with (data_dir / "root.json").open("w", encoding="utf-8") as fp:
+        json.dump(root, fp)
+    return data_dir
@@ -0,0 +1,7 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+
+Private helpers shared by the public crafterlib modules.
+Nothing in this package is part of the public API.
+"""
@@ -0,0 +1,144 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+class LRUCache(Generic[K, V]):
+    """A thread-safe least-recently-used cache.
+
+    The cache can be bounded by number of entries, by approximate
+    size, or both. The size of a value is measured once, when it is
+    inserted, using the `sizeof` callback (every value counts as 1
+    if no callback is given). Whenever a bound is exceeded, the least
+    recently used entries are evicted until it is met again.
+
+    Attributes
+    ---
+    max_entries : int | None
+        Maximum number of entries, or None for no limit.
+    max_size : int | None
+        Maximum total size of all entries, or None for no limit.
+    """
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 sizeof: Optional[Callable[[V], int]] = None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[K, tuple[V, int]]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get the value stored for `key` and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def peek(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get the value stored for `key`, without marking it as
+        recently used or counting a hit or miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """Store `value` for `key`, evicting old entries if needed.
+
+        A value that is larger than `max_size` on its own is not stored.
+        """
+        size = self._sizeof(value) if self._sizeof is not None else 1
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._size -= old_entry[1]
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict()
+
+    def invalidate(self, key: K) -> bool:
+        """Remove `key` from the cache.
+
+        Return
+        ---
+        True if there was an entry for `key`.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._size -= entry[1]
+            return True
+
+    def invalidate_where(self, predicate: Callable[[K], bool]) -> int:
+        """Remove every entry whose key satisfies `predicate`.
+
+        Return
+        ---
+        The number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._size -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries. Statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def resize(self, max_entries: Optional[int] = None, max_size: Optional[int] = None) -> None:
+        """Change the bounds of the cache, evicting entries if needed."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_size = max_size
+            self._evict()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._size)
+
+    def _evict(self) -> None:
+        # Caller must hold self._lock.
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_size is not None and self._size > self.max_size)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
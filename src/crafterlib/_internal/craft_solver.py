@@ -0,0 +1,262 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import math
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from crafterlib import GameCraftingData, Recipe
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Tolerance for amounts that are a whole number of crafts
+# up to floating point error.
+EPSILON = 1e-9
+
+# Upper bound for the number of crafts searched by `max_crafts`, in case
+# a product needs none of the limited ingredients (e.g. zero amounts).
+MAX_CRAFTS = 2 ** 53
+
+def covering_recipe(game_data: GameCraftingData, item: str) -> Optional[Recipe]:
+    """Get the recipe `item` is crafted with in the item graph, or None
+    if it has none.
+    """
+    recipe_id = game_data.item_graph.get_recipe_id_for(item)
+    recipe = game_data.get_recipe_by_id(recipe_id) if recipe_id is not None else None
+    if recipe is None or item not in recipe.products:
+        # Not built by add_recipes, use the first recipe with
+        # ingredients, which is the one add_recipes would pick.
+        recipe = next((recipe for recipe in game_data.get_recipes_for_item(item)
+                       if recipe.ingredients), None)
+    return recipe
+
+class Explosion(NamedTuple):
+    """The result of `CraftSolver.explode`.
+
+    Attributes
+    ---
+    crafts : dict[str, int]
+        Number of crafts of every crafted item, in crafting order.
+    taken : dict[str, float]
+        Amount of every item taken from the inventory.
+    """
+    crafts: Dict[str, int]
+    taken: Dict[str, float]
+
+class CraftSolver:
+    """Works out how to craft a product from an inventory, crafting
+    missing intermediate items as needed.
+
+    Every item is crafted with its recipe in the item graph, in whole
+    crafts. The items the product is made from are prepared once per
+    solver, in reverse crafting order, so each of them is handled exactly
+    once per `explode`, after the total demand of all its consumers is
+    known. This way ingredients shared between branches are accounted
+    for, and deep chains don't recurse.
+
+    An item on a cycle (e.g. Gold Nugget <-> Gold Ingot) is only crafted
+    for demand from outside its cycle; demand from inside the cycle has
+    to be met from the inventory, so the solver never loops.
+
+    Parameters
+    ---
+    game_data : GameCraftingData
+        The game.
+    product : str
+        The item to craft.
+    inventory : Mapping[str, float] | None
+        Available amount of every item. The product itself is only
+        taken from the inventory where it is needed as an ingredient.
+        Not needed for `max_crafts_batch`.
+    """
+
+    def __init__(self,
+                 game_data: GameCraftingData,
+                 product: str,
+                 inventory: Optional[Mapping[str, float]] = None):
+        self.product = product
+        self.inventory = inventory if inventory is not None else {}
+        item_graph = game_data.item_graph
+
+        # Consumers come before their ingredients.
+        order = [product] if item_graph.has_item(product) else []
+        order.extend(reversed([item for item in item_graph.get_ancestors(product) if item != product]))
+        self.order: List[str] = order
+        self._position = {item: k for k, item in enumerate(order)}
+
+        # (amount per craft, ingredients per craft) of every craftable item.
+        self._recipes: Dict[str, Tuple[float, List[Tuple[str, float]]]] = {}
+        for item in order:
+            recipe = covering_recipe(game_data, item)
+            if recipe is not None:
+                self._recipes[item] = (recipe.products[item], list(recipe.ingredients.items()))
+
+    def amount_per_craft(self) -> float:
+        """Amount of the product made by one craft, 0 if it can't be crafted."""
+        recipe = self._recipes.get(self.product)
+        return recipe[0] if recipe is not None else 0
+
+    def explode(self, crafts: int) -> Optional[Explosion]:
+        """Work out what it takes to craft the product `crafts` times.
+
+        Return
+        ---
+        An Explosion, or None if the inventory isn't enough.
+        """
+        inventory = self.inventory
+        recipes = self._recipes
+        position = self._position
+        product = self.product
+        demand: Dict[str, float] = {}
+        done: Dict[str, int] = {}
+        taken: Dict[str, float] = {}
+
+        def take(item: str, amount: float) -> bool:
+            left = inventory.get(item, 0) - taken.get(item, 0)
+            if amount > left + EPSILON:
+                return False
+            taken[item] = taken.get(item, 0) + amount
+            return True
+
+        for k, item in enumerate(self.order):
+            if item == product:
+                item_crafts = crafts
+            else:
+                need = demand.get(item, 0)
+                if need <= 0:
+                    continue
+                have = inventory.get(item, 0) - taken.get(item, 0)
+                if have > 0:
+                    used = min(have, need)
+                    taken[item] = taken.get(item, 0) + used
+                    need -= used
+                if need <= EPSILON:
+                    continue
+                recipe = recipes.get(item)
+                if recipe is None:
+                    return None
+                item_crafts = math.ceil(need / recipe[0] - EPSILON)
+            if not item_crafts:
+                continue
+            done[item] = item_crafts
+
+            for ingredient, amount in recipes[item][1]:
+                amount *= item_crafts
+                if position[ingredient] > k:
+                    demand[ingredient] = demand.get(ingredient, 0) + amount
+                elif not take(ingredient, amount):
+                    # Needed from inside a cycle, which only the
+                    # inventory can provide.
+                    return None
+
+        crafting_order = {item: done[item] for item in reversed(self.order) if item in done}
+        return Explosion(crafting_order, taken)
+
+    def can_craft(self, crafts: int) -> bool:
+        """Check whether the product can be crafted `crafts` times."""
+        return self.explode(crafts) is not None
+
+    def max_crafts(self) -> int:
+        """Get the largest number of times the product can be crafted,
+        by doubling and then bisecting the number of crafts.
+        """
+        if self.product not in self._recipes or not self.can_craft(1):
+            return 0
+        low, high = 1, 2
+        while high <= MAX_CRAFTS and self.can_craft(high):
+            low, high = high, high * 2
+        if high > MAX_CRAFTS:
+            return low
+        # `low` crafts are possible, `high` are not.
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.can_craft(middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def _explode_batch(self, crafts, columns) -> "np.ndarray":
+        """`explode` for many inventories at once, with NumPy.
+
+        `crafts` holds the number of crafts to check for every inventory,
+        and `columns(item)` returns the amounts of `item` in all of them.
+        Return whether each inventory is enough.
+        """
+        recipes = self._recipes
+        position = self._position
+        product = self.product
+        demand: Dict[str, "np.ndarray"] = {}
+        taken: Dict[str, "np.ndarray"] = {}
+        feasible = np.ones(len(crafts), dtype=bool)
+
+        for k, item in enumerate(self.order):
+            if item == product:
+                item_crafts = crafts
+            else:
+                need = demand.get(item)
+                if need is None:
+                    continue
+                have = columns(item) - taken.get(item, 0)
+                used = np.minimum(np.maximum(have, 0), need)
+                taken[item] = taken.get(item, 0) + used
+                need = need - used
+                recipe = recipes.get(item)
+                if recipe is None:
+                    feasible &= need <= EPSILON
+                    continue
+                item_crafts = np.where(need > EPSILON, np.ceil(need / recipe[0] - EPSILON), 0)
+
+            for ingredient, amount in recipes[item][1]:
+                amount = amount * item_crafts
+                if position[ingredient] > k:
+                    demand[ingredient] = demand.get(ingredient, 0) + amount
+                else:
+                    left = columns(ingredient) - taken.get(ingredient, 0)
+                    feasible &= amount <= left + EPSILON
+                    taken[ingredient] = taken.get(ingredient, 0) + amount
+        return feasible
+
+    def max_crafts_batch(self, inventories: "np.ndarray", item_index: Mapping[str, int]) -> "np.ndarray":
+        """`max_crafts` for every row of `inventories`, a NumPy array of
+        inventories x items, whose columns are numbered by `item_index`.
+
+        All inventories are searched together, so every step is one
+        NumPy operation over all of them instead of a Python loop.
+        """
+        num_inventories = len(inventories)
+        zeros = np.zeros(num_inventories)
+
+        def columns(item: str) -> "np.ndarray":
+            col = item_index.get(item)
+            return inventories[:, col] if col is not None else zeros
+
+        low = np.zeros(num_inventories, dtype=np.int64)
+        if self.product not in self._recipes or not num_inventories:
+            return low
+        possible = self._explode_batch(np.ones(num_inventories, dtype=np.int64), columns)
+        low[possible] = 1
+        high = low * 2
+
+        # Doubling, the same steps as `max_crafts` takes for every inventory.
+        capped = np.zeros(num_inventories, dtype=bool)
+        doubling = possible
+        while doubling.any():
+            grow = doubling & self._explode_batch(high, columns)
+            low = np.where(grow, high, low)
+            high = np.where(grow, high * 2, high)
+            capped |= grow & (high > MAX_CRAFTS)
+            doubling = grow & (high <= MAX_CRAFTS)
+
+        # Bisecting.
+        searching = possible & ~capped & (high - low > 1)
+        while searching.any():
+            middle = (low + high) // 2
+            can = self._explode_batch(middle, columns)
+            low = np.where(searching & can, middle, low)
+            high = np.where(searching & ~can, middle, high)
+            searching &= high - low > 1
+        return low
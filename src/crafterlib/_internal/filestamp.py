@@ -0,0 +1,23 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import hashlib
+import zipfile
+from pathlib import Path
+
+def file_stamp(path) -> bytes:
+    """Return a short byte string that changes whenever `path` changes.
+
+    Regular files are stamped by size and modification time, which
+    only needs a `stat` call. Zip archive members are stamped by the
+    size and CRC stored in the archive's directory. Anything else is
+    stamped by a hash of its content.
+    """
+    if isinstance(path, Path):
+        st = path.stat()
+        return f"{st.st_size}:{st.st_mtime_ns}".encode()
+    if isinstance(path, zipfile.Path):
+        info = path.root.getinfo(path.at)
+        return f"{info.file_size}:{info.CRC}".encode()
+    return hashlib.sha256(path.read_bytes()).digest()
@@ -0,0 +1,105 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = " \t\n\r,]"
+
+def iter_json_array(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks of `chunk_size` characters, and each
+    element is decoded as soon as it is complete, so memory use is
+    proportional to the largest element rather than the whole file.
+
+    Raises
+    ---
+    ValueError if the document is not a single JSON array
+    (json.JSONDecodeError is a subclass of ValueError).
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more() -> bool:
+        # Drop everything that has been consumed and append a chunk.
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek() -> str:
+        # Skip whitespace and return the next character, or "" at EOF.
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                return ""
+
+    if peek() != "[":
+        raise ValueError("Top-level JSON value must be an array")
+    pos += 1
+
+    if peek() == "]":
+        pos += 1
+    else:
+        while True:
+            peek()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # The element may just be cut off at the end of
+                    # the buffer. Only give up once the file is exhausted.
+                    if read_more():
+                        continue
+                    raise
+                # A number may continue in the next chunk, e.g. "12" + "34"
+                # or "1" + ".5". It is only complete once it is followed
+                # by a delimiter.
+                if (isinstance(value, (int, float))
+                        and (end == len(buffer) or buffer[end] not in _DELIMITERS)
+                        and read_more()):
+                    continue
+                break
+            pos = end
+            yield value
+
+            separator = peek()
+            pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {separator!r}")
+
+    if peek() != "":
+        raise ValueError("Extra data after top-level JSON array")
+
+def iter_json_lines(fp: TextIO) -> Iterator[Any]:
+    """Yield the values of a JSON Lines file, one per line.
+
+    Blank lines are ignored.
+    """
+    for line_number, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON on line {line_number}: {exc}") from exc
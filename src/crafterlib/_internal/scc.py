@@ -0,0 +1,78 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from array import array
+from typing import Sequence, Tuple
+
+def strongly_connected_components(num_nodes: int,
+                                  indptr: Sequence[int],
+                                  indices: Sequence[int]) -> Tuple[array, int]:
+    """Find the strongly connected components of a graph given in CSR
+    form, with Tarjan's algorithm.
+
+    The traversal uses an explicit stack, so it works on graphs with
+    long chains that would exceed Python's recursion limit.
+
+    Return
+    ---
+    `(component, num_components)`, where `component[v]` is the
+    component number of node `v`. Components are numbered in
+    topological order: for every edge `u -> v` between different
+    components, `component[u] < component[v]`.
+    """
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    component = array("i", [-1]) * num_nodes
+    stack = []
+    counter = 0
+    found = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, indptr[root])]
+
+        while work:
+            node, k = work[-1]
+            end = indptr[node + 1]
+            while k < end:
+                other = indices[k]
+                k += 1
+                if index[other] == -1:
+                    # Descend into `other`, continue with edge `k` later.
+                    work[-1] = (node, k)
+                    index[other] = low[other] = counter
+                    counter += 1
+                    stack.append(other)
+                    on_stack[other] = True
+                    work.append((other, indptr[other]))
+                    break
+                if on_stack[other] and index[other] < low[node]:
+                    low[node] = index[other]
+            else:
+                # All edges of `node` are done.
+                work.pop()
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = found
+                        if member == node:
+                            break
+                    found += 1
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+    # Tarjan's algorithm finds components in reverse topological order.
+    last = found - 1
+    for node in range(num_nodes):
+        component[node] = last - component[node]
+    return component, found
@@ -0,0 +1,670 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import itertools
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from crafterlib.sparse import CSRMatrix
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Tolerance for bound and reduced cost violations.
+TOLERANCE = 1e-9
+
+# Number of pivots in a row without progress after which
+# `DualSimplex.solve` switches to Bland's rule.
+MAX_STALLED_PIVOTS = 50
+
+# Number of rounds `solve_covering_lp` spends on lowering the prices of
+# rows it hasn't looked at yet, before it adds the columns that still
+# seem to pay off.
+MAX_PRICE_REPAIRS = 100
+
+# Number of branch and bound nodes `solve_covering_lp` looks at, and
+# seconds it spends on them, before it settles for the best
+# whole-number solution found so far.
+MAX_BRANCH_NODES = 2_000
+MAX_BRANCH_SECONDS = 0.25
+
+# Number of rounds `solve_covering_lp` spends on making up for the
+# shortfalls of a rounded up solution before it gives up on it.
+MAX_ROUNDING_STEPS = 1_000
+
+class CoveringSolution(NamedTuple):
+    """The result of `solve_covering_lp`.
+
+    Attributes
+    ---
+    x : np.ndarray | None
+        The solution, None if there is none, or if the search for a
+        whole-number solution was cut short before it found one.
+    solver : str
+        The solver used, "simplex" or "highs".
+    optimal : bool
+        False if the search for a whole-number solution was cut short,
+        so `x` may not be the cheapest one.
+    """
+    x: Optional["np.ndarray"]
+    solver: str
+    optimal: bool
+
+class DualSimplex:
+    """Dense bounded-variable dual simplex for covering problems
+
+        minimize c @ x  subject to  A @ x >= b,  lower <= x <= upper
+
+    with `c >= 0`. Every row gets a surplus variable `s = A @ x - b >= 0`.
+    Starting from the basis of all surplus variables, with every `x` at
+    its lower bound, the reduced costs are `c`, so the basis is dual
+    feasible from the start and no first phase is needed. Every pivot
+    then fixes the basic variable that violates its bounds the most.
+
+    A better starting basis can be given as `basis`, e.g. the recipes
+    that are cheapest without an inventory, which then often needs only
+    a few pivots. It is only used if it is dual feasible too.
+
+    Changing the bounds of a variable keeps the basis dual feasible, so
+    after `set_bounds` the next `solve` continues from the current basis
+    instead of starting over, which is what makes branch and bound cheap.
+    Rows and columns can be added to a solved problem the same way, see
+    `add_rows` and `add_columns`.
+
+    Parameters
+    ---
+    c : np.ndarray
+        Cost of every variable, all >= 0.
+    A : np.ndarray
+        Rows x variables constraint matrix.
+    b : np.ndarray
+        Right hand side of every row.
+    lower : np.ndarray
+        Lower bound of every variable, finite.
+    upper : np.ndarray
+        Upper bound of every variable, may be inf.
+    basis : np.ndarray | None
+        The basic variable of every row, numbered like the variables,
+        followed by the surplus variables.
+    """
+
+    def __init__(self, c, A, b, lower, upper, basis=None):
+        num_rows, num_vars = A.shape
+        self.num_vars = num_vars
+        # The variables are x followed by the surplus of every row.
+        self.cost = np.concatenate([c, np.zeros(num_rows)])
+        self.lower = np.concatenate([lower, np.zeros(num_rows)])
+        self.upper = np.concatenate([upper, np.full(num_rows, math.inf)])
+        if basis is None or not self._start(np.concatenate([A, -np.eye(num_rows)], axis=1), b, basis):
+            # Tableau B^-1 [A, -I] for the basis B = -I, and its reduced costs.
+            self.tableau = np.concatenate([-A, np.eye(num_rows)], axis=1)
+            self.reduced = self.cost.copy()
+            self.basis = np.arange(num_vars, num_vars + num_rows)
+            self.value = self.lower.copy()
+            self.value[self.basis] = A @ lower - b
+
+    def _start(self, constraints, b, basis) -> bool:
+        """Start from `basis`, if it is dual feasible."""
+        basis = np.array(basis, dtype=np.intp)
+        value = self.lower.copy()
+        value[basis] = 0
+        try:
+            solved = np.linalg.solve(constraints[:, basis],
+                                     np.column_stack([constraints, b - constraints @ value]))
+        except np.linalg.LinAlgError:
+            return False
+        tableau = solved[:, :-1]
+        reduced = self.cost - self.cost[basis] @ tableau
+        reduced[basis] = 0
+        if (reduced < -TOLERANCE).any():
+            return False
+        value[basis] = solved[:, -1]
+        self.tableau = np.ascontiguousarray(tableau)
+        self.reduced, self.basis, self.value = reduced, basis, value
+        return True
+
+    def copy(self) -> "DualSimplex":
+        other = object.__new__(DualSimplex)
+        other.num_vars = self.num_vars
+        for name in ("cost", "lower", "upper", "tableau", "reduced", "basis", "value"):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def set_bounds(self, var: int, lower: float, upper: float) -> None:
+        """Change the bounds of a variable."""
+        self.lower[var] = lower
+        self.upper[var] = upper
+
+    def solve(self) -> bool:
+        """Pivot until no basic variable violates its bounds.
+
+        Return
+        ---
+        False if the problem has no solution, else True. Then `ray` is
+        a price for every row such that a new column `a` of A can only
+        make the problem solvable if `ray @ a > 0`.
+        """
+        tableau, reduced, basis, value = self.tableau, self.reduced, self.basis, self.value
+        lower, upper = self.lower, self.upper
+        is_basic = np.zeros(len(value), dtype=bool)
+        is_basic[basis] = True
+        max_pivots = 50 * (tableau.shape[0] + tableau.shape[1])
+        # Pivots in a row that didn't change the objective. After too
+        # many, the pivots are picked by Bland's rule, which can't cycle.
+        stalled = 0
+
+        for pivots in itertools.count():
+            basic_value = value[basis]
+            below = lower[basis] - basic_value
+            above = basic_value - upper[basis]
+            violation = np.maximum(below, above)
+            if not len(violation) or violation.max() <= TOLERANCE:
+                return True
+            if pivots == max_pivots:
+                raise RuntimeError("The simplex method didn't converge")
+            bland = stalled > MAX_STALLED_PIVOTS
+            if bland:
+                violated = np.flatnonzero(violation > TOLERANCE)
+                row = int(violated[np.argmin(basis[violated])])
+            else:
+                row = int(np.argmax(violation))
+
+            # The leaving variable goes to the bound it violates, so the
+            # entering variable has to move it in the right direction.
+            leaving = basis[row]
+            to_lower = below[row] > above[row]
+            pivot_row = tableau[row]
+            # Nonbasic variables sit exactly at one of their bounds. Fixed
+            # variables can't move, so they never enter the basis.
+            movable = ~is_basic & (lower < upper)
+            at_upper = movable & (value == upper)
+            at_lower = movable & ~at_upper
+            if to_lower:
+                eligible = (at_lower & (pivot_row < -TOLERANCE)) | (at_upper & (pivot_row > TOLERANCE))
+            else:
+                eligible = (at_lower & (pivot_row > TOLERANCE)) | (at_upper & (pivot_row < -TOLERANCE))
+            if not eligible.any():
+                # Row `row` of B^-1 proves it: a new column `a` could
+                # only fix it if `ray @ a > 0`.
+                self.ray = pivot_row[self.num_vars:] * (1 if to_lower else -1)
+                return False
+            candidates = np.flatnonzero(eligible)
+            ratios = np.abs(reduced[candidates]) / np.abs(pivot_row[candidates])
+            ties = candidates[ratios <= ratios.min() + TOLERANCE]
+            if bland:
+                entering = int(ties[0])
+            else:
+                # Among ties, the largest pivot is the most stable.
+                entering = int(ties[np.argmax(np.abs(pivot_row[ties]))])
+            stalled = stalled + 1 if ratios.min() <= TOLERANCE else 0
+
+            bound = lower[leaving] if to_lower else upper[leaving]
+            step = (value[leaving] - bound) / pivot_row[entering]
+            value[basis] -= tableau[:, entering] * step
+            value[entering] += step
+            value[leaving] = bound
+
+            self._pivot(row, entering)
+            is_basic[leaving] = False
+            is_basic[entering] = True
+
+    def solve_primal(self) -> None:
+        """Pivot until no nonbasic variable pays off, for a basis that
+        no longer is dual feasible, e.g. after `add_columns`, while no
+        basic variable violates its bounds.
+        """
+        tableau, reduced, basis, value = self.tableau, self.reduced, self.basis, self.value
+        lower, upper = self.lower, self.upper
+        is_basic = np.zeros(len(value), dtype=bool)
+        is_basic[basis] = True
+        max_pivots = 50 * (tableau.shape[0] + tableau.shape[1])
+        stalled = 0
+
+        for pivots in itertools.count():
+            movable = ~is_basic & (lower < upper)
+            at_upper = movable & (value == upper)
+            at_lower = movable & ~at_upper
+            gain = np.where(at_lower, -reduced, 0) + np.where(at_upper, reduced, 0)
+            if not len(gain) or gain.max() <= TOLERANCE:
+                return
+            if pivots == max_pivots:
+                raise RuntimeError("The simplex method didn't converge")
+            bland = stalled > MAX_STALLED_PIVOTS
+            entering = int(np.flatnonzero(gain > TOLERANCE)[0] if bland else np.argmax(gain))
+
+            # Move the entering variable away from its bound until a
+            # basic variable, or the entering variable itself, reaches
+            # one of its bounds.
+            direction = 1 if at_lower[entering] else -1
+            change = -tableau[:, entering] * direction
+            basic_value = value[basis]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                limits = np.where(change < -TOLERANCE, (basic_value - lower[basis]) / -change,
+                                  np.where(change > TOLERANCE, (upper[basis] - basic_value) / change,
+                                           math.inf))
+            limits = np.maximum(limits, 0)
+            step = upper[entering] - lower[entering]
+            row = -1
+            if len(limits) and limits.min() < step:
+                step = limits.min()
+                ties = np.flatnonzero(limits <= step + TOLERANCE)
+                row = int(ties[np.argmin(basis[ties])] if bland else ties[np.argmax(np.abs(change[ties]))])
+            if step == math.inf:
+                raise RuntimeError("The problem is unbounded")
+            stalled = stalled + 1 if step <= TOLERANCE else 0
+
+            value[basis] += change * step
+            if row < 0:
+                # The entering variable reaches its other bound first.
+                value[entering] = upper[entering] if direction > 0 else lower[entering]
+                continue
+            leaving = basis[row]
+            value[entering] += direction * step
+            value[leaving] = lower[leaving] if change[row] < 0 else upper[leaving]
+            self._pivot(row, entering)
+            is_basic[leaving] = False
+            is_basic[entering] = True
+
+    def _pivot(self, row: int, entering: int) -> None:
+        tableau, reduced = self.tableau, self.reduced
+        pivot_row = tableau[row]
+        pivot_row /= pivot_row[entering]
+        column = tableau[:, entering].copy()
+        column[row] = 0
+        # Most rows don't change, the tableau of a crafting problem is
+        # mostly zeros.
+        changed = np.flatnonzero(column)
+        tableau[changed] -= np.outer(column[changed], pivot_row)
+        reduced -= reduced[entering] * pivot_row
+        reduced[entering] = 0
+        self.basis[row] = entering
+
+    def add_rows(self, b) -> None:
+        """Add rows that none of the variables is in yet, with right
+        hand side `b`, for `add_columns` to fill. Their surplus
+        variables become basic.
+        """
+        num_rows, num_cols = self.tableau.shape
+        num_new = len(b)
+        self.tableau = np.block([[self.tableau, np.zeros((num_rows, num_new))],
+                                 [np.zeros((num_new, num_cols)), np.eye(num_new)]])
+        self.cost = np.concatenate([self.cost, np.zeros(num_new)])
+        self.lower = np.concatenate([self.lower, np.zeros(num_new)])
+        self.upper = np.concatenate([self.upper, np.full(num_new, math.inf)])
+        self.reduced = np.concatenate([self.reduced, np.zeros(num_new)])
+        self.value = np.concatenate([self.value, -np.asarray(b, dtype=float)])
+        self.basis = np.concatenate([self.basis, np.arange(num_cols, num_cols + num_new)])
+
+    def add_columns(self, A, c, upper) -> None:
+        """Add variables with the columns `A` of the constraint matrix,
+        costs `c` and upper bounds `upper`, at their lower bound of 0.
+        They are numbered after the other variables, before the
+        surplus variables. Call `solve_primal` then, as they may pay
+        off.
+        """
+        num_vars, num_new = self.num_vars, len(c)
+        # The columns of the surplus variables are -B^-1.
+        columns = -self.tableau[:, num_vars:] @ A
+        reduced = c - self.cost[self.basis] @ columns
+
+        def insert(values, new):
+            return np.concatenate([values[:num_vars], new, values[num_vars:]])
+
+        self.tableau = np.ascontiguousarray(insert(self.tableau.T, columns.T).T)
+        self.cost = insert(self.cost, c)
+        self.lower = insert(self.lower, np.zeros(num_new))
+        self.upper = insert(self.upper, upper)
+        self.reduced = insert(self.reduced, reduced)
+        self.value = insert(self.value, np.zeros(num_new))
+        self.basis[self.basis >= num_vars] += num_new
+        self.num_vars += num_new
+
+    def solution(self) -> "np.ndarray":
+        return self.value[:self.num_vars].copy()
+
+    def duals(self) -> "np.ndarray":
+        """Get the dual price of every row, the reduced costs of the
+        surplus variables.
+        """
+        return self.reduced[self.num_vars:].copy()
+
+class _Restricted(NamedTuple):
+    """The problem restricted to the columns `cols` and rows `rows`,
+    in the order of the variables and rows of `lp`.
+    """
+    cols: "np.ndarray"
+    rows: "np.ndarray"
+    lp: DualSimplex
+
+class _ColumnGeneration:
+    """Solves the problem of `solve_covering_lp` with some of the
+    columns only, and uses the dual prices of the rows to find the
+    columns that would make the solution cheaper, or a solution
+    possible at all. Rows that none of the columns touch are left out
+    too, as long as they hold with x = 0.
+    """
+
+    def __init__(self, c, columns: CSRMatrix, b, upper, guess, price_guess):
+        self.c, self.columns, self.b, self.upper = c, columns, b, upper
+        self.guess, self.price_guess = guess, price_guess
+        self.num_vars, self.num_rows = columns.shape
+        self.indptr, self.indices, self.data = columns.to_numpy()
+        self.entry_col = np.repeat(np.arange(self.num_vars), np.diff(self.indptr))
+
+    def _with_guesses(self, cols, present) -> "np.ndarray":
+        """Get `cols`, along with the columns guessed to make their
+        ingredients, without the columns in `present`.
+        """
+        guess = self.guess
+        added = present.copy()
+        pending = list(cols)
+        while pending:
+            col = pending.pop()
+            if not added[col]:
+                added[col] = True
+                if guess is not None:
+                    pending.extend(guess[row] for row, amount in self.columns.row(col)
+                                   if amount < 0 and guess[row] >= 0)
+        return np.flatnonzero(added & ~present)
+
+    def _matrix(self, rows, cols) -> "np.ndarray":
+        """Get the dense part of A at `rows` and `cols`."""
+        indices, data, entry_col = self.indices, self.data, self.entry_col
+        row_position = np.full(self.num_rows, -1)
+        row_position[rows] = np.arange(len(rows))
+        col_position = np.full(self.num_vars, -1)
+        col_position[cols] = np.arange(len(cols))
+        entries = (col_position[entry_col] >= 0) & (row_position[indices] >= 0)
+        A = np.zeros((len(rows), len(cols)))
+        np.add.at(A, (row_position[indices[entries]], col_position[entry_col[entries]]), data[entries])
+        return A
+
+    def _touched(self, cols) -> "np.ndarray":
+        """Get which rows the columns `cols` are in."""
+        in_cols = np.zeros(self.num_vars, dtype=bool)
+        in_cols[cols] = True
+        touched = np.zeros(self.num_rows, dtype=bool)
+        touched[self.indices[in_cols[self.entry_col]]] = True
+        return touched
+
+    def root(self) -> _Restricted:
+        """Build the problem restricted to the guessed columns, or to
+        all columns without a guess.
+        """
+        if self.guess is None:
+            cols = np.arange(self.num_vars)
+        else:
+            guess = self.guess
+            cols = self._with_guesses([guess[row] for row in np.flatnonzero(self.b > TOLERANCE)
+                                       if guess[row] >= 0],
+                                      np.zeros(self.num_vars, dtype=bool))
+        return self.build(cols, np.zeros(len(cols)), self.upper[cols])
+
+    def build(self, cols, lower, upper) -> _Restricted:
+        """Build the problem restricted to the columns `cols`, with
+        bounds `lower` and `upper` on them.
+        """
+        guess = self.guess
+        rows = np.flatnonzero((self.b > TOLERANCE) | self._touched(cols))
+        basis = None
+        if guess is not None:
+            col_position = np.full(self.num_vars, -1)
+            col_position[cols] = np.arange(len(cols))
+            basis = []
+            used = set()
+            for k, row in enumerate(rows):
+                col = col_position[guess[row]] if guess[row] >= 0 else -1
+                basis.append(col if col >= 0 and col not in used else len(cols) + k)
+                used.add(basis[-1])
+        lp = DualSimplex(self.c[cols], self._matrix(rows, cols), self.b[rows], lower, upper, basis)
+        return _Restricted(cols, rows, lp)
+
+    def _extend(self, restricted: _Restricted, new) -> _Restricted:
+        """Add the columns `new` to the restricted problem, and the
+        rows only they are in.
+        """
+        in_rows = np.zeros(self.num_rows, dtype=bool)
+        in_rows[restricted.rows] = True
+        new_rows = np.flatnonzero(self._touched(new) & ~in_rows)
+        lp = restricted.lp
+        lp.add_rows(self.b[new_rows])
+        rows = np.concatenate([restricted.rows, new_rows])
+        lp.add_columns(self._matrix(rows, new), self.c[new], self.upper[new])
+        return _Restricted(np.concatenate([restricted.cols, new]), rows, lp)
+
+    def reduced_costs(self, restricted: _Restricted) -> "np.ndarray":
+        """Get the reduced cost of every column, from the dual prices
+        of the solved restricted problem.
+        """
+        c, b, indices, data, entry_col = self.c, self.b, self.indices, self.data, self.entry_col
+        num_rows, num_vars = self.num_rows, self.num_vars
+        # Prices for the rows that are left out, so that together with
+        # the dual prices of the rows in, every column pays off at best
+        # as much as it costs. Then the solution is optimal for all
+        # columns, as the left out rows add nothing to the dual
+        # objective: they either have `b == 0`, or a price of 0.
+        prices = self.price_guess.copy() if self.price_guess is not None else np.zeros(num_rows)
+        prices[b < 0] = 0
+        prices[restricted.rows] = restricted.lp.duals()
+        left_out = np.ones(num_rows, dtype=bool)
+        left_out[restricted.rows] = False
+        left_out_entry = left_out[indices] & (data > 0)
+        for _ in range(MAX_PRICE_REPAIRS):
+            reduced = c - np.bincount(entry_col, weights=data * prices[indices], minlength=num_vars)
+            # Lower the price of what columns that would pay off make.
+            excess = np.maximum(-reduced[entry_col], 0)
+            fix = left_out_entry & (excess > TOLERANCE) & (prices[indices] > 0)
+            if not fix.any():
+                break
+            np.minimum.at(prices, indices[fix], np.maximum(prices[indices[fix]] - excess[fix] / data[fix], 0))
+        return reduced
+
+    def _price_infeasible(self, restricted: _Restricted) -> "np.ndarray":
+        """Find the columns that could make the problem solvable."""
+        # The rows that are left out only add rows of their own to the
+        # basis, so they don't change the ray.
+        ray = np.zeros(self.num_rows)
+        ray[restricted.rows] = restricted.lp.ray
+        helps = np.bincount(self.entry_col, weights=self.data * ray[self.indices], minlength=self.num_vars)
+        return helps > TOLERANCE
+
+    def solve(self, restricted: _Restricted) -> Optional[_Restricted]:
+        """Solve the problem with the bounds of `restricted` on its
+        columns, adding the columns that are needed.
+
+        Return
+        ---
+        The solved restricted problem, or None if there is no solution.
+        """
+        while True:
+            present = np.zeros(self.num_vars, dtype=bool)
+            present[restricted.cols] = True
+            solved = restricted.lp.solve()
+            if solved:
+                new = ~present & (self.reduced_costs(restricted) < -TOLERANCE)
+            else:
+                new = ~present & self._price_infeasible(restricted) & (self.upper > 0)
+            if not new.any():
+                return restricted if solved else None
+            restricted = self._extend(restricted, self._with_guesses(np.flatnonzero(new), present))
+            lp = restricted.lp
+            if solved:
+                # The solution still holds, it may just not be the
+                # cheapest one anymore.
+                lp.solve_primal()
+            elif (lp.reduced < -TOLERANCE).any():
+                # Neither holds, so start over.
+                num_vars = len(restricted.cols)
+                restricted = self.build(restricted.cols, lp.lower[:num_vars], lp.upper[:num_vars])
+
+    def solution(self, restricted: _Restricted) -> "np.ndarray":
+        x = np.zeros(self.num_vars)
+        x[restricted.cols] = restricted.lp.solution()
+        return x
+
+def _round_up(problem: _ColumnGeneration, x) -> Optional["np.ndarray"]:
+    """Round up the non-integer solution `x`. As the extra crafts use
+    more ingredients, every row that falls short gets more of its
+    guessed column, or else the cheapest column that covers it, until
+    none does.
+
+    Return
+    ---
+    The whole-number solution, or None if it didn't work out.
+    """
+    c, b, upper, guess = problem.c, problem.b, problem.upper, problem.guess
+    indices, data, entry_col = problem.indices, problem.data, problem.entry_col
+    x = np.minimum(np.ceil(x - 1e-6), np.floor(upper))
+    for _ in range(MAX_ROUNDING_STEPS):
+        short = b - np.bincount(indices, weights=data * x[entry_col], minlength=problem.num_rows)
+        rows = np.flatnonzero(short > TOLERANCE)
+        if not len(rows):
+            return x
+        for row in rows:
+            # The guessed columns only use items guessed to be made
+            # before, so following them comes to an end.
+            col = guess[row] if guess is not None else -1
+            if col < 0 or x[col] >= upper[col]:
+                makers = np.flatnonzero((indices == row) & (data > 0) & (x[entry_col] < upper[entry_col]))
+                if not len(makers):
+                    return None
+                col = entry_col[makers[np.argmin(c[entry_col[makers]] / data[makers])]]
+            amount = data[(entry_col == col) & (indices == row)].sum()
+            if amount <= 0:
+                return None
+            x[col] = min(x[col] + math.ceil(short[row] / amount - 1e-9), upper[col])
+    return None
+
+def _branch_and_price(problem: _ColumnGeneration, root: _Restricted, deadline: float,
+                      price: bool = True,
+                      best: Optional["np.ndarray"] = None) -> Tuple[Optional["np.ndarray"], bool]:
+    """Search for a whole-number solution cheaper than `best`, until
+    `deadline` (of `time.perf_counter`). With `price`, the columns are
+    priced at every node, so no column that could help is missed, else
+    only the columns of `root` are used.
+
+    Return
+    ---
+    `(x, finished)`, the cheapest solution found, or `best` if none is
+    cheaper, and whether the search finished.
+    """
+    # Depth first. Rounding up is tried first, since crafting more than
+    # needed always works as long as nothing runs out, so a whole-number
+    # solution is found right away.
+    c = problem.c
+    best_cost = float(c @ best) if best is not None else math.inf
+    stack: List[_Restricted] = [root]
+    for _ in range(MAX_BRANCH_NODES):
+        if not stack or time.perf_counter() > deadline:
+            break
+        node = stack.pop()
+        if price:
+            node = problem.solve(node)
+        elif not node.lp.solve():
+            node = None
+        if node is None:
+            continue
+        x = node.lp.solution()
+        cost = float(c[node.cols] @ x)
+        if cost >= best_cost - TOLERANCE * max(1, abs(best_cost)):
+            continue
+        fraction = np.abs(x - np.round(x))
+        var = int(np.argmax(fraction)) if len(x) else 0
+        if not len(x) or fraction[var] <= 1e-6:
+            best, best_cost = np.round(problem.solution(node)), cost
+            continue
+        lp = node.lp
+        down = node._replace(lp=lp.copy())
+        down.lp.set_bounds(var, lp.lower[var], math.floor(x[var]))
+        lp.set_bounds(var, math.ceil(x[var]), lp.upper[var])
+        stack.append(down)
+        stack.append(node)
+    return best, not stack
+
+def _solve_simplex(c, columns: CSRMatrix, b, upper, integer: bool,
+                   guess, price_guess) -> Tuple[Optional["np.ndarray"], bool]:
+    problem = _ColumnGeneration(c, columns, b, upper, guess, price_guess)
+    root = problem.solve(problem.root())
+    if root is None:
+        return None, True
+    if not integer:
+        return problem.solution(root), True
+    # The rounded up solution is the fallback if the search runs out of
+    # time. The columns of the root usually hold a better solution,
+    # which is quick to find, and then cuts off most nodes of the full
+    # search.
+    deadline = time.perf_counter() + MAX_BRANCH_SECONDS
+    best = _round_up(problem, problem.solution(root))
+    best, _ = _branch_and_price(problem, root._replace(lp=root.lp.copy()), deadline,
+                                price=False, best=best)
+    return _branch_and_price(problem, root, deadline, best=best)
+
+def _solve_highs(c, columns: CSRMatrix, b, upper, integer: bool) -> Optional["np.ndarray"]:
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_array
+
+    indptr, indices, data = columns.to_numpy()
+    A = csr_array((data, indices, indptr), shape=columns.shape).T
+    result = linprog(c, A_ub=-A, b_ub=-b, bounds=np.column_stack([np.zeros(len(c)), upper]),
+                     method="highs", integrality=np.ones(len(c)) if integer else None)
+    if result.status == 2:
+        # Infeasible.
+        return None
+    if result.status != 0:
+        raise RuntimeError(f"The LP solver failed: {result.message}")
+    return np.round(result.x) if integer else result.x
+
+def has_highs() -> bool:
+    try:
+        import scipy.optimize  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def solve_covering_lp(c, columns: CSRMatrix, b, upper, integer: bool = False, solver: str = "auto",
+                      guess=None, price_guess=None) -> CoveringSolution:
+    """Minimize `c @ x` subject to `A @ x >= b` and `0 <= x <= upper`,
+    for `c >= 0`, where `columns` holds A column by column, i.e. it is
+    the variables x rows matrix A.T.
+
+    `solver` is "simplex" for the bundled dual simplex, "highs" for the
+    HiGHS solver of SciPy, or "auto" for HiGHS if SciPy is installed.
+    With `integer`, every variable has to be a whole number. The bundled
+    solver then searches for at most MAX_BRANCH_NODES nodes and
+    MAX_BRANCH_SECONDS seconds, starting from the non-integer solution
+    rounded up, and returns the best solution found, marked as not
+    optimal if the search was cut short.
+
+    The bundled solver can start from a guess of the solution: `guess`
+    holds, for every row, the variable expected to cover it, or -1.
+    It starts with the guessed variables of the rows with `b > 0`, and
+    of the rows they use, and only adds the other variables that can
+    make the solution cheaper, or a solution possible. For rows it
+    hasn't looked at yet, it starts from the dual prices in
+    `price_guess`, e.g. unit costs. With `integer`, variables are added
+    the same way at every branch and bound node.
+
+    Return
+    ---
+    A CoveringSolution.
+
+    Raises
+    ---
+    RuntimeError
+        If HiGHS fails.
+    """
+    if solver == "auto":
+        solver = "highs" if has_highs() else "simplex"
+    if solver == "highs":
+        if not has_highs():
+            raise ImportError("The HiGHS solver needs SciPy, "
+                              "install it with `pip install crafterlib[scipy]`")
+        return CoveringSolution(_solve_highs(c, columns, b, upper, integer), solver, True)
+    if solver == "simplex":
+        x, optimal = _solve_simplex(c, columns, b, upper, integer, guess, price_guess)
+        return CoveringSolution(x, solver, optimal)
+    raise ValueError(f"Unknown solver: {solver!r}")
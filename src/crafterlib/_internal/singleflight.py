@@ -0,0 +1,49 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class SingleFlight(Generic[K, V]):
+    """Deduplicate concurrent calls that compute the same thing.
+
+    The first thread to call `do` for a key runs the function. Any
+    other thread that calls `do` for the same key while it is still
+    running blocks until it finishes, and then receives the same
+    result, or the same exception if the function failed.
+
+    Nothing is remembered once the call has finished; combine this
+    with a cache to also reuse the result for later calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[K, "Future[V]"] = {}
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -2,11 +2,14 @@
 
 SPDX-License-Identifier: MIT
 """
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Callable, Dict, List, Optional
 from crafterlib.item import Item
 from crafterlib.recipe import Recipe
 from crafterlib.crafting_grid import CraftingGrid
-from crafterlib.graph import ItemGraph
+from crafterlib.graph import ItemGraph, RecipeGraph, ResourceClasses
+from crafterlib.graph.backends import GRAPH_BACKENDS
+from crafterlib.sparse import CSRMatrix
 
 def _make_item_id_map(items: List[Item]) -> Dict[str, Item]:
     item_id_map: Dict[str, Item] = {}
@@ -48,19 +51,284 @@ def _make_crafting_grid_id_map(crafting_grids: List[CraftingGrid]) -> Dict[str,
         crafting_grid_id_map[crafting_grid.id] = crafting_grid
     return crafting_grid_id_map
 
+def _make_recipe_index(recipes: List[Recipe], field: str) -> Dict[str, List[Recipe]]:
+    """Map every item name to the recipes that mention it in `field`
+    ("products", "ingredients" or "requirements").
+
+    Recipes keep their original order within each list.
+    """
+    recipe_index: Dict[str, List[Recipe]] = {}
+    for recipe in recipes:
+        for item_name in getattr(recipe, field):
+            recipe_index.setdefault(item_name, []).append(recipe)
+    return recipe_index
+
+def _make_crafting_grid_index(crafting_grids: List[CraftingGrid]) -> Dict[str, List[CraftingGrid]]:
+    crafting_grid_index: Dict[str, List[CraftingGrid]] = {}
+    for crafting_grid in crafting_grids:
+        for item_name in crafting_grid.products:
+            crafting_grid_index.setdefault(item_name, []).append(crafting_grid)
+    return crafting_grid_index
+
+# Maps with at most this many entries are shared between records
+# when they are equal. Bigger maps are rarely equal to each other.
+_MAX_SHARED_MAP_SIZE = 16
+
+class _Compactor:
+    """Rewrites records so that equal strings, small maps and lists
+    are stored only once.
+    """
+
+    def __init__(self, string_table: Dict[str, str]):
+        self.string_table = string_table
+        self._shared: Dict[Any, Any] = {}
+
+    def string(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.string_table.setdefault(value, value)
+        return value
+
+    def mapping(self, mapping: Dict[str, Any]) -> Dict[str, Any]:
+        compacted = {self.string(key): self.string(value) for key, value in mapping.items()}
+        if len(compacted) > _MAX_SHARED_MAP_SIZE:
+            return compacted
+        # With the type of every value, as equal values of different
+        # types, e.g. 1 and 1.0, hash alike.
+        key = (dict, *((key, type(value), value) for key, value in compacted.items()))
+        try:
+            return self._shared.setdefault(key, compacted)
+        except TypeError:
+            # Unhashable values, can't be shared.
+            return compacted
+
+    def sequence(self, sequence: Any) -> Any:
+        if not isinstance(sequence, list):
+            return sequence
+        compacted = [self.string(value) for value in sequence]
+        key = (list, *((type(value), value) for value in compacted))
+        try:
+            return self._shared.setdefault(key, compacted)
+        except TypeError:
+            return compacted
+
+def _compact_records(items: List[Item],
+                     recipes: List[Recipe],
+                     crafting_grids: List[CraftingGrid],
+                     string_table: Dict[str, str]) -> None:
+    """Intern item names and share equal small maps between records,
+    in place.
+    """
+    compactor = _Compactor(string_table)
+    for item in items:
+        item.name = compactor.string(item.name)
+        item.sources = compactor.sequence(item.sources)
+    for recipe in recipes:
+        recipe.category = compactor.string(recipe.category)
+        recipe.requirements = compactor.mapping(recipe.requirements)
+        recipe.ingredients = compactor.mapping(recipe.ingredients)
+        recipe.products = compactor.mapping(recipe.products)
+    for crafting_grid in crafting_grids:
+        crafting_grid.products = compactor.mapping(crafting_grid.products)
+        crafting_grid.crafting_coordinates = compactor.mapping(crafting_grid.crafting_coordinates)
+
+def _make_item_names(items: List[Item],
+                     recipes: List[Recipe],
+                     crafting_grids: List[CraftingGrid]) -> List[str]:
+    """List every item name, including names that only appear in
+    recipes or crafting grids. Items come first, in their original order.
+    """
+    item_names: Dict[str, None] = {item.name: None for item in items}
+    for recipe in recipes:
+        for field in (recipe.ingredients, recipe.products, recipe.requirements):
+            for item_name in field:
+                item_names.setdefault(item_name)
+    for crafting_grid in crafting_grids:
+        for item_name in crafting_grid.products:
+            item_names.setdefault(item_name)
+    return list(item_names)
+
+def _make_recipe_matrix(recipes: List[Recipe], field: str, item_index: Dict[str, int]) -> CSRMatrix:
+    """Build a recipes x items matrix of the amounts in `field`."""
+    rows = (
+        [(item_index[item_name], amount) for item_name, amount in getattr(recipe, field).items()]
+        for recipe in recipes
+    )
+    return CSRMatrix.from_rows(rows, len(item_index))
+
+def _make_item_graph(items: List[Item], recipes: List[Recipe], backend: str) -> ItemGraph:
+    item_graph = ItemGraph(backend=backend)
+    item_graph.add_items([item.name for item in items])
+    item_graph.add_recipes(recipes)
+    return item_graph
+
 class GameCraftingData:
-    def __init__(self, name: str, items: List[Item] = [], recipes: List[Recipe] = [], crafting_grids: List[CraftingGrid] = []):
+    """Items, recipes and crafting grids for one game.
+
+    The id and name maps are built (and checked for conflicts) right
+    away. Everything else that is derived from the recipes, i.e. the
+    item graph and the recipe/crafting grid indexes, is built on first
+    access. Pass `lazy=False`, or call `build_derived()`, to build all
+    of it up front instead.
+
+    With `compact=True`, item names are interned through `string_table`,
+    and records with equal small maps (e.g. the same ingredients, or no
+    requirements) share one dict object. This rewrites the given records
+    in place, so only pass it for records nobody else holds on to;
+    load_data_for_game does so for the records it reads. Treat the maps
+    and lists of compacted records as read-only, `to_dict()` returns
+    copies of them.
+
+    `graph_backend` selects how the item graph is stored, "networkx"
+    (the default) or "compact", see ItemGraph.
+    """
+
+    # Derived structures, and the functions that build them.
+    _DERIVED_BUILDERS: Dict[str, Callable[["GameCraftingData"], Any]] = {
+        "product_index": lambda data: _make_recipe_index(data.recipes, "products"),
+        "ingredient_index": lambda data: _make_recipe_index(data.recipes, "ingredients"),
+        "requirement_index": lambda data: _make_recipe_index(data.recipes, "requirements"),
+        "crafting_grid_index": lambda data: _make_crafting_grid_index(data.crafting_grids),
+        "item_graph": lambda data: _make_item_graph(data.items, data.recipes, data.graph_backend),
+        "item_names": lambda data: _make_item_names(data.items, data.recipes, data.crafting_grids),
+        "item_index": lambda data: {item_name: i for i, item_name in enumerate(data.item_names)},
+        "ingredient_matrix":
+            lambda data: _make_recipe_matrix(data.recipes, "ingredients", data.item_index),
+        "product_matrix":
+            lambda data: _make_recipe_matrix(data.recipes, "products", data.item_index),
+        "recipe_graph": lambda data: RecipeGraph(data.item_names, data.recipes,
+                                                 data.ingredient_matrix, data.product_matrix,
+                                                 data.item_index),
+    }
+
+    def __init__(self,
+                 name: str,
+                 items: List[Item] = [],
+                 recipes: List[Recipe] = [],
+                 crafting_grids: List[CraftingGrid] = [],
+                 lazy: bool = True,
+                 compact: bool = False,
+                 graph_backend: str = "networkx"):
+        if graph_backend not in GRAPH_BACKENDS:
+            raise ValueError(f"Unknown graph backend: {graph_backend!r}")
+
+        self.string_table: Dict[str, str] = {}
+        if compact:
+            _compact_records(items, recipes, crafting_grids, self.string_table)
+
         self.name = name
         self.items = items
         self.recipes = recipes
         self.crafting_grids = crafting_grids
+        self.graph_backend = graph_backend
         self.item_id_map = _make_item_id_map(items)
         self.item_name_map = _make_item_name_map(items)
         self.recipe_id_map = _make_recipe_id_map(recipes)
         self.crafting_grid_id_map = _make_crafting_grid_id_map(crafting_grids)
-        self.item_graph = ItemGraph()
-        self.item_graph.add_items([item.name for item in items])
-        self.item_graph.add_recipes(recipes)
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()
+
+        if not lazy:
+            self.build_derived()
+
+    def _get_derived(self, name: str) -> Any:
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                # Check again, another thread may have built it
+                # while we were waiting for the lock.
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._DERIVED_BUILDERS[name](self)
+                    self._derived[name] = value
+        return value
+
+    def build_derived(self) -> None:
+        """Build the item graph and all indexes now, instead
+        of on first access.
+        """
+        for name in self._DERIVED_BUILDERS:
+            self._get_derived(name)
+        # The compact backend builds its CSR arrays on the first query.
+        self.item_graph.to_csr()
+
+    @property
+    def item_graph(self) -> ItemGraph:
+        return self._get_derived("item_graph")
+
+    @property
+    def product_index(self) -> Dict[str, List[Recipe]]:
+        return self._get_derived("product_index")
+
+    @property
+    def ingredient_index(self) -> Dict[str, List[Recipe]]:
+        return self._get_derived("ingredient_index")
+
+    @property
+    def requirement_index(self) -> Dict[str, List[Recipe]]:
+        return self._get_derived("requirement_index")
+
+    @property
+    def crafting_grid_index(self) -> Dict[str, List[CraftingGrid]]:
+        return self._get_derived("crafting_grid_index")
+
+    @property
+    def item_names(self) -> List[str]:
+        """Every item name, indexed by dense integer item index.
+
+        This includes names that only appear in recipes or crafting
+        grids, after the names of `items` in their original order.
+        """
+        return self._get_derived("item_names")
+
+    @property
+    def item_index(self) -> Dict[str, int]:
+        """Map from item name to dense integer item index."""
+        return self._get_derived("item_index")
+
+    @property
+    def ingredient_matrix(self) -> CSRMatrix:
+        """Sparse recipes x items matrix of ingredient amounts.
+
+        Row `r` belongs to `recipes[r]`, column `i` to `item_names[i]`.
+        """
+        return self._get_derived("ingredient_matrix")
+
+    @property
+    def product_matrix(self) -> CSRMatrix:
+        """Sparse recipes x items matrix of product amounts.
+
+        Row `r` belongs to `recipes[r]`, column `i` to `item_names[i]`.
+        """
+        return self._get_derived("product_matrix")
+
+    @property
+    def recipe_graph(self) -> RecipeGraph:
+        """Bipartite item/recipe graph that includes every recipe,
+        not just the first recipe per item like `item_graph`.
+
+        It shares `item_names` and the recipe matrices with this object.
+        """
+        return self._get_derived("recipe_graph")
+
+    @property
+    def resource_classes(self) -> ResourceClasses:
+        """Every item of `item_graph` labelled basic, intermediate,
+        advanced or isolated, see ResourceClasses.
+
+        The labels are worked out once and kept until the item graph
+        changes.
+        """
+        return self.item_graph.get_resource_classes()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Locks can't be pickled.
+        del state["_derived_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._derived_lock = threading.RLock()
 
     def num_items(self) -> int:
         return len(self.items)
@@ -76,6 +344,12 @@ class GameCraftingData:
     
     def get_item_by_name(self, item_name: str) -> Optional[Item]:
         return self.item_name_map.get(item_name)
+
+    def get_item_index(self, item_name: str) -> Optional[int]:
+        """Get the dense integer index of an item, as used by
+        `item_names` and the recipe matrices.
+        """
+        return self.item_index.get(item_name)
     
     def get_recipe_by_id(self, id: int) -> Optional[Recipe]:
         return self.recipe_id_map.get(id)
@@ -87,20 +361,22 @@ class GameCraftingData:
         """Get all recipes in which the specified
         item appears as a product.
         """
-        recipes_for_item = []
+        return list(self.product_index.get(item_name, ()))
+
+    def get_recipes_using_item(self, item_name: str) -> List[Recipe]:
+        """Get all recipes in which the specified
+        item appears as an ingredient.
+        """
+        return list(self.ingredient_index.get(item_name, ()))
+
+    def get_recipes_requiring_item(self, item_name: str) -> List[Recipe]:
+        """Get all recipes in which the specified
+        item appears as a requirement.
+        """
+        return list(self.requirement_index.get(item_name, ()))
 
-        for recipe in self.recipes:
-            if recipe.has_product(item_name):
-                recipes_for_item.append(recipe)
-        return recipes_for_item
-    
     def get_crafting_grid_for_item(self, item_name: str) -> List[CraftingGrid]:
-       """Get all crafting grid recipes in which the specified
-       item appears as a product.
-       """
-       crafting_grids_for_item = []
-
-       for crafting_grid in self.crafting_grids:
-           if crafting_grid.has_product(item_name):
-               crafting_grids_for_item.append(crafting_grid)
-       return crafting_grids_for_item
\ No newline at end of file
+        """Get all crafting grid recipes in which the specified
+        item appears as a product.
+        """
+        return list(self.crafting_grid_index.get(item_name, ()))
@@ -18,6 +18,8 @@ class CraftingGrid:
         a representation of a crafting grid using coordinates (A1, A2, A3, B1...) in the form of a dictionary
     """
 
+    __slots__ = ("id", "products", "crafting_coordinates")
+
     def __init__(self, id: int, products: Dict[str, float] = {}, crafting_coordinates: Dict[str, str] = {}):
         self.id = id
         self.products = products
@@ -33,8 +35,8 @@ class CraftingGrid:
         """Return a representation of the item as a dictionary."""
         return {
             "id": self.id,
-            "products": self.products,
-            "crafting_coordinates": self.crafting_coordinates
+            "products": dict(self.products),
+            "crafting_coordinates": dict(self.crafting_coordinates)
         }
     
     @classmethod
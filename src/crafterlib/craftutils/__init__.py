@@ -6,6 +6,8 @@ SPDX-License-Identifier: MIT
 __all__ = [
     "get_amount_needed_for",
     "get_amount_craftable_with",
+    "get_amount_craftable_with_batch",
+    "get_craftable_products",
     "get_recipe_chain",
     "get_recyclables",
     "get_possible_products",
@@ -15,15 +17,20 @@ __all__ = [
     "get_intermed_resources_for",
     "get_adv_resources",
     "CraftingPlan",
-    "make_crafting_plan"
+    "IncrementalCraftingPlan",
+    "make_crafting_plan",
+    "OptimalCraftingPlan",
+    "make_optimal_crafting_plan"
 ]
 
 from .amount_needed_for import get_amount_needed_for
-from .amount_craftable_with import get_amount_craftable_with
+from .amount_craftable_with import get_amount_craftable_with, get_amount_craftable_with_batch
+from .craftable_products import get_craftable_products
 from .recipe_chain import get_recipe_chain
 from .recyclables import get_recyclables
 from .possible_products import get_possible_products
 from .resources_basic import get_basic_resources, get_basic_resources_for
 from .resources_intermed import get_intermed_resources, get_intermed_resources_for
 from .resources_adv import get_adv_resources
-from .crafting_plan import CraftingPlan, make_crafting_plan
\ No newline at end of file
+from .crafting_plan import CraftingPlan, IncrementalCraftingPlan, make_crafting_plan
+from .optimal_plan import OptimalCraftingPlan, make_optimal_crafting_plan
\ No newline at end of file
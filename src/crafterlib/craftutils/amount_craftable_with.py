@@ -3,9 +3,14 @@
 SPDX-License-Identifier: MIT
 """
 import math
-from typing import Dict
+from typing import Dict, List
 from crafterlib import GameCraftingData
-import networkx as nx
+from crafterlib._internal.craft_solver import CraftSolver, covering_recipe
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
 
 def get_amount_craftable_with(game_data: GameCraftingData,
                               ingredients: Dict[str, float],
@@ -15,21 +20,29 @@ def get_amount_craftable_with(game_data: GameCraftingData,
     crafted with a set of available ingredients.
 
     If `recursive` is set, then intermediate recipes inbetween `ingredient` and `product`
-    will also be considered.
+    will also be considered. Missing intermediate items are crafted in whole crafts,
+    and ingredients shared between several of them are only used once.
 
     Example: If "1x Planks -> 4x Sticks" and "2x Sticks, 3x Iron Ingot -> 1x Iron Pickaxe"
     are recipes, and we have 1 Planks and 6 Iron Ingots, then we can craft
     a maximum of 2x Iron Pickaxes.
     """
-    graph = game_data.item_graph.graph
+    item_graph = game_data.item_graph
 
- 
-    if product not in graph:
+    if not item_graph.has_item(product):
         # If product isn't even in graph (it can't be crafted), return 0.
         return 0
-    
-    # Find items that can be directly crafted into product.
-    predecessors = list(graph.predecessors(product))
+
+    if recursive:
+        # The solver crafts every intermediate item once, for the total
+        # demand of everything that uses it, and tries increasing numbers
+        # of crafts of `product` until the ingredients run out.
+        solver = CraftSolver(game_data, product, ingredients)
+        return solver.max_crafts() * solver.amount_per_craft()
+
+    # Find items that can be directly crafted into product,
+    # along with the amount of each needed to craft 1 product.
+    recipe = item_graph.get_recipe_for(product)
     # Initialize list to store the number of products that
     # can be crafted from each ingredient.
     # So if you have 10 sticks you could craft 5 pickaxes,
@@ -39,9 +52,8 @@ def get_amount_craftable_with(game_data: GameCraftingData,
     possible = []
 
     # Iterate over each ingredient.
-    for needed_ingreds in predecessors:
-        # Get the "weight" or number of items needed to craft product.
-        weight = graph.get_edge_data(needed_ingreds, product, {}).get("weight")
+    for needed_ingreds, weight in recipe.items():
+        # `weight` is the number of items needed to craft product.
         # Skip if the edge has no valid weight.
         if weight is None or weight <= 0:
             continue
@@ -50,14 +62,6 @@ def get_amount_craftable_with(game_data: GameCraftingData,
         # Divide available ingredients by how many we need
         # to craft 1 of product, to get how many of product
         # we can craft with the available ingredients.
-
-        # If recursive is True and we don't have enough of 
-        # a needed ingredient, call the function again with the
-        # needed ingredient as the product and add the crafted ingredient
-        # to our available ingredients.
-        if recursive and available_ingreds < weight:
-           available_ingreds += get_amount_craftable_with(game_data, ingredients, needed_ingreds, recursive=True)
-        
         # Add this value to possible.
         possible.append(available_ingreds / weight)
     if not possible:
@@ -77,12 +81,77 @@ def get_amount_craftable_with(game_data: GameCraftingData,
     # Determine output count per craft incase you get more
     # than one item per craft, default is 1
     output_count = 1
-    for recipe in game_data.recipes:
-        if product in recipe.products:
-            output_count = recipe.products[product]
-            break
+    product_recipe = covering_recipe(game_data, product)
+    if product_recipe is not None:
+        output_count = product_recipe.products[product]
         
     # Convert amount craftable to lowest whole amount of crafts
     # then multiply by the amount of product you get from a craft
     max_crafts = math.floor(total_items / output_count)
-    return max_crafts * output_count
\ No newline at end of file
+    return max_crafts * output_count
+
+def get_amount_craftable_with_batch(game_data: GameCraftingData,
+                                    inventories,
+                                    products: List[str],
+                                    recursive: bool = False):
+    """Like `get_amount_craftable_with`, for many inventories and
+    products at once.
+
+    `inventories` is a NumPy array (or anything convertible to one)
+    of inventories x items, with the amount of item
+    `game_data.item_names[j]` in column `j`. The result is a NumPy
+    array of inventories x products, with the same numbers that
+    `get_amount_craftable_with` returns for each pair.
+
+    The work is done with NumPy operations over all inventories at
+    once, so it takes about as long for a thousand inventories as for
+    a few, per product.
+
+    Raises
+    ---
+    ImportError if NumPy is not installed.
+    ValueError if `inventories` doesn't have one column per item.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for get_amount_craftable_with_batch(), "
+                          "install it with `pip install crafterlib[numpy]`")
+    inventories = np.asarray(inventories, dtype=np.float64)
+    item_index = game_data.item_index
+    if inventories.ndim != 2 or inventories.shape[1] != len(item_index):
+        raise ValueError(f"Expected an inventories x {len(item_index)} items array, "
+                         f"got shape {inventories.shape}")
+
+    item_graph = game_data.item_graph
+    result = np.zeros((len(inventories), len(products)))
+    for k, product in enumerate(products):
+        if not item_graph.has_item(product):
+            continue
+
+        if recursive:
+            solver = CraftSolver(game_data, product)
+            result[:, k] = solver.max_crafts_batch(inventories, item_index) * solver.amount_per_craft()
+            continue
+
+        # Same steps as `get_amount_craftable_with`, on whole columns.
+        columns = []
+        weights = []
+        for ingredient, weight in item_graph.get_recipe_for(product).items():
+            if weight is None or weight <= 0:
+                continue
+            col = item_index.get(ingredient)
+            if col is None:
+                # Nobody can have it.
+                columns = None
+                break
+            columns.append(col)
+            weights.append(weight)
+        if not columns:
+            continue
+        total_items = (inventories[:, columns] / np.array(weights)).min(axis=1)
+
+        output_count = 1
+        product_recipe = covering_recipe(game_data, product)
+        if product_recipe is not None:
+            output_count = product_recipe.products[product]
+        result[:, k] = np.floor(total_items / output_count) * output_count
+    return result
@@ -0,0 +1,57 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from typing import Dict, List
+from crafterlib import GameCraftingData
+from crafterlib.craftutils.amount_craftable_with import get_amount_craftable_with
+
+def get_craftable_products(game_data: GameCraftingData,
+                           ingredients: Dict[str, float],
+                           recursive: bool = False) -> Dict[str, float]:
+    """Get every product that can be crafted with a set of available
+    ingredients, with the maximum amount of it that can be crafted.
+
+    The amounts are the same that `get_amount_craftable_with` returns
+    for each product, but only products whose ingredients are all
+    available are looked at, instead of every item in the game.
+
+    If `recursive` is set, products that need one or more intermediate
+    crafting steps are included as well.
+
+    Example: With 1 Planks and 6 Iron Ingots, Sticks can be crafted.
+    With `recursive`, so can 2 Iron Pickaxes, since Sticks are crafted
+    from Planks.
+
+    Products are returned in crafting order.
+    """
+    item_graph = game_data.item_graph
+
+    # Count, for every product, how many of its ingredients are available.
+    # The item graph has an edge from every ingredient to the products
+    # using it, so only recipes using available items are touched.
+    available = [item for item, amount in ingredients.items()
+                 if amount > 0 and item_graph.has_item(item)]
+    found_ingredients: Dict[str, int] = {}
+    candidates: List[str] = []
+    while available:
+        item = available.pop()
+        for product in item_graph.get_products_using(item):
+            count = found_ingredients.get(product, 0) + 1
+            found_ingredients[product] = count
+            if count == item_graph.in_degree(product):
+                # Every ingredient is available, or (with `recursive`)
+                # can be crafted from available ingredients.
+                candidates.append(product)
+                if recursive and ingredients.get(product, 0) <= 0:
+                    available.append(product)
+
+    condensation = item_graph.get_condensation()
+    candidates.sort(key=condensation.component_of)
+
+    craftable: Dict[str, float] = {}
+    for product in candidates:
+        amount = get_amount_craftable_with(game_data, ingredients, product, recursive)
+        if amount > 0:
+            craftable[product] = amount
+    return craftable
@@ -2,8 +2,11 @@
 
 SPDX-License-Identifier: MIT
 """
-from typing import Dict, NamedTuple
-from crafterlib import GameCraftingData
+import math
+from heapq import heappop, heappush
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from crafterlib import GameCraftingData, Recipe
+from crafterlib._internal.craft_solver import EPSILON, covering_recipe
 
 class CraftingPlan(NamedTuple):
     ingredients: Dict[str, float]
@@ -17,27 +20,234 @@ def make_crafting_plan(game_data: GameCraftingData,
     and a dict of leftovers.
 
     Moreover, the dict of ingredients is always sorted so that for any item,
-    none of the item's prerequisites appear before it in the list, only after.
+    none of the item's prerequisites appear after it in the list, only before.
     This means that the ingredient dict can be followed step-by-step as a
     to-do list.
 
+    Items are crafted in whole crafts, and items that can't be crafted
+    are gathered in whole units, so some of them may be left over.
+    Items on a cycle (e.g. Gold Nugget <-> Gold Ingot) are gathered
+    rather than crafted from each other, unless they are desired products.
+
     Example: To craft 23x Iron Pickaxe you would need:
-        *  9 Coal
-        *  3 Logs
-        * 12 Planks
         * 69 Raw Iron
-        * 69 Iron Ingot
+        *  6 Logs
+        * 24 Planks
         * 48 Sticks
+        *  9 Coal
+        * 69 Iron Ingot
         * 23 Iron Pickaxe
 
     Leftovers would be:
-        * 0.375000 Coal
-        * 0.125000 Logs
-        * 0.500000 Planks
         * 2.000000 Sticks
+        * 0.375000 Coal
     """
-    graph = game_data.item_graph.graph
+    return IncrementalCraftingPlan(game_data, products).to_plan()
+
+class IncrementalCraftingPlan:
+    """A crafting plan that is kept up to date while the inventory
+    changes, e.g. as a player gathers and crafts items.
+
+    Items in the inventory are used before anything is crafted or
+    gathered. After every change of the inventory, only the items whose
+    number of crafts changes, and their ingredients, are worked out
+    again, so a live view of the plan can be refreshed on every change.
+
+    Plans are worked out in one sweep from the products down to their
+    ingredients, in reverse crafting order, using the component numbers
+    of the item graph's condensation. Only items that something needs
+    are visited, so the work is proportional to the part of the graph
+    that is touched, not to the whole game.
+
+    Items are crafted in whole crafts, and items that can't be crafted
+    are gathered in whole units. Items on a cycle (e.g. Gold Nugget <->
+    Gold Ingot) are gathered rather than crafted from each other, unless
+    they are desired products, and whatever an item on a cycle needs
+    from its own cycle is gathered too, so plans never loop.
+
+    Parameters
+    ---
+    game_data : GameCraftingData
+        The game.
+    products : dict[str, float]
+        The desired products.
+    inventory : dict[str, float] | None
+        The items at hand.
+
+    Attributes
+    ---
+    crafts : dict[str, int]
+        Number of crafts still to do of every item.
+    """
+
+    def __init__(self,
+                 game_data: GameCraftingData,
+                 products: Dict[str, float],
+                 inventory: Optional[Dict[str, float]] = None):
+        self.game_data = game_data
+        self.products = dict(products)
+        self.crafts: Dict[str, int] = {}
+        self._inventory: Dict[str, float] = {}
+        # Demand on every item from the products and from items in
+        # other components, which is crafted, and from items in the
+        # same component, which is gathered.
+        self._outer_demand: Dict[str, float] = {}
+        self._inner_demand: Dict[str, float] = {}
+        # Sort key of every item in crafting order, see `_key`, and the
+        # recipe used for every item, see `_recipe`.
+        self._keys: Dict[str, Tuple[int, int]] = {}
+        self._recipes: Dict[str, Optional[Recipe]] = {}
+
+        for item, amount in (inventory or {}).items():
+            if amount > 0:
+                self._inventory[item] = amount
+        for product, amount in self.products.items():
+            self._outer_demand[product] = self._outer_demand.get(product, 0) + amount
+        self._propagate(self.products)
+
+    @property
+    def inventory(self) -> Dict[str, float]:
+        """The items at hand. Change it with `update_inventory`."""
+        return dict(self._inventory)
+
+    def _key(self, item: str) -> Tuple[int, int]:
+        key = self._keys.get(item)
+        if key is None:
+            condensation = self.game_data.item_graph.get_condensation()
+            node = condensation.index.get(item)
+            # Items that are not in the graph come first, nothing is
+            # crafted from them.
+            key = (condensation.component[node], node) if node is not None else (-1, -1)
+            self._keys[item] = key
+        return key
+
+    def _recipe(self, item: str) -> Optional[Recipe]:
+        """Get the recipe to craft `item` with, or None to gather it."""
+        if item in self._recipes:
+            return self._recipes[item]
+        recipe = covering_recipe(self.game_data, item)
+        if recipe is not None and item not in self.products:
+            condensation = self.game_data.item_graph.get_condensation()
+            comp = self._key(item)[0]
+            if condensation.is_cyclic(comp) and any(
+                    condensation.component_of(ingredient) == comp for ingredient in recipe.ingredients):
+                recipe = None
+        self._recipes[item] = recipe
+        return recipe
+
+    def _propagate(self, items) -> Set[str]:
+        """Work out the crafts of `items` again, and of every ingredient
+        whose demand changes as a result. Return every item whose
+        entries in the plan may have changed.
+        """
+        outer_demand, inner_demand, inventory = self._outer_demand, self._inner_demand, self._inventory
+        crafts = self.crafts
+        changed = set(items)
+        heap: List[Tuple[int, int, str]] = []
+        queued = set()
+
+        def push(item: str) -> None:
+            if item not in queued:
+                queued.add(item)
+                comp, node = self._key(item)
+                heappush(heap, (-comp, -node, item))
+
+        for item in items:
+            push(item)
+
+        # Consumers come before their ingredients, so the demand on an
+        # item from other components is complete when it is visited.
+        while heap:
+            _, _, item = heappop(heap)
+            queued.discard(item)
+            recipe = self._recipe(item)
+            old_crafts = crafts.get(item, 0)
+            new_crafts = 0
+            if recipe is not None:
+                missing = outer_demand.get(item, 0) - inventory.get(item, 0)
+                if missing > EPSILON:
+                    new_crafts = math.ceil(missing / recipe.products[item] - EPSILON)
+            if new_crafts == old_crafts:
+                continue
+            if new_crafts:
+                crafts[item] = new_crafts
+            else:
+                del crafts[item]
+
+            comp = self._key(item)[0]
+            for ingredient, amount in recipe.ingredients.items():
+                amount *= new_crafts - old_crafts
+                changed.add(ingredient)
+                if self._key(ingredient)[0] == comp:
+                    inner_demand[ingredient] = inner_demand.get(ingredient, 0) + amount
+                else:
+                    outer_demand[ingredient] = outer_demand.get(ingredient, 0) + amount
+                    push(ingredient)
+        return changed
+
+    def update_inventory(self, delta: Dict[str, float]) -> Set[str]:
+        """Apply a change of the inventory: positive amounts for items
+        gained, negative amounts for items used up or lost. Amounts
+        never drop below zero.
+
+        Return
+        ---
+        The items whose amounts (see `amounts`) may have changed.
+        """
+        inventory = self._inventory
+        for item, amount in delta.items():
+            amount = max(inventory.get(item, 0) + amount, 0)
+            if amount > 0:
+                inventory[item] = amount
+            else:
+                inventory.pop(item, None)
+        return self._propagate([item for item in delta if item in self._outer_demand
+                                or item in self._inner_demand])
+
+    def amounts(self, item: str) -> Tuple[float, float]:
+        """Get `(amount to craft or gather, amount left over)` of `item`,
+        e.g. to refresh the items returned by `update_inventory`.
+        """
+        short = self._outer_demand.get(item, 0) + self._inner_demand.get(item, 0) \
+            - self._inventory.get(item, 0)
+        short = max(short, 0)
+        produced = 0
+        item_crafts = self.crafts.get(item)
+        if item_crafts:
+            produced = item_crafts * self._recipe(item).products[item]
+        gathered = 0
+        if short - produced > EPSILON:
+            gathered = math.ceil(short - produced - EPSILON)
+        obtained = produced + gathered
+        return obtained, obtained - short
+
+    def _items(self) -> List[str]:
+        items = set(self._outer_demand)
+        items.update(self._inner_demand)
+        return sorted(items, key=self._key)
+
+    def ingredients(self) -> Dict[str, float]:
+        """Get the amount of every item that still has to be crafted or
+        gathered, in crafting order.
+        """
+        ingredients = {}
+        for item in self._items():
+            obtained, _ = self.amounts(item)
+            if obtained:
+                ingredients[item] = obtained
+        return ingredients
 
-    # TODO: Finish this implementation.
+    def leftovers(self) -> Dict[str, float]:
+        """Get the amount of every item that will be crafted or gathered
+        but not needed, in crafting order.
+        """
+        leftovers = {}
+        for item in self._items():
+            _, leftover = self.amounts(item)
+            if leftover > EPSILON:
+                leftovers[item] = leftover
+        return leftovers
 
-    raise NotImplementedError
\ No newline at end of file
+    def to_plan(self) -> CraftingPlan:
+        """Get the current state of the plan as a CraftingPlan."""
+        return CraftingPlan(self.ingredients(), self.leftovers())
@@ -0,0 +1,298 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import math
+from heapq import heappop, heappush
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from crafterlib import GameCraftingData
+from crafterlib.sparse import CSRMatrix
+from crafterlib._internal.craft_solver import EPSILON
+from crafterlib._internal.simplex import solve_covering_lp
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Cost of one craft, so that of two equally cheap plans, the one with
+# fewer crafts is picked. Small enough not to matter otherwise.
+CRAFT_COST = 1e-6
+
+class OptimalCraftingPlan(NamedTuple):
+    """The result of `make_optimal_crafting_plan`.
+
+    Attributes
+    ---
+    crafts : dict[int, float]
+        Number of crafts of every recipe used, by recipe id, in
+        crafting order.
+    gathered : dict[str, float]
+        Amount of every item to gather.
+    taken : dict[str, float]
+        Amount of every item taken from the inventory.
+    leftovers : dict[str, float]
+        Amount of every crafted or gathered item that isn't needed.
+    cost : float
+        Total cost of the gathered items.
+    solver : str
+        The solver used, "simplex" or "highs".
+    optimal : bool
+        False if the search for whole crafts was cut short (see
+        `MAX_BRANCH_SECONDS` of the bundled solver), in which case the
+        plan works, but may not be the cheapest.
+    """
+    crafts: Dict[int, float]
+    gathered: Dict[str, float]
+    taken: Dict[str, float]
+    leftovers: Dict[str, float]
+    cost: float
+    solver: str
+    optimal: bool
+
+def make_optimal_crafting_plan(game_data: GameCraftingData,
+                               products: Dict[str, float],
+                               inventory: Optional[Dict[str, float]] = None,
+                               costs: Optional[Dict[str, float]] = None,
+                               integer: bool = False,
+                               solver: str = "auto") -> Optional[OptimalCraftingPlan]:
+    """Find the cheapest way to craft a dict of desired products,
+    choosing between every alternative recipe of every item.
+
+    Unlike `make_crafting_plan`, which always uses the recipe of an item
+    in the item graph, every recipe in the game is considered, e.g. Gold
+    Ingots are smelted from Raw Gold instead of crafted from 9 Gold
+    Nuggets. Recipes with several products are taken into account too.
+
+    Crafting is solved as a linear program over the recipes that can
+    contribute to the products: the number of crafts of every recipe
+    and the gathered amount of every item are the variables, the total
+    cost of the gathered items is minimized, and for every item, the
+    amount crafted, gathered and taken from the inventory has to cover
+    the amount used. With `integer`, only whole crafts and whole items
+    are allowed, which makes it a mixed integer program.
+
+    The HiGHS solver of SciPy is used if SciPy is installed, otherwise
+    a bundled simplex solver. Either way NumPy is needed.
+
+    Parameters
+    ---
+    game_data : GameCraftingData
+        The game.
+    products : dict[str, float]
+        The desired products.
+    inventory : dict[str, float] | None
+        The items at hand, which are free to use.
+    costs : dict[str, float] | None
+        Cost of gathering one of an item. Items no recipe makes cost 1
+        by default, other items can't be gathered unless they are listed
+        here. Use `math.inf` for items that can't be gathered.
+    integer : bool
+        Only allow whole crafts and whole gathered items.
+    solver : str
+        "highs", "simplex" or "auto".
+
+    Return
+    ---
+    An OptimalCraftingPlan, or None if the products can't be crafted,
+    or with `integer`, if the search for whole crafts was cut short
+    before it found a plan. A plan is always found when the crafts of
+    the non-integer plan can be rounded up, e.g. if enough of every
+    basic item can be gathered.
+
+    Raises
+    ---
+    ImportError
+        If NumPy, or SciPy for "highs", isn't installed.
+    ValueError
+        If a cost is negative, or `solver` is unknown.
+    """
+    if np is None:
+        raise ImportError("make_optimal_crafting_plan needs NumPy, "
+                          "install it with `pip install crafterlib[numpy]`")
+    inventory = inventory or {}
+    costs = costs or {}
+    for item, cost in costs.items():
+        if cost < 0:
+            raise ValueError(f"Negative cost for {item}: {cost}")
+
+    # Every recipe that makes a desired product, or an ingredient of one
+    # of those recipes, and so on. Other recipes can't help.
+    recipe_graph = game_data.recipe_graph
+    recipe_numbers: List[int] = []
+    seen_recipes = set()
+    rows: Dict[str, int] = {}
+    pending = [item for item, amount in products.items() if amount > 0]
+    for item in pending:
+        rows.setdefault(item, len(rows))
+    while pending:
+        item = pending.pop()
+        for recipe_number, _ in recipe_graph.producers(item):
+            if recipe_number in seen_recipes:
+                continue
+            seen_recipes.add(recipe_number)
+            ingredients = list(recipe_graph.ingredients(recipe_number))
+            if not ingredients:
+                continue
+            recipe_numbers.append(recipe_number)
+            for ingredient, _ in ingredients:
+                if ingredient not in rows:
+                    rows[ingredient] = len(rows)
+                    pending.append(ingredient)
+
+    # Items that can be gathered, and their costs.
+    crafted = set()
+    for recipe_number in recipe_numbers:
+        crafted.update(item for item, _ in recipe_graph.products(recipe_number))
+    gatherable = [(item, costs.get(item, 1 if item not in crafted else math.inf)) for item in rows]
+    gatherable = [(item, cost) for item, cost in gatherable if cost < math.inf]
+
+    # The linear program, column by column: what every recipe makes and
+    # uses, and the gathered items.
+    num_recipes = len(recipe_numbers)
+    lp_columns = []
+    for recipe_number in recipe_numbers:
+        column: Dict[int, float] = {}
+        for item, amount in recipe_graph.products(recipe_number):
+            if item in rows:
+                column[rows[item]] = amount
+        for item, amount in recipe_graph.ingredients(recipe_number):
+            column[rows[item]] = column.get(rows[item], 0) - amount
+        lp_columns.append(column.items())
+    lp_columns.extend([(rows[item], 1)] for item, _ in gatherable)
+    columns = CSRMatrix.from_rows(lp_columns, len(rows))
+    b = np.array([products.get(item, 0) - inventory.get(item, 0) for item in rows], dtype=float)
+    c = np.array([CRAFT_COST] * num_recipes + [cost for _, cost in gatherable], dtype=float)
+    upper = np.full(len(c), math.inf)
+
+    # Without an inventory and by-products, the cheapest recipe for every
+    # item is the same no matter how much is crafted, which is a good
+    # first guess for the solver, and so are the unit costs with the
+    # inventory free for the dual prices of the items.
+    guess = np.full(len(rows), -1)
+    for item, (_, col) in _unit_costs(recipe_graph, recipe_numbers, gatherable, {}).items():
+        if item in rows:
+            guess[rows[item]] = col
+    price_guess = np.zeros(len(rows))
+    for item, (cost, _) in _unit_costs(recipe_graph, recipe_numbers, gatherable, inventory).items():
+        if item in rows:
+            price_guess[rows[item]] = cost
+    x, solver, optimal = solve_covering_lp(c, columns, b, upper, integer, solver, guess, price_guess)
+    if x is None:
+        return None
+
+    recipes = recipe_graph.recipes
+    runs = {recipe_numbers[col]: float(x[col]) for col in range(num_recipes) if x[col] > EPSILON}
+    gathered = {item: float(x[col]) for col, (item, _) in enumerate(gatherable, num_recipes)
+                if x[col] > EPSILON}
+
+    # Where every item comes from, and what is left over.
+    used = np.zeros(len(rows))
+    made = np.zeros(len(rows))
+    for recipe_number, runs_of_recipe in runs.items():
+        for item, amount in recipe_graph.ingredients(recipe_number):
+            used[rows[item]] += amount * runs_of_recipe
+        for item, amount in recipe_graph.products(recipe_number):
+            if item in rows:
+                made[rows[item]] += amount * runs_of_recipe
+    taken: Dict[str, float] = {}
+    leftovers: Dict[str, float] = {}
+    for item, row in rows.items():
+        need = products.get(item, 0) + used[row]
+        supply = made[row] + gathered.get(item, 0)
+        take = min(max(need - supply, 0), inventory.get(item, 0))
+        if take > EPSILON:
+            taken[item] = float(take)
+        if supply + take - need > EPSILON:
+            leftovers[item] = float(supply + take - need)
+
+    crafts = {recipes[recipe_number].id: runs[recipe_number]
+              for recipe_number in _crafting_order(recipe_graph, runs)}
+    total_cost = sum(gathered[item] * cost for item, cost in gatherable if item in gathered)
+    return OptimalCraftingPlan(crafts, gathered, taken, leftovers, total_cost, solver, optimal)
+
+def _unit_costs(recipe_graph,
+                recipe_numbers: List[int],
+                gatherable: List[Tuple[str, float]],
+                free: Dict[str, float]) -> Dict[str, Tuple[float, int]]:
+    """Get the cheapest way to make one of every item, as `(cost, column)`,
+    for the columns of the linear program, ignoring by-products and
+    with the items in `free` costing nothing.
+
+    Like the distances of Dijkstra's algorithm, an item's cost is final
+    once it is the cheapest item left, and a recipe is looked at once
+    the costs of all its ingredients are final.
+    """
+    num_recipes = len(recipe_numbers)
+    best: Dict[str, Tuple[float, int]] = {}
+    heap: List[Tuple[float, str]] = []
+    for col, (item, cost) in enumerate(gatherable, num_recipes):
+        best[item] = (0 if free.get(item, 0) > 0 else cost, col)
+        heappush(heap, (best[item][0], item))
+    for item, amount in free.items():
+        if amount > 0 and item not in best:
+            best[item] = (0, -1)
+            heappush(heap, (0, item))
+
+    waiting_for: List[int] = []
+    users: Dict[str, List[int]] = {}
+    for col, recipe_number in enumerate(recipe_numbers):
+        ingredients = [item for item, _ in recipe_graph.ingredients(recipe_number)]
+        waiting_for.append(len(ingredients))
+        for item in ingredients:
+            users.setdefault(item, []).append(col)
+
+    unit_costs: Dict[str, Tuple[float, int]] = {}
+    while heap:
+        cost, item = heappop(heap)
+        if item in unit_costs:
+            continue
+        unit_costs[item] = best[item]
+        for col in users.get(item, ()):
+            waiting_for[col] -= 1
+            if waiting_for[col]:
+                continue
+            recipe_number = recipe_numbers[col]
+            total = CRAFT_COST + sum(amount * unit_costs[ingredient][0]
+                                     for ingredient, amount in recipe_graph.ingredients(recipe_number))
+            for product, amount in recipe_graph.products(recipe_number):
+                if product not in unit_costs and total / amount < best.get(product, (math.inf,))[0]:
+                    best[product] = (total / amount, col)
+                    heappush(heap, (total / amount, product))
+    return unit_costs
+
+def _crafting_order(recipe_graph, recipe_numbers) -> List[int]:
+    """Sort recipes so that every recipe comes after the recipes making
+    its ingredients, as far as they don't form a cycle.
+    """
+    makers: Dict[str, List[int]] = {}
+    for recipe_number in recipe_numbers:
+        for item, _ in recipe_graph.products(recipe_number):
+            makers.setdefault(item, []).append(recipe_number)
+    waiting_for = {recipe_number: 0 for recipe_number in recipe_numbers}
+    unlocks: Dict[int, List[int]] = {}
+    for recipe_number in recipe_numbers:
+        for item, _ in recipe_graph.ingredients(recipe_number):
+            for maker in makers.get(item, ()):
+                if maker != recipe_number:
+                    waiting_for[recipe_number] += 1
+                    unlocks.setdefault(maker, []).append(recipe_number)
+
+    order: List[int] = []
+    ready = [recipe_number for recipe_number, count in waiting_for.items() if not count]
+    while len(order) < len(waiting_for):
+        if not ready:
+            # A cycle, start it anywhere.
+            ready.append(next(recipe_number for recipe_number, count in waiting_for.items()
+                              if count > 0))
+        recipe_number = ready.pop()
+        if waiting_for[recipe_number] < 0:
+            continue
+        waiting_for[recipe_number] = -1
+        order.append(recipe_number)
+        for consumer in unlocks.get(recipe_number, ()):
+            if waiting_for[consumer] > 0:
+                waiting_for[consumer] -= 1
+                if not waiting_for[consumer]:
+                    ready.append(consumer)
+    return order
@@ -2,12 +2,12 @@
 
 SPDX-License-Identifier: MIT
 """
-from typing import Iterable
+from typing import List
 from crafterlib import GameCraftingData
 
 def get_possible_products(game_data: GameCraftingData,
                           ingredient: str, 
-                          recursive: bool = False) -> Iterable[str]:
+                          recursive: bool = False) -> List[str]:
     """Get all possible items that can be crafted from
     a given ingredient.
 
@@ -20,9 +20,20 @@ def get_possible_products(game_data: GameCraftingData,
     Example: Starting with Planks, it is possible to craft Sticks. However,
     from Sticks, one can craft an Iron Pickaxe. So one can also say that
     Iron Pickaxe is a possible product of Planks.
+
+    With `recursive` set, products are listed in crafting order, and
+    `ingredient` itself is included if it can be crafted back from
+    its own products (see `get_recyclables`).
+
+    Returns an empty list if `ingredient` is not used in any recipe.
     """
-    graph = game_data.item_graph.graph
+    item_graph = game_data.item_graph
 
-    # TODO: Finish this implementation.
+    if recursive:
+        # The item graph's reachability index answers this without
+        # walking the whole graph on every call.
+        return item_graph.get_descendants(ingredient)
 
-    raise NotImplementedError
\ No newline at end of file
+    # Without `recursive`, the possible products are simply the
+    # items that directly use `ingredient`.
+    return list(item_graph.get_products_using(ingredient))
\ No newline at end of file
@@ -3,7 +3,6 @@
 SPDX-License-Identifier: MIT
 """
 from typing import List, Dict
-import networkx as nx
 from crafterlib import GameCraftingData
 
 def get_recipe_chain(game_data: GameCraftingData,
@@ -58,37 +57,37 @@ def get_recipe_chain(game_data: GameCraftingData,
     if ingredient == product:
         return None
 
-    graph = game_data.item_graph.graph
-
-    try:
-        # Dijkstra's algorithm gives us the shortest path between
-        # `ingredient` and `product`.
-        path = nx.dijkstra_path(graph, ingredient, product, weight="weight")
-    except nx.NodeNotFound:
-        # can happen if `ingredient` is not in the graph
-        return None
-    except nx.NetworkXNoPath:
-        # there is no way to get from `ingredient` to `product`
+    # The shortest path tree of `ingredient` (Dijkstra's algorithm, cached
+    # on the item graph) gives us the shortest path to `product`, and
+    # the id of the recipe for every step on it.
+    tree = game_data.item_graph.get_shortest_path_tree(ingredient)
+    hops = tree.hops_to(product) if tree is not None else None
+    if hops is None:
+        # `ingredient` is not in the graph, or there is
+        # no way to get from `ingredient` to `product`
         return None
 
     chain = []
 
-    # Loop through every product in the path and collect their recipes
-    for i, item in enumerate(path[1:]):
-        recipes = game_data.get_recipes_for_item(item)
-        for recipe in recipes:
-            recipe = recipe.to_dict()
+    # Loop through every step in the path and collect their recipes
+    for i, (previous, item, recipe_id) in enumerate(hops):
+        recipe = game_data.get_recipe_by_id(recipe_id) if recipe_id is not None else None
+        if recipe is None or previous not in recipe.ingredients:
+            # Unknown recipe, find the recipe with the previous
+            # product as an ingredient.
+            recipe = next((recipe for recipe in game_data.get_recipes_for_item(item)
+                           if previous in recipe.ingredients), None)
 
-            # Find the recipe with the previous product as an ingredient
-            # and create a short recipe with only `ingredients` and `products`
-            # and append it to the chain.
-            if path[i] in recipe['ingredients'].keys():
-                short_recipe = {
-                    "ingredients": recipe['ingredients'],
-                    "products": recipe['products']
-                }
-                chain.append(short_recipe)
-                break
+        # Create a short recipe with only `ingredients` and `products`
+        # and append it to the chain.
+        # The dicts are copied, since combining ingredients below
+        # modifies them and they belong to the recipe.
+        if recipe is not None:
+            short_recipe = {
+                "ingredients": dict(recipe.ingredients),
+                "products": dict(recipe.products)
+            }
+            chain.append(short_recipe)
         
         # If combine ingredients is set and there are more than one
         # recipe/step in the chain list.
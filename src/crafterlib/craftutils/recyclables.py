@@ -2,19 +2,23 @@
 
 SPDX-License-Identifier: MIT
 """
-from typing import Iterable
+from typing import List
 from crafterlib import GameCraftingData
 
-def get_recyclables(game_data: GameCraftingData) -> Iterable[str]:
+def get_recyclables(game_data: GameCraftingData) -> List[str]:
     """Get all possible items that can be "recycled"
     aka turned back into the same ingredients that they're
     crafted from.
 
     Example: Gold Nuggets can be turned into Gold Ingots,
     which can be turned back into Gold Nuggets.
-    """
-    graph = game_data.item_graph.graph
 
-    # TODO: Finish this implementation.
+    Items are returned in crafting order, with items that can be
+    turned into each other next to each other.
+    """
+    item_graph = game_data.item_graph
 
-    raise NotImplementedError
\ No newline at end of file
+    # An item can be recycled exactly when it lies on a cycle of the
+    # item graph. The graph caches its strongly connected components,
+    # so this doesn't traverse the graph again.
+    return item_graph.get_items_on_cycles()
\ No newline at end of file
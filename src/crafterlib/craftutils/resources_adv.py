@@ -12,9 +12,8 @@ def get_adv_resources(game_data: GameCraftingData) -> Iterable[str]:
     Example: Iron Pickaxe, since it is not used in any crafting
     recipes. However, Planks would not be an advanced resource,
     since it is used in many crafting recipes.
-    """
-    graph = game_data.item_graph.graph
-
-    # TODO: Finish this implementation.
 
-    raise NotImplementedError
\ No newline at end of file
+    The items are yielded lazily, in item graph order, from labels
+    that are worked out once, see `GameCraftingData.resource_classes`.
+    """
+    return game_data.resource_classes.advanced()
@@ -4,6 +4,7 @@ SPDX-License-Identifier: MIT
 """
 from typing import Dict, Iterable
 from crafterlib import GameCraftingData
+from crafterlib.graph import resource_classes
 
 def get_basic_resources(game_data: GameCraftingData) -> Iterable[str]:
     """
@@ -13,12 +14,11 @@ def get_basic_resources(game_data: GameCraftingData) -> Iterable[str]:
     Example: Dirt is a basic resource, since it is not possible
     to craft. However, Iron Pickaxe is not a basic resource,
     since it requires several intermediate crafting steps.
-    """
-    graph = game_data.item_graph.graph
 
-    # TODO: Finish this implementation.
-    
-    raise NotImplementedError
+    The items are yielded lazily, in item graph order, from labels
+    that are worked out once, see `GameCraftingData.resource_classes`.
+    """
+    return game_data.resource_classes.basic()
 
 def get_basic_resources_for(game_data: GameCraftingData,
                             item: str,
@@ -30,9 +30,18 @@ def get_basic_resources_for(game_data: GameCraftingData,
     from Planks. Planks can be crafted from Logs, and Logs cannot
     be crafted, only gathered.
     So Logs are a basic resource needed to craft an Iron Pickaxe.
-    """
-    graph = game_data.item_graph.graph
 
-    # TODO: Finish this implementation.
+    Amounts are per one item. Only the direct ingredients are looked
+    at, unless `recursive` is set, in which case the amounts are summed
+    over every intermediate crafting step, see
+    `ItemGraph.get_resource_breakdown`.
+    """
+    item_graph = game_data.item_graph
+    if not item_graph.has_item(item):
+        return {}
+    if recursive:
+        return dict(item_graph.get_resource_breakdown(item).basic)
 
-    raise NotImplementedError
\ No newline at end of file
+    classes = game_data.resource_classes
+    return {ingredient: amount for ingredient, amount in item_graph.get_recipe_for(item).items()
+            if classes.label_of(ingredient) == resource_classes.BASIC}
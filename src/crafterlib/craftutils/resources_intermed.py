@@ -4,6 +4,7 @@ SPDX-License-Identifier: MIT
 """
 from typing import Dict, Iterable
 from crafterlib import GameCraftingData
+from crafterlib.graph import resource_classes
 
 def get_intermed_resources(game_data: GameCraftingData) -> Iterable[str]:
     """Get a list of intermediate resources, which are resources
@@ -12,12 +13,11 @@ def get_intermed_resources(game_data: GameCraftingData) -> Iterable[str]:
 
     Example: Iron Ingot, since it is crafted from raw ingredients,
     and it is itself used in crafting recipes.
-    """
-    graph = game_data.item_graph.graph
-
-    # TODO: Finish this implementation.
 
-    raise NotImplementedError
+    The items are yielded lazily, in item graph order, from labels
+    that are worked out once, see `GameCraftingData.resource_classes`.
+    """
+    return game_data.resource_classes.intermediate()
 
 def get_intermed_resources_for(game_data: GameCraftingData,
                                item: str,
@@ -27,9 +27,18 @@ def get_intermed_resources_for(game_data: GameCraftingData,
     Example: Sticks are an intermediate ingredient for
     crafting a Torch, but Coal is a basic resource, so Coal
     would not be included.
-    """
-    graph = game_data.item_graph.graph
-
-    # TODO: Finish this implementation.
 
-    raise NotImplementedError
\ No newline at end of file
+    Amounts are per one item. Only the direct ingredients are looked
+    at, unless `recursive` is set, in which case the amounts are summed
+    over every intermediate crafting step, see
+    `ItemGraph.get_resource_breakdown`.
+    """
+    item_graph = game_data.item_graph
+    if not item_graph.has_item(item):
+        return {}
+    if recursive:
+        return dict(item_graph.get_resource_breakdown(item).intermediate)
+
+    classes = game_data.resource_classes
+    return {ingredient: amount for ingredient, amount in item_graph.get_recipe_for(item).items()
+            if classes.label_of(ingredient) == resource_classes.INTERMEDIATE}
@@ -3,6 +3,27 @@
 SPDX-License-Identifier: MIT
 """
 
-__all__ = ["ItemGraph"]
+__all__ = [
+    "ItemGraph",
+    "AddRecipesSummary",
+    "RecipeGraph",
+    "Condensation",
+    "ReachabilityIndex",
+    "BillOfMaterials",
+    "ResourceClasses",
+    "ResourceBreakdown",
+    "ShortestPathTree",
+    "GraphBackend",
+    "NetworkXBackend",
+    "CompactBackend",
+    "SubgraphView"
+]
 
-from .item_graph import ItemGraph
\ No newline at end of file
+from .backends import GraphBackend, NetworkXBackend, CompactBackend, SubgraphView
+from .condensation import Condensation
+from .reachability import ReachabilityIndex
+from .bom import BillOfMaterials
+from .resource_classes import ResourceBreakdown, ResourceClasses
+from .path_tree import ShortestPathTree
+from .item_graph import AddRecipesSummary, ItemGraph
+from .recipe_graph import RecipeGraph
\ No newline at end of file
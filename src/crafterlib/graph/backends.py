@@ -0,0 +1,519 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import networkx as nx
+
+from crafterlib.sparse import CSRMatrix, DATA_TYPECODE, INDEX_TYPECODE, INDPTR_TYPECODE
+
+__all__ = ["GraphBackend", "NetworkXBackend", "CompactBackend", "SubgraphView", "make_backend"]
+
+class GraphBackend(ABC):
+    """Storage for the weighted, directed item graph used by ItemGraph.
+
+    Nodes are item names. An edge `u -> v` with weight `w` means that
+    `w` of item `u` are needed to craft one `v`. There is at most one
+    edge between two nodes; adding it again replaces its weight.
+
+    Successors and predecessors are reported in the order in which
+    the edges were added.
+
+    `version` is increased by every change made through the backend,
+    so that derived data (see ItemGraph) can tell when it is stale.
+    """
+
+    version: int = 0
+
+    @abstractmethod
+    def add_nodes(self, nodes: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    def add_weighted_edges(self, edges: Iterable[Tuple[str, str, float]]) -> None:
+        """Add edges given as `(u, v, weight)` tuples, adding
+        their nodes as needed.
+        """
+
+    @abstractmethod
+    def has_node(self, node: str) -> bool:
+        ...
+
+    @abstractmethod
+    def nodes(self) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def number_of_nodes(self) -> int:
+        ...
+
+    @abstractmethod
+    def number_of_edges(self) -> int:
+        ...
+
+    @abstractmethod
+    def edges(self) -> Iterator[Tuple[str, str, float]]:
+        """Iterate over all edges as `(u, v, weight)` tuples."""
+
+    @abstractmethod
+    def successors(self, node: str) -> Iterator[Tuple[str, float]]:
+        """Iterate over `(v, weight)` for every edge `node -> v`."""
+
+    @abstractmethod
+    def predecessors(self, node: str) -> Iterator[Tuple[str, float]]:
+        """Iterate over `(u, weight)` for every edge `u -> node`."""
+
+    @abstractmethod
+    def edge_weight(self, u: str, v: str) -> Optional[float]:
+        """Get the weight of the edge `u -> v`, or None if there is none."""
+
+    @abstractmethod
+    def in_degree(self, node: str) -> int:
+        ...
+
+    @abstractmethod
+    def out_degree(self, node: str) -> int:
+        ...
+
+    @abstractmethod
+    def subgraph(self, nodes: Iterable[str]) -> "GraphBackend":
+        """Return a new backend of the same kind that contains only
+        `nodes` and the edges between them.
+        """
+
+    @abstractmethod
+    def to_networkx(self) -> nx.DiGraph:
+        """Return the graph as a networkx DiGraph with "weight" edge attributes."""
+
+    def add_edge(self, u: str, v: str, weight: float) -> None:
+        self.add_weighted_edges([(u, v, weight)])
+
+    def to_csr(self) -> Tuple[List[str], Dict[str, int], CSRMatrix]:
+        """Number the nodes and return the forward adjacency in CSR form.
+
+        Return
+        ---
+        `(names, index, forward)`: the node names by number, a map from
+        name to number, and a nodes x nodes matrix of edge weights.
+        Treat all three as read-only, they may be shared with the backend.
+        """
+        names = list(self.nodes())
+        index = {name: i for i, name in enumerate(names)}
+        rows = ([(index[v], weight) for v, weight in self.successors(u)] for u in names)
+        return names, index, CSRMatrix.from_rows(rows, len(names))
+
+    def shortest_path_tree(self, source: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """Run Dijkstra's algorithm from `source` to every node it reaches.
+        `source` must exist.
+
+        Return
+        ---
+        `(dist, pred)`: the total weight of the shortest path to every
+        reached node, and the node before it on that path. Ties are
+        broken as in `networkx.dijkstra_path`, so every backend
+        returns the same paths.
+        """
+        return self._dijkstra(source)
+
+    def _dijkstra(self, source: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        successors = self.successors
+        dist: Dict[str, float] = {}
+        seen: Dict[str, float] = {source: 0}
+        pred: Dict[str, str] = {}
+        counter = count()
+        fringe = [(0, next(counter), source)]
+        while fringe:
+            (d, _, node) = heappop(fringe)
+            if node in dist:
+                continue
+            dist[node] = d
+            for other, weight in successors(node):
+                other_dist = d + weight
+                if other in dist:
+                    continue
+                if other not in seen or other_dist < seen[other]:
+                    seen[other] = other_dist
+                    pred[other] = node
+                    heappush(fringe, (other_dist, next(counter), other))
+        return dist, pred
+
+class NetworkXBackend(GraphBackend):
+    """Backend that stores the graph in a `networkx.DiGraph`."""
+
+    def __init__(self, graph: Optional[nx.DiGraph] = None):
+        self.graph: nx.DiGraph = graph if graph is not None else nx.DiGraph()
+
+    def add_nodes(self, nodes: Iterable[str]) -> None:
+        self.graph.add_nodes_from(nodes)
+        self.version += 1
+
+    def add_weighted_edges(self, edges: Iterable[Tuple[str, str, float]]) -> None:
+        self.graph.add_weighted_edges_from(edges)
+        self.version += 1
+
+    def has_node(self, node: str) -> bool:
+        return node in self.graph
+
+    def nodes(self) -> Iterator[str]:
+        return iter(self.graph)
+
+    def number_of_nodes(self) -> int:
+        return self.graph.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.graph.number_of_edges()
+
+    def edges(self) -> Iterator[Tuple[str, str, float]]:
+        return iter(self.graph.edges(data="weight"))
+
+    def successors(self, node: str) -> Iterator[Tuple[str, float]]:
+        if node not in self.graph:
+            return iter(())
+        return ((v, data["weight"]) for v, data in self.graph._adj[node].items())
+
+    def predecessors(self, node: str) -> Iterator[Tuple[str, float]]:
+        if node not in self.graph:
+            return iter(())
+        return ((u, data["weight"]) for u, data in self.graph._pred[node].items())
+
+    def edge_weight(self, u: str, v: str) -> Optional[float]:
+        return self.graph.get_edge_data(u, v, {}).get("weight")
+
+    def in_degree(self, node: str) -> int:
+        return self.graph.in_degree(node) if node in self.graph else 0
+
+    def out_degree(self, node: str) -> int:
+        return self.graph.out_degree(node) if node in self.graph else 0
+
+    def subgraph(self, nodes: Iterable[str]) -> "NetworkXBackend":
+        return NetworkXBackend(self.graph.subgraph(nodes).copy())
+
+    def to_networkx(self) -> nx.DiGraph:
+        return self.graph
+
+def _group_edges(num_nodes: int,
+                 keys: array,
+                 others: array,
+                 weights: array,
+                 order: Iterable[int]) -> CSRMatrix:
+    """Group the edges listed in `order` by their `keys` node with a
+    stable counting sort, keeping the order of `order` within a group.
+    """
+    counts = [0] * (num_nodes + 1)
+    order = list(order)
+    for k in order:
+        counts[keys[k] + 1] += 1
+    for node in range(num_nodes):
+        counts[node + 1] += counts[node]
+
+    indices = array(INDEX_TYPECODE, bytes(len(order) * array(INDEX_TYPECODE).itemsize))
+    data = array(DATA_TYPECODE, bytes(len(order) * array(DATA_TYPECODE).itemsize))
+    next_slot = counts[:-1]
+    for k in order:
+        key = keys[k]
+        slot = next_slot[key]
+        indices[slot] = others[k]
+        data[slot] = weights[k]
+        next_slot[key] = slot + 1
+    return CSRMatrix((num_nodes, num_nodes), array(INDPTR_TYPECODE, counts), indices, data)
+
+class CompactBackend(GraphBackend):
+    """Backend that stores the graph as forward and reverse CSR
+    adjacency arrays with float weights.
+
+    Nodes are numbered densely in insertion order. Edges are appended
+    to flat arrays, and the two CSR structures are (re)built from them
+    on the first query after a change. This uses a small fraction of
+    the memory of a networkx graph and makes neighbor iteration cheap,
+    but single-edge insertions between queries are slow; add edges in
+    bulk where possible.
+    """
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._edge_sources = array(INDEX_TYPECODE)
+        self._edge_targets = array(INDEX_TYPECODE)
+        self._edge_weights = array(DATA_TYPECODE)
+        self._forward: Optional[CSRMatrix] = None
+        self._reverse: Optional[CSRMatrix] = None
+        # Held while the CSR structures are built, so that concurrent
+        # queries build them once and never see only one of them.
+        self._build_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Locks can't be pickled.
+        del state["_build_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._build_lock = threading.Lock()
+
+    def _node_id(self, node: str) -> int:
+        node_id = self._index.get(node)
+        if node_id is None:
+            node_id = len(self._names)
+            self._names.append(node)
+            self._index[node] = node_id
+        return node_id
+
+    def add_nodes(self, nodes: Iterable[str]) -> None:
+        count = len(self._names)
+        for node in nodes:
+            self._node_id(node)
+        if len(self._names) != count:
+            self._forward = self._reverse = None
+            self.version += 1
+
+    def add_weighted_edges(self, edges: Iterable[Tuple[str, str, float]]) -> None:
+        for u, v, weight in edges:
+            self._edge_sources.append(self._node_id(u))
+            self._edge_targets.append(self._node_id(v))
+            self._edge_weights.append(weight)
+            self._forward = self._reverse = None
+        self.version += 1
+
+    def _build(self) -> None:
+        num_nodes = len(self._names)
+        sources, targets, weights = self._edge_sources, self._edge_targets, self._edge_weights
+
+        # Re-adding an edge replaces its weight but keeps its position,
+        # so keep the first occurrence of every edge, with the last weight.
+        first_seen: Dict[Tuple[int, int], int] = {}
+        for k in range(len(sources)):
+            key = (sources[k], targets[k])
+            first = first_seen.setdefault(key, k)
+            if first != k:
+                weights[first] = weights[k]
+        if len(first_seen) != len(sources):
+            keep = sorted(first_seen.values())
+            self._edge_sources = sources = array(INDEX_TYPECODE, (sources[k] for k in keep))
+            self._edge_targets = targets = array(INDEX_TYPECODE, (targets[k] for k in keep))
+            self._edge_weights = weights = array(DATA_TYPECODE, (weights[k] for k in keep))
+
+        order = range(len(sources))
+        forward = _group_edges(num_nodes, sources, targets, weights, order)
+        # `_csr` checks `_forward`, so it is set last.
+        self._reverse = _group_edges(num_nodes, targets, sources, weights, order)
+        self._forward = forward
+
+    def _csr(self, forward: bool) -> CSRMatrix:
+        if self._forward is None:
+            with self._build_lock:
+                # Check again, another thread may have built them
+                # while we were waiting for the lock.
+                if self._forward is None:
+                    self._build()
+        return self._forward if forward else self._reverse
+
+    def _neighbors(self, node: str, forward: bool) -> Iterator[Tuple[str, float]]:
+        node_id = self._index.get(node)
+        if node_id is None:
+            return iter(())
+        names = self._names
+        return ((names[other], weight) for other, weight in self._csr(forward).row(node_id))
+
+    def has_node(self, node: str) -> bool:
+        return node in self._index
+
+    def nodes(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def number_of_nodes(self) -> int:
+        return len(self._names)
+
+    def number_of_edges(self) -> int:
+        return self._csr(True).nnz
+
+    def edges(self) -> Iterator[Tuple[str, str, float]]:
+        forward = self._csr(True)
+        names = self._names
+        for u in range(len(names)):
+            for v, weight in forward.row(u):
+                yield names[u], names[v], weight
+
+    def successors(self, node: str) -> Iterator[Tuple[str, float]]:
+        return self._neighbors(node, True)
+
+    def predecessors(self, node: str) -> Iterator[Tuple[str, float]]:
+        return self._neighbors(node, False)
+
+    def edge_weight(self, u: str, v: str) -> Optional[float]:
+        u_id = self._index.get(u)
+        v_id = self._index.get(v)
+        if u_id is None or v_id is None:
+            return None
+        for target, weight in self._csr(True).row(u_id):
+            if target == v_id:
+                return weight
+        return None
+
+    def _degree(self, node: str, forward: bool) -> int:
+        node_id = self._index.get(node)
+        if node_id is None:
+            return 0
+        indptr = self._csr(forward).indptr
+        return indptr[node_id + 1] - indptr[node_id]
+
+    def in_degree(self, node: str) -> int:
+        return self._degree(node, False)
+
+    def out_degree(self, node: str) -> int:
+        return self._degree(node, True)
+
+    def shortest_path_tree(self, source: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        dist, pred = self._dijkstra(self._index[source])
+        names = self._names
+        return ({names[node]: d for node, d in dist.items()},
+                {names[node]: names[other] for node, other in pred.items()})
+
+    def _dijkstra(self, source: int) -> Tuple[Dict[int, float], Dict[int, int]]:
+        # Same algorithm as GraphBackend._dijkstra, but on node ids
+        # and the raw CSR arrays, which is a lot faster.
+        forward = self._csr(True)
+        indptr, indices, data = forward.indptr, forward.indices, forward.data
+        dist: Dict[int, float] = {}
+        seen: Dict[int, float] = {source: 0}
+        pred: Dict[int, int] = {}
+        counter = count()
+        fringe = [(0, next(counter), source)]
+        while fringe:
+            (d, _, node) = heappop(fringe)
+            if node in dist:
+                continue
+            dist[node] = d
+            for k in range(indptr[node], indptr[node + 1]):
+                other = indices[k]
+                other_dist = d + data[k]
+                if other in dist:
+                    continue
+                if other not in seen or other_dist < seen[other]:
+                    seen[other] = other_dist
+                    pred[other] = node
+                    heappush(fringe, (other_dist, next(counter), other))
+        return dist, pred
+
+    def subgraph(self, nodes: Iterable[str]) -> "CompactBackend":
+        index = self._index
+        node_ids = sorted(index[node] for node in set(nodes) if node in index)
+        keep = set(node_ids)
+        reverse = self._csr(False)
+        names = self._names
+        backend = CompactBackend()
+        backend.add_nodes(names[node] for node in node_ids)
+        backend.add_weighted_edges(
+            (names[other], names[node], weight)
+            for node in node_ids
+            for other, weight in reverse.row(node)
+            if other in keep
+        )
+        return backend
+
+    def to_csr(self) -> Tuple[List[str], Dict[str, int], CSRMatrix]:
+        return self._names, self._index, self._csr(True)
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._names)
+        graph.add_weighted_edges_from(self.edges())
+        return graph
+
+class SubgraphView(GraphBackend):
+    """Read-only view of some nodes of another backend and the edges
+    between them.
+
+    Nothing is copied, so creating a view is O(number of nodes), and
+    changes to the underlying backend show through (edges only; the
+    set of nodes is fixed). Trying to modify the view raises
+    `networkx.NetworkXError`, like a networkx subgraph view.
+    """
+
+    def __init__(self, backend: GraphBackend, nodes: Iterable[str]):
+        self.backend = backend
+        self._nodes = dict.fromkeys(node for node in nodes if backend.has_node(node))
+
+    @property
+    def version(self) -> int:
+        return self.backend.version
+
+    def add_nodes(self, nodes: Iterable[str]) -> None:
+        raise nx.NetworkXError("Frozen graph can't be modified")
+
+    def add_weighted_edges(self, edges: Iterable[Tuple[str, str, float]]) -> None:
+        raise nx.NetworkXError("Frozen graph can't be modified")
+
+    def has_node(self, node: str) -> bool:
+        return node in self._nodes
+
+    def nodes(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def number_of_nodes(self) -> int:
+        return len(self._nodes)
+
+    def number_of_edges(self) -> int:
+        return sum(self.in_degree(node) for node in self._nodes)
+
+    def edges(self) -> Iterator[Tuple[str, str, float]]:
+        for v in self._nodes:
+            for u, weight in self.predecessors(v):
+                yield u, v, weight
+
+    def successors(self, node: str) -> Iterator[Tuple[str, float]]:
+        if node not in self._nodes:
+            return iter(())
+        nodes = self._nodes
+        return ((v, weight) for v, weight in self.backend.successors(node) if v in nodes)
+
+    def predecessors(self, node: str) -> Iterator[Tuple[str, float]]:
+        if node not in self._nodes:
+            return iter(())
+        nodes = self._nodes
+        return ((u, weight) for u, weight in self.backend.predecessors(node) if u in nodes)
+
+    def edge_weight(self, u: str, v: str) -> Optional[float]:
+        if u not in self._nodes or v not in self._nodes:
+            return None
+        return self.backend.edge_weight(u, v)
+
+    def in_degree(self, node: str) -> int:
+        return sum(1 for _ in self.predecessors(node))
+
+    def out_degree(self, node: str) -> int:
+        return sum(1 for _ in self.successors(node))
+
+    def subgraph(self, nodes: Iterable[str]) -> GraphBackend:
+        return self.backend.subgraph(node for node in nodes if node in self._nodes)
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._nodes)
+        graph.add_weighted_edges_from(self.edges())
+        return graph
+
+# Backends that can be selected by name.
+GRAPH_BACKENDS = {
+    "networkx": NetworkXBackend,
+    "compact": CompactBackend,
+}
+
+def make_backend(backend: str | GraphBackend | None) -> GraphBackend:
+    """Get a graph backend from a name ("networkx" or "compact"),
+    or return `backend` itself if it already is one. None selects
+    the default networkx backend.
+    """
+    if backend is None:
+        return NetworkXBackend()
+    if isinstance(backend, GraphBackend):
+        return backend
+    backend_type = GRAPH_BACKENDS.get(backend)
+    if backend_type is None:
+        raise ValueError(f"Unknown graph backend: {backend!r}")
+    return backend_type()
@@ -0,0 +1,172 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from crafterlib.graph.condensation import Condensation
+from crafterlib.sparse import CSRMatrix, DATA_TYPECODE, INDEX_TYPECODE, INDPTR_TYPECODE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+class BillOfMaterials:
+    """Total amount of every basic item needed for one unit of every
+    item, summed over all the ways the item is crafted from it.
+
+    Basic items are items without ingredients, plus the items of cycles
+    that aren't crafted from anything outside the cycle (e.g. Gold Nugget
+    and Gold Ingot, if neither has another recipe), since one of them
+    has to be obtained some other way.
+
+    The breakdown of an item is the sum of the breakdowns of its
+    ingredients, each times the amount of that ingredient needed. It is
+    computed for all items in one sweep over the condensation in
+    topological order, with NumPy if it is installed. Summing over all
+    paths doesn't converge around a cycle, so recipes between items of
+    the same cycle are only followed for one step.
+
+    Parameters
+    ---
+    condensation : Condensation
+        The condensation of the item graph.
+    forward : CSRMatrix
+        Adjacency matrix of the item graph, ingredient -> product, with
+        the same node numbers as `condensation`.
+
+    Attributes
+    ---
+    basic_items : list[str]
+        Every basic item, indexed by column number.
+    basic_index : dict[str, int]
+        Map from basic item to column number.
+    matrix : CSRMatrix
+        Items x basic items matrix of total amounts. Rows are node
+        numbers of `condensation`, columns are sorted within each row.
+    """
+
+    def __init__(self, condensation: Condensation, forward: CSRMatrix):
+        self.condensation = condensation
+        self.basic_items: List[str] = []
+        self.basic_index: Dict[str, int] = {}
+
+        names = condensation.names
+        component = condensation.component
+        reverse = forward.transpose()
+        r_indptr, r_indices, r_data = reverse.indptr, reverse.indices, reverse.data
+        combine = _combine_numpy if np is not None else _combine_python
+        rows: List[Optional[Tuple]] = [None] * len(names)
+
+        for comp in range(condensation.num_components):
+            members = condensation.member_nodes(comp)
+            if not len(condensation.predecessors(comp)):
+                for node in members:
+                    self.basic_index[names[node]] = len(self.basic_items)
+                    self.basic_items.append(names[node])
+                    rows[node] = combine([], len(self.basic_items) - 1)
+                continue
+
+            inner = []
+            for node in members:
+                parts = []
+                for k in range(r_indptr[node], r_indptr[node + 1]):
+                    other = r_indices[k]
+                    if component[other] != comp:
+                        parts.append((rows[other], r_data[k]))
+                    else:
+                        inner.append((node, other, r_data[k]))
+                rows[node] = combine(parts)
+            if inner:
+                # One step along the recipes inside the cycle, based on
+                # what the members get from outside of it.
+                outside = {node: rows[node] for node in members}
+                extra: Dict[int, list] = {}
+                for node, other, weight in inner:
+                    extra.setdefault(node, [(outside[node], 1.0)]).append((outside[other], weight))
+                for node, parts in extra.items():
+                    rows[node] = combine(parts)
+
+        self.matrix = _pack(rows, len(self.basic_items))
+
+    def is_basic(self, item: str) -> bool:
+        """Check whether `item` is a basic item."""
+        return item in self.basic_index
+
+    def get_breakdown(self, item: str) -> Dict[str, float]:
+        """Get the total amount of every basic item needed for one
+        `item`. A basic item is made of one of itself. Empty if `item`
+        is not in the graph.
+        """
+        node = self.condensation.index.get(item)
+        if node is None:
+            return {}
+        basic_items = self.basic_items
+        return {basic_items[col]: amount for col, amount in self.matrix.row(node)}
+
+    def get_amount(self, basic_item: str, product: str) -> Optional[float]:
+        """Get the total amount of `basic_item` needed for one `product`,
+        or None if `product` is not made from `basic_item` (or either
+        item is not in the graph).
+        """
+        col = self.basic_index.get(basic_item)
+        node = self.condensation.index.get(product)
+        if col is None or node is None:
+            return None
+        matrix = self.matrix
+        start, end = matrix.indptr[node], matrix.indptr[node + 1]
+        k = bisect_left(matrix.indices, col, start, end)
+        if k < end and matrix.indices[k] == col:
+            return matrix.data[k]
+        return None
+
+def _combine_python(parts, basic: Optional[int] = None) -> Tuple[List[int], List[float]]:
+    """Sum `(row, factor)` pairs into one row of `(columns, values)`
+    lists, or make the row of basic item number `basic`.
+    """
+    if basic is not None:
+        return [basic], [1.0]
+    if len(parts) == 1:
+        (cols, values), factor = parts[0]
+        return cols, [value * factor for value in values]
+    totals: Dict[int, float] = {}
+    for (cols, values), factor in parts:
+        for col, value in zip(cols, values):
+            totals[col] = totals.get(col, 0.0) + value * factor
+    cols = sorted(totals)
+    return cols, [totals[col] for col in cols]
+
+def _combine_numpy(parts, basic: Optional[int] = None):
+    """Like `_combine_python`, with NumPy arrays as rows."""
+    if basic is not None:
+        return np.array([basic], dtype=np.int32), np.ones(1)
+    if not parts:
+        return np.empty(0, dtype=np.int32), np.empty(0)
+    if len(parts) == 1:
+        (cols, values), factor = parts[0]
+        return cols, values * factor
+    cols, inverse = np.unique(np.concatenate([cols for (cols, _), _ in parts]),
+                              return_inverse=True)
+    values = np.concatenate([values * factor for (_, values), factor in parts])
+    return cols, np.bincount(inverse, weights=values, minlength=len(cols))
+
+def _pack(rows, num_cols: int) -> CSRMatrix:
+    """Pack the rows built by `_combine_*` into a CSRMatrix."""
+    indptr = array(INDPTR_TYPECODE, [0])
+    indices = array(INDEX_TYPECODE)
+    data = array(DATA_TYPECODE)
+    if np is not None:
+        lengths = np.fromiter((len(cols) for cols, _ in rows), dtype=np.int64, count=len(rows))
+        indptr.frombytes(np.cumsum(lengths).tobytes())
+        if rows:
+            indices.frombytes(np.concatenate([cols for cols, _ in rows]).astype(np.int32).tobytes())
+            data.frombytes(np.concatenate([values for _, values in rows]).astype(np.float64).tobytes())
+    else:
+        for cols, values in rows:
+            indices.extend(cols)
+            data.extend(values)
+            indptr.append(len(indices))
+    return CSRMatrix((len(rows), num_cols), indptr, indices, data)
@@ -0,0 +1,140 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from crafterlib.sparse import CSRMatrix, INDEX_TYPECODE, INDPTR_TYPECODE
+from crafterlib._internal.scc import strongly_connected_components
+
+def _csr_indices(rows: Iterable[Iterable[int]]) -> Tuple[array, array]:
+    """Pack rows of integers into CSR `(indptr, indices)` arrays."""
+    indptr = array(INDPTR_TYPECODE, [0])
+    indices = array(INDEX_TYPECODE)
+    for row in rows:
+        indices.extend(row)
+        indptr.append(len(indices))
+    return indptr, indices
+
+class Condensation:
+    """The condensation of an item graph.
+
+    Every strongly connected component (SCC), i.e. every maximal set
+    of items that can all be crafted from each other, is contracted
+    into one node. The result is a DAG.
+
+    Components are numbered in topological order: if an item of
+    component `a` is an ingredient of an item of component `b != a`,
+    then `a < b`.
+
+    Attributes
+    ---
+    names : list[str]
+        Every item, indexed by node number.
+    index : dict[str, int]
+        Map from item to node number.
+    component : array
+        Component number of every node.
+    num_components : int
+        Number of components.
+    """
+
+    def __init__(self, names: List[str], index: Dict[str, int], forward: CSRMatrix):
+        self.names = names
+        self.index = index
+        num_nodes = len(names)
+        self.component, self.num_components = strongly_connected_components(
+            num_nodes, forward.indptr, forward.indices)
+        component = self.component
+        num_components = self.num_components
+
+        # Members of every component, in node order.
+        members: List[List[int]] = [[] for _ in range(num_components)]
+        for node in range(num_nodes):
+            members[component[node]].append(node)
+        self._member_indptr, self._members = _csr_indices(members)
+        # Common case, no cycles at all.
+        self._singletons = num_components == num_nodes
+
+        # A component is cyclic if it has more than one member, or
+        # its single member is an ingredient of itself.
+        self.cyclic = bytearray(num_components)
+        successors: List[List[int]] = []
+        f_indptr, f_indices = forward.indptr, forward.indices
+        for comp, comp_members in enumerate(members):
+            if len(comp_members) > 1:
+                self.cyclic[comp] = 1
+            targets = set()
+            for node in comp_members:
+                for k in range(f_indptr[node], f_indptr[node + 1]):
+                    other = component[f_indices[k]]
+                    if other != comp:
+                        targets.add(other)
+                    else:
+                        self.cyclic[comp] = 1
+            successors.append(sorted(targets))
+        self._dag_indptr, self._dag_indices = _csr_indices(successors)
+
+        predecessors: List[List[int]] = [[] for _ in range(num_components)]
+        for comp, targets in enumerate(successors):
+            for other in targets:
+                predecessors[other].append(comp)
+        self._rdag_indptr, self._rdag_indices = _csr_indices(predecessors)
+
+    def component_of(self, item: str) -> Optional[int]:
+        """Get the component number of `item`, or None if it is not in the graph."""
+        node = self.index.get(item)
+        return None if node is None else self.component[node]
+
+    def member_nodes(self, comp: int) -> array:
+        """Get the node numbers of the members of component `comp`."""
+        return self._members[self._member_indptr[comp]:self._member_indptr[comp + 1]]
+
+    def members(self, comp: int) -> List[str]:
+        """Get the items in component `comp`."""
+        names = self.names
+        return [names[node] for node in self.member_nodes(comp)]
+
+    def expand(self, comps: Iterable[int]) -> List[str]:
+        """Get the items of all components in `comps`, in that order."""
+        names, members, member_indptr = self.names, self._members, self._member_indptr
+        if self._singletons:
+            return [names[members[comp]] for comp in comps]
+        return [names[members[k]] for comp in comps
+                for k in range(member_indptr[comp], member_indptr[comp + 1])]
+
+    def topological_order(self) -> List[str]:
+        """Get all items in crafting order: every item comes after all
+        items it is crafted from, except for items on a common cycle,
+        which are next to each other.
+        """
+        return self.expand(range(self.num_components))
+
+    def component_depths(self) -> array:
+        """Get the crafting depth of every component: 0 if none of its
+        items has ingredients outside the component, otherwise one more
+        than the deepest component it is directly crafted from.
+        """
+        depths = array("i", [0]) * self.num_components
+        indptr, indices = self._rdag_indptr, self._rdag_indices
+        # Predecessors have lower numbers, so they are done first.
+        for comp in range(self.num_components):
+            start, end = indptr[comp], indptr[comp + 1]
+            if start != end:
+                depths[comp] = 1 + max(depths[other] for other in indices[start:end])
+        return depths
+
+    def is_cyclic(self, comp: int) -> bool:
+        """Check whether the items of component `comp` can be crafted
+        from themselves, i.e. lie on a cycle.
+        """
+        return bool(self.cyclic[comp])
+
+    def successors(self, comp: int) -> array:
+        """Get the components that directly use items of `comp`."""
+        return self._dag_indices[self._dag_indptr[comp]:self._dag_indptr[comp + 1]]
+
+    def predecessors(self, comp: int) -> array:
+        """Get the components that items of `comp` are directly crafted from."""
+        return self._rdag_indices[self._rdag_indptr[comp]:self._rdag_indptr[comp + 1]]
@@ -2,19 +2,404 @@
 
 SPDX-License-Identifier: MIT
 """
-from typing import Dict, List, Iterable, Optional
-import math
+import logging
+from typing import Any, Callable, Dict, List, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
 import networkx as nx
 from crafterlib import Recipe
+from crafterlib.graph.backends import GraphBackend, NetworkXBackend, SubgraphView, make_backend
+from crafterlib.graph.bom import BillOfMaterials
+from crafterlib.graph.condensation import Condensation
+from crafterlib.graph.path_tree import ShortestPathTree
+from crafterlib.graph.reachability import ReachabilityIndex
+from crafterlib.graph.resource_classes import BASIC, ResourceBreakdown, ResourceClasses
+from crafterlib.sparse import CSRMatrix
+from crafterlib._internal.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bounds of the cache of shortest path trees, in trees and in total
+# number of reached items over all cached trees.
+PATH_TREE_CACHE_ENTRIES = 64
+PATH_TREE_CACHE_ITEMS = 2_000_000
+
+# Bounds of the cache of resource breakdowns, in breakdowns and in total
+# number of resources over all cached breakdowns.
+BREAKDOWN_CACHE_ENTRIES = 4096
+BREAKDOWN_CACHE_ITEMS = 1_000_000
+
+class AddRecipesSummary(NamedTuple):
+    """What `ItemGraph.add_recipes` did.
+
+    Attributes
+    ---
+    added : int
+        Number of recipes that were added for at least one product.
+    edges : int
+        Number of ingredient edges inserted.
+    skipped : list[tuple[Recipe, str]]
+        `(recipe, product)` for every product that was skipped
+        because another recipe already covered it.
+    """
+    added: int
+    edges: int
+    skipped: List[Tuple[Recipe, str]]
 
 class ItemGraph:
-    def __init__(self, graph: Optional[nx.DiGraph] = None):
-        self.graph: nx.DiGraph = graph if graph else nx.DiGraph()
+    """Weighted, directed graph of items.
+
+    There is an edge `ingredient -> product` for every ingredient of
+    the recipe that covers `product`, weighted by the amount of the
+    ingredient needed per one product.
+
+    The graph is stored in a GraphBackend, which can be selected with
+    `backend`: "networkx" (the default) keeps a `networkx.DiGraph`,
+    "compact" keeps CSR adjacency arrays, which take much less memory
+    and are faster to traverse. All methods of ItemGraph work the same
+    on either backend.
+
+    Structures derived from the graph, such as the reachability index,
+    are computed on first use and cached until the graph changes.
+
+    Parameters
+    ---
+    graph : nx.DiGraph | None
+        An existing graph to wrap. Implies the networkx backend.
+    backend : str | GraphBackend | None
+        "networkx", "compact" or a GraphBackend instance.
+    """
+
+    def __init__(self,
+                 graph: Optional[nx.DiGraph] = None,
+                 backend: str | GraphBackend | None = None):
+        if graph is not None:
+            if backend is not None:
+                raise ValueError("Pass either graph or backend, not both")
+            backend = NetworkXBackend(graph)
+        self.backend: GraphBackend = make_backend(backend)
+        # Id of the recipe that covers every product, see add_recipes.
+        self._recipe_ids: Dict[str, int] = {}
+        self._cache: Dict[str, Any] = {}
+        self._cache_version: Optional[int] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Derived structures are cheap to rebuild compared to storing them.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        state["_cache_version"] = None
+        return state
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        """The graph as a `networkx.DiGraph`.
+
+        With the networkx backend this is the underlying graph itself.
+        If you modify it directly, call `clear_caches()` afterwards.
+        With any other backend, it is a new copy on every access, so
+        prefer the methods of ItemGraph where possible.
+        """
+        return self.backend.to_networkx()
+
+    def _cached(self, name: str, build: Callable[[], Any]) -> Any:
+        """Get a structure derived from the graph, building it if the
+        graph has changed since it was last built.
+        """
+        version = self.backend.version
+        if self._cache_version != version:
+            self._cache = {}
+            self._cache_version = version
+        value = self._cache.get(name)
+        if value is None:
+            value = build()
+            self._cache[name] = value
+        return value
+
+    def clear_caches(self) -> None:
+        """Drop all cached derived structures. Only needed after
+        modifying `graph` directly, changes made through ItemGraph
+        are detected automatically.
+        """
+        self._cache = {}
+        self._cache_version = None
+
+    def to_csr(self) -> Tuple[List[str], Dict[str, int], CSRMatrix]:
+        """Get the graph in CSR form, see `GraphBackend.to_csr`. Built
+        once and shared by the structures derived from it.
+        """
+        return self._cached("csr", self.backend.to_csr)
+
+    def get_condensation(self) -> Condensation:
+        """Get the condensation of the graph, i.e. the DAG of its strongly
+        connected components, see Condensation.
+        """
+        return self._cached("condensation", lambda: Condensation(*self.to_csr()))
+
+    def get_strongly_connected_components(self) -> List[List[str]]:
+        """Get the strongly connected components of the graph, i.e. the
+        groups of items that can all be crafted from each other, in
+        crafting order. Most items form a component on their own.
+        """
+        condensation = self.get_condensation()
+        return [condensation.members(comp) for comp in range(condensation.num_components)]
+
+    def get_topological_order(self) -> List[str]:
+        """Get all items in crafting order: every item comes after the
+        items it is crafted from, except for items on a common cycle
+        (e.g. Gold Nugget and Gold Ingot), which are next to each other.
+        """
+        return list(self._cached("topological_order", self.get_condensation().topological_order))
+
+    def get_crafting_depth(self, item: str) -> Optional[int]:
+        """Get the crafting depth (tier) of `item`: 0 for items that are
+        not crafted from anything, otherwise one more than the deepest
+        of its ingredients. Items on a common cycle share one depth.
+
+        Return
+        ---
+        The depth, or None if `item` is not in the graph.
+        """
+        condensation = self.get_condensation()
+        comp = condensation.component_of(item)
+        if comp is None:
+            return None
+        return self._cached("depths", condensation.component_depths)[comp]
+
+    def has_cycles(self) -> bool:
+        """Check whether any item can be crafted (back) from itself."""
+        return any(self.get_condensation().cyclic)
+
+    def get_items_on_cycles(self) -> List[str]:
+        """Get every item that can be crafted back from its own products,
+        in crafting order.
+        """
+        condensation = self.get_condensation()
+        return condensation.expand(comp for comp in range(condensation.num_components)
+                                   if condensation.cyclic[comp])
+
+    def get_reachability_index(self) -> ReachabilityIndex:
+        """Get the reachability index of the graph, see ReachabilityIndex."""
+        return self._cached("reachability", lambda: ReachabilityIndex(self.get_condensation()))
+
+    def can_reach(self, source: str, target: str) -> bool:
+        """Check whether `source` can be crafted into `target`, directly
+        or through intermediate items. An item always reaches itself.
+        """
+        return self.get_reachability_index().can_reach(source, target)
+
+    def get_descendants(self, item: str) -> List[str]:
+        """Get every item that can be crafted from `item`, directly or
+        indirectly, in crafting order. `item` itself is included only if
+        it can be crafted back from its own products.
+        """
+        return self.get_reachability_index().descendants(item)
+
+    def get_ancestors(self, item: str) -> List[str]:
+        """Get every item that `item` can be crafted from, directly or
+        indirectly, in crafting order. `item` itself is included only if
+        it can be crafted back from its own products.
+        """
+        return self.get_reachability_index().ancestors(item)
+
+    def get_shortest_path_tree(self, source: str) -> Optional[ShortestPathTree]:
+        """Get the cheapest paths from `source` to every item it can be
+        crafted into, or None if `source` is not in the graph.
+
+        The tree is computed on first use, and the most recently used
+        trees are kept until the graph changes, so repeated queries
+        from the same item only take time proportional to the path.
+        """
+        if not self.has_item(source):
+            return None
+        trees = self._cached("path_trees", lambda: LRUCache(
+            max_entries=PATH_TREE_CACHE_ENTRIES, max_size=PATH_TREE_CACHE_ITEMS, sizeof=len))
+        tree = trees.get(source)
+        if tree is None:
+            dist, pred = self.backend.shortest_path_tree(source)
+            tree = ShortestPathTree(source, dist, pred, self._recipe_ids)
+            trees.put(source, tree)
+        return tree
+
+    def get_recipe_id_for(self, item: str) -> Optional[int]:
+        """Get the id of the recipe that `item` is crafted with in this
+        graph, or None if it isn't known (e.g. the graph was not built
+        with add_recipes).
+        """
+        return self._recipe_ids.get(item)
+
+    def get_bill_of_materials(self) -> BillOfMaterials:
+        """Get the total amounts of basic items needed for every item,
+        see BillOfMaterials.
+        """
+        return self._cached(
+            "bill_of_materials",
+            lambda: BillOfMaterials(self.get_condensation(), self.to_csr()[2]))
+
+    def get_resource_classes(self) -> ResourceClasses:
+        """Get every item labelled basic, intermediate, advanced or
+        isolated, see ResourceClasses.
+        """
+        return self._cached("resource_classes", lambda: ResourceClasses(*self.to_csr()))
+
+    def get_resource_breakdown(self, item: str) -> Optional[ResourceBreakdown]:
+        """Get the total amount of every basic and every intermediate
+        resource (see ResourceClasses) needed to craft one `item`, or
+        None if `item` is not in the graph.
+
+        Breakdowns are worked out bottom-up in topological order, each
+        from the breakdowns of the ingredients, and the most recently
+        used ones are kept until the graph changes. So a repeated query
+        is a lookup, and a new one only expands the ingredients whose
+        breakdowns aren't cached.
+
+        Items are told apart by their ResourceClasses labels, like the
+        non-recursive queries do, so the items of a cycle that isn't
+        crafted from anything outside it (e.g. Gold Ingot <-> Gold
+        Nugget) are intermediate resources, and add no basic ones.
+        Recipes inside a cycle are only followed for one step, like in
+        BillOfMaterials, which makes `basic` the same as
+        `get_basic_breakdown` without the items of such cycles.
+        """
+        breakdowns = self._cached("resource_breakdowns", lambda: LRUCache(
+            max_entries=BREAKDOWN_CACHE_ENTRIES, max_size=BREAKDOWN_CACHE_ITEMS,
+            sizeof=lambda breakdown: len(breakdown.basic) + len(breakdown.intermediate)))
+        breakdown = breakdowns.get(item)
+        if breakdown is not None or not self.has_item(item):
+            return breakdown
+
+        condensation = self.get_condensation()
+        classes = self.get_resource_classes()
+        backend = self.backend
+
+        def component_of(item: str) -> int:
+            return condensation.component[condensation.index[item]]
+
+        def is_basic(item: str) -> bool:
+            return classes.label_of(item) == BASIC
+
+        # Walk down the recipes until cached breakdowns or basic
+        # resources. Breakdowns found on the way are kept here, in case
+        # the cache evicts them before they are used.
+        known: Dict[str, ResourceBreakdown] = {}
+        # Items to work out, by component. A cycle is worked out as a
+        # whole, since its members need each other's breakdowns.
+        missing: Dict[int, List[str]] = {}
+        pending: List[str] = []
+
+        def add_missing(item: str) -> None:
+            comp = component_of(item)
+            missing[comp] = condensation.members(comp) if condensation.is_cyclic(comp) else [item]
+            pending.extend(missing[comp])
+
+        add_missing(item)
+        while pending:
+            product = pending.pop()
+            for ingredient, _ in backend.predecessors(product):
+                if ingredient in known or is_basic(ingredient) or component_of(ingredient) in missing:
+                    continue
+                breakdown = breakdowns.get(ingredient)
+                if breakdown is not None:
+                    known[ingredient] = breakdown
+                else:
+                    add_missing(ingredient)
+
+        # Ingredients come before their products.
+        for comp in sorted(missing):
+            outside: Dict[str, ResourceBreakdown] = {}
+            inner = []
+            for product in missing[comp]:
+                breakdown = ResourceBreakdown({}, {})
+                for ingredient, amount in backend.predecessors(product):
+                    if is_basic(ingredient):
+                        breakdown.basic[ingredient] = breakdown.basic.get(ingredient, 0) + amount
+                    elif component_of(ingredient) == comp:
+                        inner.append((product, ingredient, amount))
+                    else:
+                        _add_breakdown(breakdown, ingredient, known[ingredient], amount)
+                outside[product] = breakdown
+            if inner:
+                # One step along the recipes inside the cycle, based on
+                # what the members get from outside of it.
+                rows = {product: ResourceBreakdown(dict(breakdown.basic), dict(breakdown.intermediate))
+                        for product, breakdown in outside.items()}
+                for product, ingredient, amount in inner:
+                    _add_breakdown(rows[product], ingredient, outside[ingredient], amount)
+                outside = rows
+            for product, breakdown in outside.items():
+                known[product] = breakdown
+                breakdowns.put(product, breakdown)
+        return known[item]
+
+    def get_basic_breakdown(self, item: str) -> Dict[str, float]:
+        """Get the total amount of every basic item (e.g. raw resources)
+        needed to craft one `item`, over all of its intermediate recipes.
+        Empty if `item` is not in the graph.
+        """
+        return self.get_bill_of_materials().get_breakdown(item)
+
+    def get_total_amount(self, ingredient: str, product: str) -> Optional[float]:
+        """Get the total amount of `ingredient` needed to craft one
+        `product`, summed over every way `ingredient` goes into it
+        through intermediate recipes.
+
+        For an `ingredient` without a recipe of its own this is a
+        lookup in the bill of materials. For any other ingredient, the
+        items between the two are walked in Python, which takes time
+        linear in the size of the graph.
+
+        Return
+        ---
+        The amount (1 if both are the same item), or None if either
+        item is missing or `product` can't be crafted from `ingredient`.
+        """
+        if not self.has_item(ingredient) or not self.has_item(product):
+            return None
+        if ingredient == product:
+            return 1.0
+        if self.in_degree(ingredient) == 0:
+            # A plain lookup for items that aren't crafted themselves.
+            amount = self.get_bill_of_materials().get_amount(ingredient, product)
+            if amount is not None:
+                return amount
+        if not self.can_reach(ingredient, product):
+            return None
+        amount = self._sum_over_paths(ingredient, product)
+        if amount:
+            return amount
+
+        # `ingredient` only gets into `product` around a cycle, which
+        # the sum doesn't follow. Use the cheapest path instead.
+        path = self.shortest_path(ingredient, product)
+        amount = 1.0
+        for edge in zip(path, path[1:]):
+            amount *= self.get_amount(*edge)
+        return amount
+
+    def _sum_over_paths(self, ingredient: str, product: str) -> float:
+        """Sum the amount of `ingredient` needed for one `product` over
+        all paths between them. Recipes inside a cycle are only followed
+        directly from `ingredient`, like in BillOfMaterials.
+        """
+        condensation = self.get_condensation()
+        component, index = condensation.component, condensation.index
+        on_the_way = set(self.get_ancestors(product))
+        on_the_way.add(product)
+
+        amounts = {ingredient: 1.0}
+        for item in self.get_descendants(ingredient):
+            if item == ingredient or item not in on_the_way:
+                continue
+            item_comp = component[index[item]]
+            total = 0.0
+            for other, weight in self.backend.predecessors(item):
+                amount = amounts.get(other)
+                if amount is not None and (other == ingredient or component[index[other]] < item_comp):
+                    total += amount * weight
+            amounts[item] = total
+        return amounts[product]
 
     def add_items(self, items: Iterable[str]):
-        self.graph.add_nodes_from(items)
+        self.backend.add_nodes(items)
 
-    def add_recipes(self, recipes: Iterable[Recipe]):
+    def add_recipes(self, recipes: Iterable[Recipe]) -> AddRecipesSummary:
         """Add new recipes to the collection.
 
         This function will only accept recipes for items
@@ -22,43 +407,131 @@ class ItemGraph:
         For example, say there is a recipe "2x Brick -> Pillar" and
         "3x Stone -> Pillar" then only the first recipe will be added,
         the second will be ignored.
+
+        Skipped recipes are logged at DEBUG level and listed in the
+        returned summary.
         """
+        # Outputs covered by earlier calls have ingredients in the graph,
+        # outputs covered by this call are tracked in `covered`. Edges
+        # are collected and added in one batch at the end, since some
+        # backends (e.g. "compact") are slow to query between insertions.
+        backend = self.backend
+        recipe_ids = self._recipe_ids
+        edges: List[Tuple[str, str, float]] = []
+        covered: Set[str] = set()
+        skipped: List[Tuple[Recipe, str]] = []
+        added = 0
         for recipe in recipes:
+            recipe_added = False
             for output, output_count in recipe.products.items():
-                if self.get_recipe_for(output):
+                if output in covered or backend.in_degree(output) > 0:
                     # If the collection already contains a recipe
                     # for this particular output, skip, our collection
                     # already "covers" this item.
-                    print(f"warning: skipping {recipe} because there was already a recipe for {output} in the database")
+                    skipped.append((recipe, output))
                     continue
 
                 for ingredient, input_count in recipe.ingredients.items():
-                    inputs_per_output = input_count / output_count
-                    self.graph.add_edge(ingredient,
-                                        output,
-                                        weight=inputs_per_output)
+                    edges.append((ingredient, output, input_count / output_count))
+                if recipe.ingredients:
+                    covered.add(output)
+                    recipe_ids[output] = recipe.id
+                recipe_added = True
+            added += recipe_added
+        backend.add_weighted_edges(edges)
+
+        if skipped:
+            if logger.isEnabledFor(logging.DEBUG):
+                for recipe, output in skipped:
+                    logger.debug("skipping %s because there was already a recipe for %s",
+                                 recipe, output)
+            logger.info("skipped %d recipe outputs that already had a recipe", len(skipped))
+        return AddRecipesSummary(added, len(edges), skipped)
 
     def num_items(self) -> int:
-        return self.graph.number_of_nodes()
-    
+        return self.backend.number_of_nodes()
+
+    def num_edges(self) -> int:
+        return self.backend.number_of_edges()
+
+    def has_item(self, item: str) -> bool:
+        return self.backend.has_node(item)
+
+    def items(self) -> Iterator[str]:
+        return self.backend.nodes()
+
+    def edges(self) -> Iterator[Tuple[str, str, float]]:
+        """Iterate over all edges as `(ingredient, product, amount)` tuples."""
+        return self.backend.edges()
+
     def get_recipe_for(self, item: str) -> Dict[str, float]:
-        ingredients: Dict[str, float] = {}
-        for (ingredient, _, amount) in self.graph.in_edges(item, "weight"):
-            ingredients[ingredient] = amount
-        return ingredients
-    
-    def get_reverse_reachable_subgraph(self, item: str) -> "ItemGraph":
+        """Get the amount of every ingredient needed per one `item`."""
+        return dict(self.backend.predecessors(item))
+
+    def get_products_using(self, item: str) -> Dict[str, float]:
+        """Get every product that uses `item` as an ingredient, with
+        the amount of `item` needed per one product.
+        """
+        return dict(self.backend.successors(item))
+
+    def get_amount(self, ingredient: str, product: str) -> Optional[float]:
+        """Get the amount of `ingredient` directly needed per one `product`,
+        or None if `ingredient` is not an ingredient of `product`.
+        """
+        return self.backend.edge_weight(ingredient, product)
+
+    def in_degree(self, item: str) -> int:
+        """Get the number of ingredients of `item`."""
+        return self.backend.in_degree(item)
+
+    def out_degree(self, item: str) -> int:
+        """Get the number of products that use `item`."""
+        return self.backend.out_degree(item)
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Get the path from `source` to `target` with the smallest
+        total amount, using Dijkstra's algorithm.
+
+        Ties are broken the same way as `networkx.dijkstra_path`, so
+        both backends return the same path. The path is read off the
+        cached shortest path tree of `source`, see get_shortest_path_tree.
+
+        Return
+        ---
+        The list of items on the path, including `source` and `target`,
+        or None if either item is missing or there is no path.
+        """
+        if not self.has_item(source) or not self.has_item(target):
+            return None
+        return self.get_shortest_path_tree(source).path_to(target)
+
+    def get_reverse_reachable_subgraph(self, item: str, copy: bool = True) -> "ItemGraph":
         """Get the subgraph induced by the set of all nodes
         that can reach `item`.
+
+        By default, the result is an independent, modifiable copy.
+        Pass `copy=False` to get a read-only view of this graph
+        instead, which is cheap to create. The `graph` of a view is
+        a new networkx graph on every access.
         """
-        graph_reversed = nx.reverse(self.graph, copy=False)
-        can_reach_item = nx.descendants(graph_reversed, item)
-        can_reach_item.add(item)
-        return ItemGraph(self.graph.subgraph(can_reach_item).copy())
-    
+        if not self.has_item(item):
+            raise nx.NetworkXError(f"The node {item} is not in the digraph.")
+        can_reach_item = self.get_ancestors(item)
+        if item not in can_reach_item:
+            can_reach_item.append(item)
+        if copy:
+            subgraph = ItemGraph(backend=self.backend.subgraph(can_reach_item))
+            subgraph._recipe_ids = {item: self._recipe_ids[item] for item in can_reach_item
+                                    if item in self._recipe_ids}
+        else:
+            subgraph = ItemGraph(backend=SubgraphView(self.backend, can_reach_item))
+            subgraph._recipe_ids = self._recipe_ids
+        return subgraph
+
     def draw_item_graph(self):
-        nx.draw_networkx(self.graph, nx.spring_layout(self.graph, weight="weight"))
-    
+        graph = self.graph
+        nx.draw_networkx(graph, nx.spring_layout(graph, weight="weight"))
+
     def avg_unique_ingredients_per_item(self) -> float:
         """Get the average number of unique ingredients per item.
 
@@ -69,7 +542,7 @@ class ItemGraph:
         """
         # TODO: Finish this implementation.
         raise NotImplementedError
-    
+
     def avg_ingredient_amount(self) -> float:
         """Get the average ingredient amount.
 
@@ -80,7 +553,7 @@ class ItemGraph:
         """
         # TODO: Finish this implementation.
         raise NotImplementedError
-    
+
     def max_ingredient_amount(self) -> float:
         """Get the max ingredient amount.
 
@@ -89,13 +562,7 @@ class ItemGraph:
         0.25x Planks -> 1x Sticks,
         then the max ingredient amount would be 3.
         """
-
-        if self.graph.number_of_edges() == 0:
-            return 0
-        connections = []
-        for edge in self.graph.edges(data=True):
-            connections.append(self.graph.get_edge_data(*edge)["weight"])
-        return max(connections)
+        return max((amount for _, _, amount in self.edges()), default=0)
 
     def min_ingredient_amount(self) -> float:
         """Get the min ingredient amount.
@@ -105,15 +572,17 @@ class ItemGraph:
         0.25x Planks -> 1x Sticks,
         then the min ingredient amount would be 0.25.
         """
+        return min((amount for _, _, amount in self.edges()), default=0)
 
-        if self.graph.number_of_edges() == 0:
-            return 0 
-        connections = []
-        for edge in self.graph.edges(data=True):
-            connections.append(self.graph.get_edge_data(*edge)["weight"])
-        return min(connections)
-   
-
-
-
-
+def _add_breakdown(target: ResourceBreakdown,
+                   ingredient: str,
+                   breakdown: ResourceBreakdown,
+                   amount: float) -> None:
+    """Add `amount` of the intermediate resource `ingredient`, and
+    everything it is made of, to `target`.
+    """
+    target.intermediate[ingredient] = target.intermediate.get(ingredient, 0) + amount
+    for resource, inner_amount in breakdown.basic.items():
+        target.basic[resource] = target.basic.get(resource, 0) + amount * inner_amount
+    for resource, inner_amount in breakdown.intermediate.items():
+        target.intermediate[resource] = target.intermediate.get(resource, 0) + amount * inner_amount
@@ -0,0 +1,75 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from typing import Dict, List, Optional, Tuple
+
+class ShortestPathTree:
+    """The cheapest paths from one item to every item it can be crafted
+    into, as found by a single run of Dijkstra's algorithm.
+
+    Every reached item stores the item before it on its path, so any
+    path is read off in time proportional to its length. The paths are
+    the same as `networkx.dijkstra_path` would return.
+
+    Parameters
+    ---
+    source : str
+        The item all paths start from.
+    dist : dict[str, float]
+        Total weight of the path to every reached item.
+    pred : dict[str, str]
+        The item before every reached item (except `source`) on its path.
+    recipe_ids : dict[str, int]
+        Id of the recipe every item is crafted with, if known.
+    """
+
+    __slots__ = ("source", "_dist", "_pred", "_recipe_ids")
+
+    def __init__(self,
+                 source: str,
+                 dist: Dict[str, float],
+                 pred: Dict[str, str],
+                 recipe_ids: Dict[str, int]):
+        self.source = source
+        self._dist = dist
+        self._pred = pred
+        self._recipe_ids = recipe_ids
+
+    def __len__(self) -> int:
+        """The number of reached items, including `source`."""
+        return len(self._dist)
+
+    def reaches(self, target: str) -> bool:
+        return target in self._dist
+
+    def distance(self, target: str) -> Optional[float]:
+        """Get the total weight of the path to `target`, or None if
+        there is no path.
+        """
+        return self._dist.get(target)
+
+    def path_to(self, target: str) -> Optional[List[str]]:
+        """Get the items on the path from `source` to `target`,
+        including both, or None if there is no path.
+        """
+        if target not in self._dist:
+            return None
+        pred = self._pred
+        path = [target]
+        while path[-1] != self.source:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return path
+
+    def hops_to(self, target: str) -> Optional[List[Tuple[str, str, Optional[int]]]]:
+        """Get `(ingredient, product, recipe id)` for every step on the
+        path from `source` to `target`, or None if there is no path.
+        The recipe id is None if it isn't known.
+        """
+        path = self.path_to(target)
+        if path is None:
+            return None
+        recipe_ids = self._recipe_ids
+        return [(ingredient, product, recipe_ids.get(product))
+                for ingredient, product in zip(path, path[1:])]
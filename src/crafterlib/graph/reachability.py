@@ -0,0 +1,169 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import random
+from array import array
+from typing import List
+
+from crafterlib.graph.condensation import Condensation
+
+# Number of independent interval labelings. More labelings reject
+# more unreachable pairs without a search, at O(components) memory each.
+DEFAULT_NUM_LABELINGS = 2
+
+class ReachabilityIndex:
+    """Answers reachability queries on an item graph, i.e. "can item A
+    be crafted (directly or indirectly) into item B?".
+
+    The index works on the condensation of the graph, so items in the
+    same strongly connected component share all their answers. Every
+    component gets a topological rank and a few interval labels
+    (GRAIL, Yildirim et al. 2010): for each labeling, a depth-first
+    traversal of the DAG in random order assigns each component the
+    interval `[lowest post-order number below it, its own post-order
+    number]`. If `a` reaches `b`, the interval of `b` is contained in
+    that of `a`, so most unreachable pairs are rejected in O(1), and
+    the remaining ones only search the part of the DAG whose labels
+    still allow reaching `b`.
+
+    The index takes O(components) memory, unlike a transitive closure,
+    which grows quadratically on deep crafting trees.
+    """
+
+    def __init__(self,
+                 condensation: Condensation,
+                 num_labelings: int = DEFAULT_NUM_LABELINGS,
+                 seed: int = 0):
+        self.condensation = condensation
+        rng = random.Random(seed)
+        self._low: List[array] = []
+        self._post: List[array] = []
+        for _ in range(num_labelings):
+            low, post = self._make_labeling(rng)
+            self._low.append(low)
+            self._post.append(post)
+
+    def _make_labeling(self, rng: random.Random):
+        condensation = self.condensation
+        num_components = condensation.num_components
+        low = array("i", [0]) * num_components
+        post = array("i", [0]) * num_components
+        visited = bytearray(num_components)
+        counter = 0
+
+        roots = [comp for comp in range(num_components) if not condensation.predecessors(comp)]
+        rng.shuffle(roots)
+        for root in roots:
+            visited[root] = 1
+            children = list(condensation.successors(root))
+            rng.shuffle(children)
+            work = [(root, children, 0)]
+            lowest = [num_components]
+            while work:
+                comp, children, k = work[-1]
+                if k < len(children):
+                    work[-1] = (comp, children, k + 1)
+                    child = children[k]
+                    if visited[child]:
+                        if low[child] < lowest[-1]:
+                            lowest[-1] = low[child]
+                        continue
+                    visited[child] = 1
+                    grandchildren = list(condensation.successors(child))
+                    rng.shuffle(grandchildren)
+                    work.append((child, grandchildren, 0))
+                    lowest.append(num_components)
+                else:
+                    work.pop()
+                    post[comp] = counter
+                    low[comp] = min(lowest.pop(), counter)
+                    counter += 1
+                    if lowest and low[comp] < lowest[-1]:
+                        lowest[-1] = low[comp]
+        return low, post
+
+    def _may_reach(self, source: int, target: int) -> bool:
+        # False if `source` certainly can't reach `target`. Components
+        # are numbered topologically, so edges only go to higher numbers.
+        if source > target:
+            return False
+        for low, post in zip(self._low, self._post):
+            if low[target] < low[source] or post[target] > post[source]:
+                return False
+        return True
+
+    def component_reaches(self, source: int, target: int) -> bool:
+        """Check whether component `source` reaches component `target`.
+        A component always reaches itself.
+        """
+        if source == target:
+            return True
+        if not self._may_reach(source, target):
+            return False
+        condensation = self.condensation
+        seen = {source}
+        stack = [source]
+        while stack:
+            for comp in condensation.successors(stack.pop()):
+                if comp == target:
+                    return True
+                if comp not in seen and self._may_reach(comp, target):
+                    seen.add(comp)
+                    stack.append(comp)
+        return False
+
+    def can_reach(self, source: str, target: str) -> bool:
+        """Check whether there is a path from item `source` to item
+        `target`. An item always reaches itself. False if either
+        item is not in the graph.
+        """
+        condensation = self.condensation
+        source_comp = condensation.component_of(source)
+        target_comp = condensation.component_of(target)
+        if source_comp is None or target_comp is None:
+            return False
+        return self.component_reaches(source_comp, target_comp)
+
+    def _closure(self, item: str, forward: bool) -> List[str]:
+        condensation = self.condensation
+        start = condensation.component_of(item)
+        if start is None:
+            return []
+        if forward:
+            indptr, indices = condensation._dag_indptr, condensation._dag_indices
+        else:
+            indptr, indices = condensation._rdag_indptr, condensation._rdag_indices
+
+        seen = bytearray(condensation.num_components)
+        seen[start] = 1
+        found = []
+        stack = [start]
+        while stack:
+            comp = stack.pop()
+            for other in indices[indptr[comp]:indptr[comp + 1]]:
+                if not seen[other]:
+                    seen[other] = 1
+                    found.append(other)
+                    stack.append(other)
+        # The own component is included if the item lies on a cycle.
+        if condensation.cyclic[start]:
+            found.append(start)
+
+        # Component numbers are a topological order.
+        found.sort()
+        return condensation.expand(found)
+
+    def descendants(self, item: str) -> List[str]:
+        """Get every item that can be crafted from `item`, directly or
+        indirectly, in topological (crafting) order. `item` itself is
+        only included if it lies on a cycle.
+        """
+        return self._closure(item, True)
+
+    def ancestors(self, item: str) -> List[str]:
+        """Get every item that `item` can be crafted from, directly or
+        indirectly, in topological (crafting) order. `item` itself is
+        only included if it lies on a cycle.
+        """
+        return self._closure(item, False)
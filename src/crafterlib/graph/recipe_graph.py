@@ -0,0 +1,143 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import networkx as nx
+from crafterlib import Recipe
+from crafterlib.sparse import CSRMatrix
+
+class RecipeGraph:
+    """Bipartite graph of items and recipes.
+
+    Unlike ItemGraph, which keeps one recipe per item, every recipe is
+    a node here, with an edge from each of its ingredients and an edge
+    to each of its products, weighted by the amount per craft. So all
+    alternative recipes for an item are visible.
+
+    Recipes are numbered by their position in `recipes` and items by
+    their position in `item_names`. The edges are stored as four
+    sparse matrices, recipe -> ingredients, recipe -> products and
+    their transposes item -> consuming recipes and item -> producing
+    recipes, so every lookup takes time proportional to the number
+    of neighbors.
+
+    Parameters
+    ---
+    item_names : list[str]
+        Every item name mentioned by `recipes`.
+    recipes : list[Recipe]
+        The recipes.
+    ingredient_matrix : CSRMatrix
+        Recipes x items matrix of ingredient amounts.
+    product_matrix : CSRMatrix
+        Recipes x items matrix of product amounts.
+    item_index : dict[str, int] | None
+        Map from item name to position in `item_names`. Built from
+        `item_names` if not given.
+    """
+
+    def __init__(self,
+                 item_names: List[str],
+                 recipes: List[Recipe],
+                 ingredient_matrix: CSRMatrix,
+                 product_matrix: CSRMatrix,
+                 item_index: Optional[Dict[str, int]] = None):
+        self.item_names = item_names
+        self.recipes = recipes
+        self.item_index = item_index if item_index is not None else \
+            {item_name: i for i, item_name in enumerate(item_names)}
+        self.ingredient_matrix = ingredient_matrix
+        self.product_matrix = product_matrix
+        self.consumer_matrix = ingredient_matrix.transpose()
+        self.producer_matrix = product_matrix.transpose()
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe]) -> "RecipeGraph":
+        """Build a RecipeGraph over all items mentioned as an
+        ingredient or product of `recipes`.
+        """
+        recipes = list(recipes)
+        item_index: Dict[str, int] = {}
+        for recipe in recipes:
+            for item_name in (*recipe.ingredients, *recipe.products):
+                item_index.setdefault(item_name, len(item_index))
+
+        def matrix(field: str) -> CSRMatrix:
+            rows = (
+                [(item_index[item_name], amount) for item_name, amount in getattr(recipe, field).items()]
+                for recipe in recipes
+            )
+            return CSRMatrix.from_rows(rows, len(item_index))
+
+        return cls(list(item_index), recipes, matrix("ingredients"), matrix("products"), item_index)
+
+    def num_items(self) -> int:
+        return len(self.item_names)
+
+    def num_recipes(self) -> int:
+        return len(self.recipes)
+
+    def num_edges(self) -> int:
+        return self.ingredient_matrix.nnz + self.product_matrix.nnz
+
+    def has_item(self, item: str) -> bool:
+        return item in self.item_index
+
+    def _item_row(self, matrix: CSRMatrix, item: str) -> Iterator[Tuple[int, float]]:
+        item_id = self.item_index.get(item)
+        if item_id is None:
+            return iter(())
+        return matrix.row(item_id)
+
+    def producers(self, item: str) -> Iterator[Tuple[int, float]]:
+        """Iterate over `(recipe number, amount produced per craft)`
+        for every recipe that has `item` as a product.
+        """
+        return self._item_row(self.producer_matrix, item)
+
+    def consumers(self, item: str) -> Iterator[Tuple[int, float]]:
+        """Iterate over `(recipe number, amount consumed per craft)`
+        for every recipe that has `item` as an ingredient.
+        """
+        return self._item_row(self.consumer_matrix, item)
+
+    def get_recipes_for(self, item: str) -> List[Recipe]:
+        """Get every recipe that produces `item`."""
+        return [self.recipes[recipe] for recipe, _ in self.producers(item)]
+
+    def get_recipes_using(self, item: str) -> List[Recipe]:
+        """Get every recipe that uses `item` as an ingredient."""
+        return [self.recipes[recipe] for recipe, _ in self.consumers(item)]
+
+    def ingredients(self, recipe: int) -> Iterator[Tuple[str, float]]:
+        """Iterate over `(item, amount per craft)` for every
+        ingredient of recipe number `recipe`.
+        """
+        item_names = self.item_names
+        return ((item_names[item], amount) for item, amount in self.ingredient_matrix.row(recipe))
+
+    def products(self, recipe: int) -> Iterator[Tuple[str, float]]:
+        """Iterate over `(item, amount per craft)` for every
+        product of recipe number `recipe`.
+        """
+        item_names = self.item_names
+        return ((item_names[item], amount) for item, amount in self.product_matrix.row(recipe))
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Return the graph as a networkx DiGraph.
+
+        Item nodes are item names, recipe nodes are `("recipe", recipe.id)`
+        tuples. Nodes have a "bipartite" attribute, 0 for items and 1
+        for recipes, and edges have a "weight" attribute.
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.item_names, bipartite=0)
+        for recipe_number, recipe in enumerate(self.recipes):
+            node = ("recipe", recipe.id)
+            graph.add_node(node, bipartite=1)
+            graph.add_weighted_edges_from(
+                (item, node, amount) for item, amount in self.ingredients(recipe_number))
+            graph.add_weighted_edges_from(
+                (node, item, amount) for item, amount in self.products(recipe_number))
+        return graph
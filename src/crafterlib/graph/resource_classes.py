@@ -0,0 +1,97 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from crafterlib.sparse import CSRMatrix
+
+# Labels of ResourceClasses.
+BASIC = 0
+INTERMEDIATE = 1
+ADVANCED = 2
+ISOLATED = 3
+
+class ResourceBreakdown(NamedTuple):
+    """The result of `ItemGraph.get_resource_breakdown`. Treat both
+    dicts as read-only, they are shared with the cache.
+
+    Attributes
+    ---
+    basic : dict[str, float]
+        Total amount of every basic resource needed for one item.
+    intermediate : dict[str, float]
+        Total amount of every intermediate resource needed for one item.
+    """
+    basic: Dict[str, float]
+    intermediate: Dict[str, float]
+
+class ResourceClasses:
+    """Every item of an item graph labelled by how it is used in
+    crafting, from the degrees of its node:
+
+    * basic (BASIC): can't be crafted, but is an ingredient, e.g. Logs
+    * intermediate (INTERMEDIATE): can be crafted, and is an
+      ingredient, e.g. Planks
+    * advanced (ADVANCED): can be crafted, but is no ingredient,
+      e.g. Iron Pickaxe
+    * isolated (ISOLATED): neither, e.g. an item without recipes
+
+    All labels are computed in one pass over the adjacency arrays of
+    the graph, in O(items + edges).
+
+    Parameters
+    ---
+    names : list[str]
+        Every item, indexed by node number.
+    index : dict[str, int]
+        Map from item to node number.
+    forward : CSRMatrix
+        Adjacency matrix of the item graph, ingredient -> product.
+
+    Attributes
+    ---
+    labels : bytearray
+        Label of every item, indexed by node number.
+    """
+
+    def __init__(self, names: List[str], index: Dict[str, int], forward: CSRMatrix):
+        self.names = names
+        self.index = index
+        num_nodes = len(names)
+        indptr = forward.indptr
+        crafted = bytearray(num_nodes)
+        for node in forward.indices:
+            crafted[node] = 1
+        labels = bytearray(num_nodes)
+        for node in range(num_nodes):
+            used = indptr[node + 1] > indptr[node]
+            if crafted[node]:
+                labels[node] = INTERMEDIATE if used else ADVANCED
+            else:
+                labels[node] = BASIC if used else ISOLATED
+        self.labels = labels
+
+    def label_of(self, item: str) -> Optional[int]:
+        """Get the label of `item`, or None if it is not in the graph."""
+        node = self.index.get(item)
+        return self.labels[node] if node is not None else None
+
+    def items(self, label: int) -> Iterator[str]:
+        """Iterate over the items with `label`, in node order."""
+        names = self.names
+        for node, node_label in enumerate(self.labels):
+            if node_label == label:
+                yield names[node]
+
+    def basic(self) -> Iterator[str]:
+        return self.items(BASIC)
+
+    def intermediate(self) -> Iterator[str]:
+        return self.items(INTERMEDIATE)
+
+    def advanced(self) -> Iterator[str]:
+        return self.items(ADVANCED)
+
+    def isolated(self) -> Iterator[str]:
+        return self.items(ISOLATED)
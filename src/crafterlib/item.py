@@ -2,9 +2,12 @@
 
 SPDX-License-Identifier: MIT
 """
+import copy
 from typing import Dict, Set, Any
 
 class Item:
+    __slots__ = ("id", "name", "sources")
+
     def __init__(self,
                  id: int,
                  name: str,
@@ -18,7 +21,7 @@ class Item:
         return {
             "id": self.id,
             "name": self.name,
-            "sources": self.sources
+            "sources": copy.copy(self.sources)
         }
 
     @classmethod
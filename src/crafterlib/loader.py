@@ -2,107 +2,423 @@
 
 SPDX-License-Identifier: MIT
 """
+import bz2
+import gzip
 import importlib.resources as resources
+import io
 import json
-from pathlib import Path
+import logging
+import lzma
+import sys
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
 from types import NoneType
-from typing import Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 from crafterlib.recipe import Recipe
 from crafterlib.item import Item
 from crafterlib.crafting_grid import CraftingGrid
 from crafterlib.crafting_data import GameCraftingData
+from crafterlib.snapshot import compute_fingerprint, snapshot_path_for, load_snapshot, save_snapshot
+from crafterlib._internal.cache import CacheStats, LRUCache
+from crafterlib._internal.filestamp import file_stamp
+from crafterlib._internal.jsonstream import iter_json_array, iter_json_lines
+from crafterlib._internal.singleflight import SingleFlight
 
-_crafting_data_cache: Dict[str, GameCraftingData] = {}
+logger = logging.getLogger(__name__)
 
-def load_data_for_game(
-    game: str,
-    root_dir: str | Path | NoneType = None,
-) -> GameCraftingData:
-    """Load item and crafting data for the specified game.
+DEFAULT_CACHE_MAX_ENTRIES = 32
+
+# Rough per-object overheads used by `_estimate_size` for
+# graph nodes and edges, as (node bytes, edge bytes) per backend.
+_GRAPH_BYTES = {
+    "networkx": (400, 500),
+    "compact": (120, 60),
+}
+
+def _estimate_size(crafting_data: GameCraftingData) -> int:
+    """Estimate the memory used by `crafting_data`, in bytes.
+
+    This only needs to be accurate enough to compare datasets
+    against each other for cache eviction.
+    """
+    size = sys.getsizeof(crafting_data)
+    for item in crafting_data.items:
+        size += sys.getsizeof(item) + sys.getsizeof(item.name) + sys.getsizeof(item.sources)
+    for recipe in crafting_data.recipes:
+        size += sys.getsizeof(recipe)
+        for field in (recipe.requirements, recipe.ingredients, recipe.products):
+            size += sys.getsizeof(field) + sum(sys.getsizeof(key) for key in field)
+    for crafting_grid in crafting_data.crafting_grids:
+        size += (sys.getsizeof(crafting_grid)
+                 + sys.getsizeof(crafting_grid.products)
+                 + sys.getsizeof(crafting_grid.crafting_coordinates))
+    # The item graph may not have been built yet, so estimate its size
+    # from the number of items and recipe ingredients instead.
+    node_bytes, edge_bytes = _GRAPH_BYTES[crafting_data.graph_backend]
+    size += len(crafting_data.items) * node_bytes
+    size += sum(len(recipe.ingredients) for recipe in crafting_data.recipes) * edge_bytes
+    return size
+
+# Keys are (resolved data folder, fingerprint of the data files, graph backend).
+_crafting_data_cache: LRUCache[Tuple[str, str, str], GameCraftingData] = LRUCache(
+    max_entries=DEFAULT_CACHE_MAX_ENTRIES,
+    sizeof=_estimate_size,
+)
+
+# Parsed root.json of every data folder loaded so far, by resolved
+# data folder, with the stamp of the root.json it was parsed from.
+_root_json_cache: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+
+# Makes sure that concurrent loads of the same data only parse it once.
+_load_flights: SingleFlight[Tuple[str, str, str], GameCraftingData] = SingleFlight()
+
+def configure_cache(max_entries: Optional[int] = DEFAULT_CACHE_MAX_ENTRIES,
+                    max_bytes: Optional[int] = None) -> None:
+    """Set the limits of the loaded data cache.
 
     Parameters
-    --- 
-    game : str
-        The id of the game to load data for, example "minecraft".
-    root_dir : str | Path | None
-        Path to the root directory to search for the game data
-        folder. If this is None, then crafterlib will search its
-        built-in data for the game.
+    ---
+    max_entries : int | None
+        Maximum number of datasets to keep, or None for no limit.
+    max_bytes : int | None
+        Maximum approximate memory used by all cached datasets,
+        or None for no limit.
+
+    When a limit is exceeded, the least recently loaded
+    datasets are evicted first.
+    """
+    _crafting_data_cache.resize(max_entries, max_bytes)
+
+def invalidate_cache(game: str, root_dir: str | Path | NoneType = None) -> int:
+    """Drop all cached data for a game, so that the next call to
+    `load_data_for_game` with the same arguments loads it again.
 
     Return
-    --- 
-    A GameCraftingData object containing item and recipe
-    data for the game.
+    ---
+    The number of dropped cache entries.
     """
-    cache_entry = _crafting_data_cache.get(game)
-    if cache_entry is not None:
-        return cache_entry
+    data_dir = _location_key(_data_dir_location(game, root_dir))
+    _root_json_cache.pop(data_dir, None)
+    return _crafting_data_cache.invalidate_where(lambda key: key[0] == data_dir)
 
-    if root_dir is not None:
-        subdir = Path(root_dir) / "games/" / game
-    else:
-        subdir = resources.files("crafterlib").joinpath("data", "games", game)
+def clear_cache() -> None:
+    """Drop all cached data for all games."""
+    _root_json_cache.clear()
+    _crafting_data_cache.clear()
 
-    if not subdir.is_dir():
-        raise NotADirectoryError(f"No data folder for game {game}")
-    
-    items = []
-    recipes = []
-    crafting_grids = []
+def get_cache_stats() -> CacheStats:
+    """Get hit, miss and eviction counters, as well as the number
+    of entries and their approximate size in bytes, for the
+    loaded data cache.
+    """
+    return _crafting_data_cache.stats()
 
-    def recipe_handler(recipe_json):
-        if not isinstance(recipe_json, list):
-            raise ValueError("Top-level JSON value must be an array")
+def _data_dir_location(game: str, root_dir: str | Path | NoneType):
+    if root_dir is not None:
+        return Path(root_dir).resolve() / "games" / game
+    return resources.files("crafterlib").joinpath("data", "games", game)
 
-        recipes.extend(Recipe.from_dict(obj) for obj in recipe_json if isinstance(obj, dict))
-    
-    def item_handler(item_json):
-        if not isinstance(item_json, list):
-            raise ValueError("Top-level JSON value must be an array")
+def _location_key(subdir) -> str:
+    # Folders inside zip archives print with a trailing slash.
+    return str(subdir).rstrip("/")
 
-        items.extend(Item.from_dict(obj) for obj in item_json if isinstance(obj, dict))
+def _is_zip_archive(root_dir: str | Path | NoneType) -> bool:
+    return root_dir is not None and Path(root_dir).is_file() and zipfile.is_zipfile(root_dir)
 
-    def crafting_grid_handler(crafting_grid_json):
-        if not isinstance(crafting_grid_json, list):
-            raise ValueError("Top-level JSON value must be an array")
+@contextmanager
+def _open_data_dir(game: str, root_dir: str | Path | NoneType) -> Iterator[Any]:
+    """Find the data folder for `game`.
+
+    `root_dir` may be a folder or a zip archive with the same layout.
+    An archive is opened once and stays open until the context exits.
+    """
+    if _is_zip_archive(root_dir):
+        with zipfile.ZipFile(Path(root_dir).resolve()) as archive:
+            subdir = zipfile.Path(archive, f"games/{game}/")
+            # zipfile.Path.is_dir() is true for any path ending in "/",
+            # so check that the folder actually exists as well.
+            if not (subdir.exists() and subdir.is_dir()):
+                raise NotADirectoryError(f"No data folder for game {game}")
+            yield subdir
+        return
 
-        crafting_grids.extend(CraftingGrid.from_dict(obj) for obj in crafting_grid_json if isinstance(obj, dict))
+    subdir = _data_dir_location(game, root_dir)
+    if not subdir.is_dir():
+        raise NotADirectoryError(f"No data folder for game {game}")
+    yield subdir
 
+def _read_root_json(subdir, game: str) -> Dict[str, Any]:
     root_json_path = subdir / "root.json"
-    if not root_json_path.exists():
+    if not root_json_path.is_file():
         raise Exception(f"No root.json found in data folder for {game}")
 
     with root_json_path.open("r", encoding="utf-8") as fp:
-        root_data = json.load(fp)
+        return json.load(fp)
 
-    game_name = root_data.get("game", game)
-    item_files = root_data.get("item_files", [])
-    recipe_files = root_data.get("recipe_files", [])
-    crafting_grid_files = root_data.get("crafting_grid_files", [])
+def _read_root_json_cached(subdir, game: str) -> Dict[str, Any]:
+    """Like `_read_root_json`, but only parses root.json again if it
+    changed since the last load of `subdir`. Treat the result as
+    read-only, it is shared between loads.
+    """
+    root_json_path = subdir / "root.json"
+    if not root_json_path.is_file():
+        return _read_root_json(subdir, game)
 
-    for filename in item_files:
-        file_path = subdir / filename
-        with file_path.open("r", encoding="utf-8") as fp:
-            item_data = json.load(fp)
+    location = _location_key(subdir)
+    stamp = file_stamp(root_json_path)
+    cached = _root_json_cache.get(location)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    root_data = _read_root_json(subdir, game)
+    _root_json_cache[location] = (stamp, root_data)
+    return root_data
 
-        item_handler(item_data)
+# Which class each list of data files in root.json is parsed into.
+_RECORD_TYPES = {
+    "item_files": Item,
+    "recipe_files": Recipe,
+    "crafting_grid_files": CraftingGrid,
+}
 
-    for filename in recipe_files:
-        file_path = subdir / filename
-        with file_path.open("r", encoding="utf-8") as fp:
-            recipe_data = json.load(fp)
+# Data files with these suffixes are read as JSON Lines,
+# i.e. one record per line instead of one top-level array.
+_JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+def _iter_records(fp: TextIO, filename: str, streaming: bool) -> Iterable[Any]:
+    """Iterate over the raw records of a data file."""
+    if filename.endswith(_JSON_LINES_SUFFIXES):
+        return iter_json_lines(fp)
+    if streaming:
+        return iter_json_array(fp)
+
+    data = json.load(fp)
+    if not isinstance(data, list):
+        raise ValueError("Top-level JSON value must be an array")
+    return data
 
-        recipe_handler(recipe_data)
+# Data files with these suffixes are decompressed while they are read.
+_DECOMPRESSORS = {
+    ".gz": lambda fp: gzip.GzipFile(fileobj=fp, mode="rb"),
+    ".bz2": bz2.BZ2File,
+    ".xz": lzma.LZMAFile,
+    ".lzma": lzma.LZMAFile,
+}
 
-    for filename in crafting_grid_files:
-        file_path = subdir / filename
+@contextmanager
+def _open_data_file(file_path) -> Iterator[TextIO]:
+    """Open a data file as text, decompressing it if its
+    name ends in a compression suffix such as `.gz`.
+    """
+    decompressor = _DECOMPRESSORS.get(PurePosixPath(file_path.name).suffix)
+    if decompressor is None:
         with file_path.open("r", encoding="utf-8") as fp:
-            crafting_grid_data = json.load(fp)
+            yield fp
+        return
+
+    with file_path.open("rb") as raw_fp, \
+            decompressor(raw_fp) as decompressed_fp, \
+            io.TextIOWrapper(decompressed_fp, encoding="utf-8") as fp:
+        yield fp
 
-        crafting_grid_handler(crafting_grid_data)
+def _parse_data_file(file_path, record_type, streaming: bool = False) -> List[Any]:
+    """Parse one data file into a list of `record_type` objects.
 
-    crafting_data = GameCraftingData(game_name, items, recipes, crafting_grids)
-    _crafting_data_cache[game] = crafting_data
+    This is a module-level function so that it can be sent
+    to worker processes.
+    """
+    filename = file_path.name
+    suffix = PurePosixPath(filename).suffix
+    if suffix in _DECOMPRESSORS:
+        filename = filename[:-len(suffix)]
+
+    with _open_data_file(file_path) as fp:
+        records = _iter_records(fp, filename, streaming)
+        return [record_type.from_dict(obj) for obj in records if isinstance(obj, dict)]
+
+def _make_executor(parallel: str, max_workers: Optional[int], file_paths) -> Executor:
+    if parallel == "process":
+        # Worker processes need to open the files themselves, which
+        # only works for plain files. Anything else is parsed on threads.
+        if all(isinstance(file_path, Path) for file_path in file_paths):
+            return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+def _build_crafting_data(game: str,
+                         subdir,
+                         root_data: Dict[str, Any],
+                         parallel: str | NoneType = None,
+                         max_workers: Optional[int] = None,
+                         streaming: bool = False,
+                         graph_backend: str = "networkx") -> GameCraftingData:
+    """Parse all data files listed in `root_data` and build
+    a GameCraftingData object from them.
+
+    Files are parsed one after another, or on a thread or process
+    pool if `parallel` is "thread" or "process". Either way, records
+    are merged in the order in which the files are listed.
+    """
+    if parallel not in (None, "thread", "process"):
+        raise ValueError(f"Unknown parallel mode: {parallel!r}")
+
+    game_name = root_data.get("game", game)
+
+    tasks = []
+    for key, record_type in _RECORD_TYPES.items():
+        for filename in root_data.get(key, []):
+            tasks.append((subdir / filename, record_type))
+    file_paths = [file_path for file_path, _ in tasks]
+    record_types = [record_type for _, record_type in tasks]
+    streaming_flags = [streaming] * len(tasks)
+
+    if parallel is None or len(tasks) <= 1:
+        parsed_files = list(map(_parse_data_file, file_paths, record_types, streaming_flags))
+    else:
+        with _make_executor(parallel, max_workers, file_paths) as executor:
+            # Executor.map returns results in task order, no matter
+            # in which order the workers finish.
+            parsed_files = list(executor.map(_parse_data_file,
+                                             file_paths, record_types, streaming_flags))
+
+    records: Dict[type, List[Any]] = {record_type: [] for record_type in _RECORD_TYPES.values()}
+    for record_type, parsed in zip(record_types, parsed_files):
+        records[record_type].extend(parsed)
+
+    return GameCraftingData(game_name, records[Item], records[Recipe], records[CraftingGrid],
+                            compact=True, graph_backend=graph_backend)
+
+def load_data_for_game(
+    game: str,
+    root_dir: str | Path | NoneType = None,
+    *,
+    snapshot_dir: str | Path | NoneType = None,
+    parallel: str | NoneType = None,
+    max_workers: Optional[int] = None,
+    streaming: bool = False,
+    lazy: bool = True,
+    graph_backend: str = "networkx",
+) -> GameCraftingData:
+    """Load item and crafting data for the specified game.
+
+    Parameters
+    ---
+    game : str
+        The id of the game to load data for, example "minecraft".
+    root_dir : str | Path | None
+        Path to the root directory to search for the game data
+        folder. If this is None, then crafterlib will search its
+        built-in data for the game. This may also be a zip archive
+        with the same layout (i.e. containing `games/<game>/root.json`),
+        which is read directly without extracting it.
+    snapshot_dir : str | Path | None
+        Optional directory for compiled snapshots. If set, the parsed
+        data is stored there in a binary snapshot file, and later loads
+        (e.g. after a process restart) read the snapshot instead of
+        re-parsing every JSON file. A snapshot is rebuilt automatically
+        when `root.json` or any file it lists changes.
+        Snapshots are pickles, so only point this at a trusted directory.
+    parallel : str | None
+        Set to "thread" or "process" to parse the data files on a
+        thread pool or process pool instead of one after another.
+        Records are always merged in the order the files are listed
+        in `root.json`, so the result is the same as a serial load.
+        "process" is usually faster for many large files, since JSON
+        parsing holds the GIL.
+    max_workers : int | None
+        Number of workers for the parallel mode. Defaults to the
+        pool's own default, which depends on the number of CPUs.
+    streaming : bool
+        If set, JSON data files are decoded one array element at a
+        time instead of being loaded as a whole, so peak memory is
+        proportional to a single record rather than to the whole file.
+        Useful for very large generated recipe files.
+    lazy : bool
+        If set (the default), the item graph and recipe indexes are
+        built on first use. Set this to False to build them before
+        returning, e.g. in servers that prefer to pay the cost at
+        startup rather than on the first query.
+    graph_backend : str
+        How the item graph is stored, "networkx" (the default) or
+        "compact". The compact backend uses much less memory and is
+        faster to traverse, which matters for very large games.
+        Data loaded with different backends is cached separately.
+
+    Data files whose names end in `.jsonl` or `.ndjson` are read as
+    JSON Lines (one record per line) and are always streamed.
+    Data files may be compressed with gzip, bzip2 or xz, in which case
+    their names must end in `.gz`, `.bz2` or `.xz` respectively
+    (e.g. `recipes.json.gz`).
+
+    Loaded data is cached in memory, keyed by the data folder and
+    a fingerprint of its files. Loading the same game from the same
+    folder again returns the same object, unless the files have
+    changed in between. See `configure_cache`, `invalidate_cache`
+    and `clear_cache` for controlling the cache.
+
+    This function is thread-safe. If several threads load the same
+    data at once, it is only loaded once and every thread receives
+    the same object (or the same exception, if loading failed).
+
+    Return
+    ---
+    A GameCraftingData object containing item and recipe
+    data for the game.
+    """
+    with _open_data_dir(game, root_dir) as subdir:
+        crafting_data = _load_from_data_dir(game, subdir, snapshot_dir,
+                                            parallel, max_workers, streaming, graph_backend)
+
+    if not lazy:
+        crafting_data.build_derived()
     return crafting_data
 
+def _load_from_data_dir(game: str,
+                        subdir,
+                        snapshot_dir: str | Path | NoneType,
+                        parallel: str | NoneType,
+                        max_workers: Optional[int],
+                        streaming: bool,
+                        graph_backend: str) -> GameCraftingData:
+    # A cache hit costs a `stat` call for root.json and every data
+    # file it lists (see `compute_fingerprint`), so that changed files
+    # are never served from the cache, but root.json is only parsed
+    # again when it changed.
+    root_data = _read_root_json_cached(subdir, game)
+    fingerprint = compute_fingerprint(subdir, root_data)
+    cache_key = (_location_key(subdir), fingerprint, graph_backend)
+
+    cache_entry = _crafting_data_cache.get(cache_key)
+    if cache_entry is not None:
+        return cache_entry
+
+    def load():
+        # Another thread may have finished loading between our cache
+        # lookup and joining the flight. Only peek, the lookup above
+        # already counted the miss.
+        cache_entry = _crafting_data_cache.peek(cache_key)
+        if cache_entry is not None:
+            return cache_entry
+
+        crafting_data = None
+        if snapshot_dir is not None:
+            snapshot_path = snapshot_path_for(snapshot_dir, game, subdir, graph_backend)
+            crafting_data = load_snapshot(snapshot_path, fingerprint)
+
+        if crafting_data is None:
+            crafting_data = _build_crafting_data(game, subdir, root_data, parallel,
+                                                 max_workers, streaming, graph_backend)
+
+            if snapshot_dir is not None:
+                try:
+                    save_snapshot(snapshot_path, crafting_data, fingerprint)
+                except OSError as exc:
+                    # A snapshot is only an optimization, the data itself
+                    # was loaded fine, so don't fail the load over it.
+                    logger.warning("could not write snapshot %s: %s", snapshot_path, exc)
+
+        _crafting_data_cache.put(cache_key, crafting_data)
+        return crafting_data
+
+    return _load_flights.do(cache_key, load)
@@ -26,6 +26,8 @@ class Recipe:
         Output items produced by the recipe.
     """
 
+    __slots__ = ("id", "category", "requirements", "ingredients", "products")
+
     def __init__(
         self,
         id: int,
@@ -128,9 +130,9 @@ class Recipe:
         return {
             "id": self.id,
             "category": self.category,
-            "requirements": self.requirements,
-            "ingredients": self.ingredients,
-            "products": self.products,
+            "requirements": dict(self.requirements),
+            "ingredients": dict(self.ingredients),
+            "products": dict(self.products),
         }
 
     @classmethod
@@ -0,0 +1,174 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+from importlib.metadata import PackageNotFoundError, version as _v
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from crafterlib.crafting_data import GameCraftingData
+from crafterlib._internal.filestamp import file_stamp
+
+__all__ = ["compute_fingerprint", "snapshot_path_for", "save_snapshot", "load_snapshot"]
+
+logger = logging.getLogger(__name__)
+
+# Bump this whenever the pickled layout of GameCraftingData (or any
+# object it references) changes in an incompatible way.
+SNAPSHOT_FORMAT_VERSION = 7
+
+_SNAPSHOT_MAGIC = b"CRFTSNAP"
+_HEADER_LEN = struct.Struct("<I")
+
+# The crafterlib sources, hashed in place of the version when
+# crafterlib isn't installed, e.g. when it runs from a source checkout.
+_PACKAGE_DIR = Path(__file__).parent
+
+def _source_version(package_dir: Path) -> str:
+    """Hash the names and content of every Python file under
+    `package_dir`, so that any change to the sources changes the
+    result.
+    """
+    digest = hashlib.sha256()
+    for source_path in sorted(package_dir.rglob("*.py")):
+        digest.update(source_path.relative_to(package_dir).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(source_path.read_bytes()).digest())
+    return "source-" + digest.hexdigest()
+
+def _crafterlib_version() -> str:
+    try:
+        return _v("crafterlib")
+    except PackageNotFoundError:
+        return _source_version(_PACKAGE_DIR)
+
+def compute_fingerprint(data_dir, root_data: Dict[str, Any]) -> str:
+    """Compute a fingerprint for a game data folder.
+
+    The fingerprint covers `root.json` and every file it lists,
+    so editing, adding or removing any of them produces a new
+    fingerprint.
+
+    Parameters
+    ---
+    data_dir : Path | Traversable
+        The game data folder, i.e. the folder containing `root.json`.
+    root_data : dict
+        The parsed content of `root.json`.
+
+    Return
+    ---
+    A hex digest string.
+    """
+    filenames: Iterable[str] = [
+        "root.json",
+        *root_data.get("item_files", []),
+        *root_data.get("recipe_files", []),
+        *root_data.get("crafting_grid_files", []),
+    ]
+
+    digest = hashlib.sha256()
+    for filename in filenames:
+        digest.update(filename.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_stamp(data_dir / filename))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def snapshot_path_for(snapshot_dir: str | Path,
+                      game: str,
+                      data_dir,
+                      graph_backend: str = "networkx") -> Path:
+    """Get the path of the snapshot file for a game data folder.
+
+    The name includes a hash of the data folder location so that
+    the same game loaded from different folders does not share
+    a snapshot. Data loaded with a graph backend other than the
+    default gets its own snapshot, too.
+    """
+    location = hashlib.sha256(str(data_dir).encode("utf-8")).hexdigest()[:16]
+    if graph_backend != "networkx":
+        location = f"{location}-{graph_backend}"
+    return Path(snapshot_dir) / f"{game}-{location}.snapshot"
+
+def save_snapshot(path: str | Path, crafting_data: GameCraftingData, fingerprint: str) -> None:
+    """Write `crafting_data` to a snapshot file.
+
+    The item graph and indexes are built before writing, so that
+    they are restored from the snapshot instead of being rebuilt.
+
+    The file is written to a temporary name first and then moved
+    into place, so concurrent readers never see a partial snapshot.
+    """
+    path = Path(path)
+    crafting_data.build_derived()
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "crafterlib": _crafterlib_version(),
+        "fingerprint": fingerprint,
+    }).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(_SNAPSHOT_MAGIC)
+            fp.write(_HEADER_LEN.pack(len(header)))
+            fp.write(header)
+            pickle.dump(crafting_data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+def load_snapshot(path: str | Path, fingerprint: str) -> Optional[GameCraftingData]:
+    """Load a snapshot file written by `save_snapshot`.
+
+    Only the small header is read before the fingerprint is checked,
+    so a stale snapshot costs almost nothing to reject.
+
+    Snapshots are pickles. Only load snapshots from a directory
+    that you trust.
+
+    Return
+    ---
+    The stored GameCraftingData, or None if the file does not exist,
+    is stale (fingerprint, format or crafterlib version mismatch)
+    or is unreadable.
+    """
+    path = Path(path)
+    try:
+        with path.open("rb") as fp:
+            if fp.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                return None
+            (header_len,) = _HEADER_LEN.unpack(fp.read(_HEADER_LEN.size))
+            header = json.loads(fp.read(header_len))
+
+            if (header.get("format") != SNAPSHOT_FORMAT_VERSION
+                    or header.get("crafterlib") != _crafterlib_version()
+                    or header.get("fingerprint") != fingerprint):
+                return None
+
+            crafting_data = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError,
+            AttributeError, ImportError) as exc:
+        # AttributeError and ImportError (or ModuleNotFoundError) come
+        # from pickles of classes that were renamed or moved since.
+        logger.warning("ignoring unreadable snapshot %s: %s", path, exc)
+        return None
+
+    if not isinstance(crafting_data, GameCraftingData):
+        return None
+    return crafting_data
@@ -0,0 +1,125 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+__all__ = ["CSRMatrix"]
+
+# Typecodes of the buffers. "q" is a signed 64-bit integer, so that
+# indptr can't overflow; item indices fit comfortably in 32 bits.
+INDPTR_TYPECODE = "q"
+INDEX_TYPECODE = "i"
+DATA_TYPECODE = "d"
+
+class CSRMatrix:
+    """A sparse matrix in compressed sparse row (CSR) format.
+
+    The entries of row `i` are stored in `indices[indptr[i]:indptr[i + 1]]`
+    (column numbers) and `data[indptr[i]:indptr[i + 1]]` (values).
+    All three buffers are contiguous `array.array`s, so they can be
+    handed to NumPy without copying, see `to_numpy`.
+
+    Attributes
+    ---
+    shape : tuple[int, int]
+        Number of rows and columns.
+    indptr : array
+        Row start offsets, `shape[0] + 1` int64 values.
+    indices : array
+        Column number of every stored entry, int32.
+    data : array
+        Value of every stored entry, float64.
+    """
+
+    __slots__ = ("shape", "indptr", "indices", "data")
+
+    def __init__(self, shape: Tuple[int, int], indptr: array, indices: array, data: array):
+        self.shape = shape
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[Tuple[int, float]]], num_cols: int) -> "CSRMatrix":
+        """Build a matrix from an iterable of rows, where every row
+        is an iterable of `(column, value)` pairs.
+        """
+        indptr = array(INDPTR_TYPECODE, [0])
+        indices = array(INDEX_TYPECODE)
+        data = array(DATA_TYPECODE)
+        for row in rows:
+            for col, value in row:
+                indices.append(col)
+                data.append(value)
+            indptr.append(len(indices))
+        return cls((len(indptr) - 1, num_cols), indptr, indices, data)
+
+    @property
+    def nnz(self) -> int:
+        """The number of stored entries."""
+        return len(self.data)
+
+    def row(self, i: int) -> Iterator[Tuple[int, float]]:
+        """Iterate over the `(column, value)` pairs of row `i`."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def transpose(self) -> "CSRMatrix":
+        """Return the transposed matrix, also in CSR format.
+
+        This is equivalent to reading this matrix column by column.
+        """
+        num_rows, num_cols = self.shape
+        counts = [0] * (num_cols + 1)
+        for col in self.indices:
+            counts[col + 1] += 1
+        for col in range(num_cols):
+            counts[col + 1] += counts[col]
+
+        indptr = array(INDPTR_TYPECODE, counts)
+        indices = array(INDEX_TYPECODE, bytes(len(self.indices) * array(INDEX_TYPECODE).itemsize))
+        data = array(DATA_TYPECODE, bytes(len(self.data) * array(DATA_TYPECODE).itemsize))
+        next_slot = counts[:-1]
+        for row in range(num_rows):
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                col = self.indices[k]
+                slot = next_slot[col]
+                indices[slot] = row
+                data[slot] = self.data[k]
+                next_slot[col] = slot + 1
+        return CSRMatrix((num_cols, num_rows), indptr, indices, data)
+
+    def to_dense(self) -> List[List[float]]:
+        """Return the matrix as a list of rows. Only meant for small matrices."""
+        dense = [[0.0] * self.shape[1] for _ in range(self.shape[0])]
+        for i, dense_row in enumerate(dense):
+            for col, value in self.row(i):
+                dense_row[col] += value
+        return dense
+
+    def to_numpy(self):
+        """Return `(indptr, indices, data)` as NumPy arrays.
+
+        The arrays share memory with this matrix, nothing is copied.
+        They can be passed on to e.g. `scipy.sparse.csr_array`.
+
+        Raises
+        ---
+        ImportError if NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for CSRMatrix.to_numpy(), "
+                              "install it with `pip install crafterlib[numpy]`")
+        return (np.frombuffer(self.indptr, dtype=np.int64),
+                np.frombuffer(self.indices, dtype=np.int32),
+                np.frombuffer(self.data, dtype=np.float64))
+
+    def __repr__(self) -> str:
+        return f"CSRMatrix(shape={self.shape!r}, nnz={self.nnz})"
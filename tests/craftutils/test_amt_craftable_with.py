@@ -3,8 +3,8 @@
 SPDX-License-Identifier: MIT
 """
 import pytest
-from crafterlib import load_data_for_game
-from crafterlib.craftutils import get_amount_craftable_with
+from crafterlib import GameCraftingData, Item, Recipe, load_data_for_game
+from crafterlib.craftutils import get_amount_craftable_with, get_amount_craftable_with_batch
 
 def test_craftable_non_recursive_basic():
     game_data = load_data_for_game("test_game", "test_data")
@@ -144,4 +144,95 @@ def test_craftable_product_not_in_graph():
     ingredients = {"Flour": 10}
     # "Bread" does not exist in the crafting graph
     assert get_amount_craftable_with(game_data, ingredients, "Bread", recursive=False) == 0
-    
\ No newline at end of file
+    
+def test_craftable_compact_graph_backend():
+    game_data = load_data_for_game("test_game", "test_data", graph_backend="compact")
+
+    # Same as test_craftable_recursive_pizza, on the compact backend.
+    ingredients = {
+        "Flour": 8, "Water": 8, "Milk": 12, "Vinegar": 4,
+        "Meat": 2, "Salt": 6, "Tomato": 8, "Basil": 2
+    }
+    assert get_amount_craftable_with(game_data, ingredients, "Pepperoni Pizza", recursive=True) == pytest.approx(2)
+    assert get_amount_craftable_with(game_data, {"Vinegar": 3, "Milk": 5}, "Cheese") == pytest.approx(2)
+
+def test_craftable_recursive_shared_ingredients():
+    game_data = load_data_for_game("test_game3", "test_data")
+
+    # One Large Sand Castle takes 6 Water in total: 2 directly, 1 for
+    # the Sand Castle and 3 for the Sand Pile. Water used by one
+    # branch is not available to the others.
+    ingredients = {"Sand": 6, "Water": 12, "Bucket": 4, "Shovel": 2}
+    assert get_amount_craftable_with(game_data, ingredients, "Large Sand Castle", recursive=True) == 2
+    ingredients["Water"] = 11
+    assert get_amount_craftable_with(game_data, ingredients, "Large Sand Castle", recursive=True) == 1
+
+    # Intermediate items in the inventory are used before crafting more.
+    ingredients = {"Sand Castle": 1, "Sand": 3, "Water": 8, "Bucket": 3, "Shovel": 1}
+    assert get_amount_craftable_with(game_data, ingredients, "Large Sand Castle", recursive=True) == 2
+
+def test_craftable_recursive_whole_crafts():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Pepperoni is crafted 4 at a time, so 1 Meat and 3 Salt make
+    # enough for 2 pizzas, but 3 Salt is needed even for one.
+    ingredients = {"Meat": 1, "Salt": 2, "Dough": 10, "Cheese": 10, "Pizza Sauce": 10}
+    assert get_amount_craftable_with(game_data, ingredients, "Pepperoni Pizza", recursive=True) == 0
+    ingredients["Salt"] = 3
+    assert get_amount_craftable_with(game_data, ingredients, "Pepperoni Pizza", recursive=True) == 2
+
+def test_craftable_recursive_long_chain():
+    game_data = load_data_for_game("test_game2", "test_data")
+
+    # 9072 Silica Sand are needed for one Computer.
+    assert get_amount_craftable_with(game_data, {"Silica Sand": 9072}, "Computer", recursive=True) == 1
+    assert get_amount_craftable_with(game_data, {"Silica Sand": 9071}, "Computer", recursive=True) == 0
+
+def test_craftable_recursive_cycle():
+    game_data = load_data_for_game("minecraft")
+
+    # Gold Nugget <-> Gold Ingot is a cycle, which must not loop.
+    assert get_amount_craftable_with(game_data, {"Gold Nugget": 20}, "Gold Ingot", recursive=True) == 2
+    assert get_amount_craftable_with(game_data, {"Gold Ingot": 2}, "Gold Nugget", recursive=True) == 18
+    assert get_amount_craftable_with(game_data, {"Gold Nugget": 9}, "Gold Nugget", recursive=True) == 9
+    assert get_amount_craftable_with(game_data, {}, "Gold Nugget", recursive=True) == 0
+
+def test_craftable_recursive_deep_chain():
+    # Deeper than Python's recursion limit.
+    depth = 1500
+    items = [Item(i, f"Item {i}", []) for i in range(depth + 1)]
+    recipes = [Recipe(i, "Crafting", ingredients={f"Item {i}": 2}, products={f"Item {i + 1}": 2})
+               for i in range(depth)]
+    game_data = GameCraftingData("deep", items, recipes)
+
+    assert get_amount_craftable_with(game_data, {"Item 0": 7}, f"Item {depth}", recursive=True) == 6
+
+@pytest.mark.parametrize("game", ["test_game", "test_game3",
+                                  pytest.param("minecraft", marks=pytest.mark.slow)])
+@pytest.mark.parametrize("recursive", [False, True])
+def test_craftable_batch_matches_scalar(game, recursive):
+    np = pytest.importorskip("numpy")
+    game_data = load_data_for_game(game, "test_data") if game != "minecraft" \
+        else load_data_for_game(game)
+    item_names = game_data.item_names
+    products = [item for item in item_names if game_data.item_graph.in_degree(item)]
+    products.append("Not An Item")
+
+    rng = np.random.default_rng(0)
+    inventories = rng.integers(0, 20, size=(30, len(item_names))).astype(float)
+    # Mostly empty inventories, so that intermediate items get crafted.
+    inventories[rng.random(inventories.shape) < 0.6] = 0
+    result = get_amount_craftable_with_batch(game_data, inventories, products, recursive)
+
+    assert result.shape == (30, len(products))
+    for i, row in enumerate(inventories):
+        ingredients = {item: amount for item, amount in zip(item_names, row) if amount}
+        for k, product in enumerate(products):
+            assert result[i, k] == get_amount_craftable_with(game_data, ingredients, product, recursive)
+
+def test_craftable_batch_shape_mismatch():
+    pytest.importorskip("numpy")
+    game_data = load_data_for_game("test_game", "test_data")
+
+    with pytest.raises(ValueError):
+        get_amount_craftable_with_batch(game_data, [[1, 2, 3]], ["Dough"])
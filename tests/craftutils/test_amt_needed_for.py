@@ -51,3 +51,23 @@ def test_ingredients_recursive_long_chain():
 
     # 9072 Silica Sand should be needed to craft one Computer.
     assert get_amount_needed_for(game_data, "Silica Sand", "Computer", True) == pytest.approx(9072)
+
+def test_ingredients_recursive_several_paths():
+    game_data = load_data_for_game("test_game3", "test_data")
+
+    # Water goes into a Large Sand Castle directly (2), through the
+    # Sand Castle (1) and through the Sand Pile of the Sand Castle (3).
+    assert get_amount_needed_for(game_data, "Water", "Large Sand Castle", True) == pytest.approx(6)
+    # Only directly, if recursive isn't set.
+    assert get_amount_needed_for(game_data, "Water", "Large Sand Castle", False) == pytest.approx(2)
+
+def test_ingredients_compact_graph_backend():
+    game_data = load_data_for_game("test_game2", "test_data")
+    compact_data = load_data_for_game("test_game2", "test_data", graph_backend="compact")
+
+    # Both backends give the same amounts for every pair of items.
+    for ingredient in game_data.item_name_map:
+        for product in game_data.item_name_map:
+            for recursive in (False, True):
+                assert get_amount_needed_for(compact_data, ingredient, product, recursive) == \
+                    get_amount_needed_for(game_data, ingredient, product, recursive)
@@ -0,0 +1,47 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import pytest
+from crafterlib import load_data_for_game
+from crafterlib.craftutils import get_amount_craftable_with, get_craftable_products
+
+def test_craftable_products_direct():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    ingredients = {"Flour": 10, "Water": 10, "Milk": 5, "Vinegar": 3, "Meat": 1}
+    # Pepperoni also needs Salt, Pepperoni Pizza needs intermediate items.
+    assert get_craftable_products(game_data, ingredients) == pytest.approx(
+        {"Dough": 5, "Cheese": 2})
+
+def test_craftable_products_recursive():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    ingredients = {
+        "Flour": 8, "Water": 8, "Milk": 12, "Vinegar": 4,
+        "Meat": 2, "Salt": 6, "Tomato": 8, "Basil": 2
+    }
+    assert get_craftable_products(game_data, ingredients, recursive=True) == pytest.approx({
+        "Dough": 4, "Pepperoni": 8, "Cheese": 8, "Pizza Sauce": 2, "Pepperoni Pizza": 2
+    })
+    # Without Basil, there is no Pizza Sauce and so no pizza.
+    del ingredients["Basil"]
+    assert "Pepperoni Pizza" not in get_craftable_products(game_data, ingredients, recursive=True)
+
+def test_craftable_products_empty():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    assert get_craftable_products(game_data, {}) == {}
+    assert get_craftable_products(game_data, {"Cornstarch": 5, "Flour": 0}, recursive=True) == {}
+
+@pytest.mark.parametrize("recursive", [False, True])
+def test_craftable_products_match_scalar(recursive):
+    game_data = load_data_for_game("minecraft")
+
+    ingredients = {"Logs": 10, "Cobblestone": 20, "Raw Iron": 6, "Gold Nugget": 27,
+                   "Coal": 4, "Sand": 8, "Sugar": 3, "Spider Eye": 2}
+    craftable = get_craftable_products(game_data, ingredients, recursive)
+    for product in game_data.item_graph.items():
+        amount = get_amount_craftable_with(game_data, ingredients, product, recursive)
+        assert craftable.get(product, 0) == pytest.approx(amount)
+    assert craftable
@@ -0,0 +1,108 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import random
+
+import pytest
+from crafterlib import load_data_for_game
+from crafterlib.craftutils import CraftingPlan, IncrementalCraftingPlan, make_crafting_plan
+
+def _assert_crafting_order(game_data, plan: CraftingPlan):
+    # Every item comes after everything it is crafted from.
+    item_graph = game_data.item_graph
+    position = {item: k for k, item in enumerate(plan.ingredients)}
+    for item in plan.ingredients:
+        for ingredient in item_graph.get_recipe_for(item):
+            if ingredient in position and not item_graph.can_reach(item, ingredient):
+                assert position[ingredient] < position[item]
+
+def test_crafting_plan_iron_pickaxe():
+    game_data = load_data_for_game("minecraft")
+
+    plan = make_crafting_plan(game_data, {"Iron Pickaxe": 23})
+    assert plan.ingredients == {
+        "Raw Iron": 69, "Logs": 6, "Planks": 24, "Sticks": 48,
+        "Coal": 9, "Iron Ingot": 69, "Iron Pickaxe": 23
+    }
+    # 46 Sticks are needed, but they are crafted 4 at a time.
+    assert plan.leftovers == pytest.approx({"Sticks": 2, "Coal": 0.375})
+    _assert_crafting_order(game_data, plan)
+
+def test_crafting_plan_shared_ingredients():
+    game_data = load_data_for_game("test_game3", "test_data")
+
+    plan = make_crafting_plan(game_data, {"Large Sand Castle": 2})
+    assert plan.ingredients == {
+        "Sand": 6, "Water": 12, "Shovel": 2, "Bucket": 4,
+        "Sand Pile": 2, "Sand Castle": 2, "Large Sand Castle": 2
+    }
+    assert plan.leftovers == {}
+    _assert_crafting_order(game_data, plan)
+
+def test_crafting_plan_several_products():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Pepperoni comes 4 at a time, so the leftovers of the pizza
+    # cover the extra Pepperoni.
+    plan = make_crafting_plan(game_data, {"Pepperoni Pizza": 1, "Pepperoni": 2})
+    assert plan.ingredients["Pepperoni"] == 4
+    assert plan.ingredients["Meat"] == 1
+    assert plan.leftovers == {}
+    _assert_crafting_order(game_data, plan)
+
+def test_crafting_plan_cycle():
+    game_data = load_data_for_game("minecraft")
+
+    # Gold Ingot isn't crafted back from Gold Nuggets.
+    plan = make_crafting_plan(game_data, {"Gold Nugget": 9})
+    assert plan.ingredients == {"Gold Ingot": 1, "Gold Nugget": 9}
+    plan = make_crafting_plan(game_data, {"Gold Pickaxe": 1})
+    assert plan.ingredients["Gold Ingot"] == 3
+    assert "Gold Nugget" not in plan.ingredients
+
+def test_crafting_plan_basic_and_unknown_items():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Items without recipes are gathered, in whole units.
+    plan = make_crafting_plan(game_data, {"Flour": 2.5, "Cornstarch": 1})
+    assert plan.ingredients == {"Cornstarch": 1, "Flour": 3}
+    assert plan.leftovers == pytest.approx({"Flour": 0.5})
+    assert make_crafting_plan(game_data, {}) == CraftingPlan({}, {})
+
+def test_incremental_plan_uses_inventory():
+    game_data = load_data_for_game("minecraft")
+
+    plan = IncrementalCraftingPlan(game_data, {"Iron Pickaxe": 23}, {"Sticks": 46, "Iron Ingot": 9})
+    assert plan.to_plan() == CraftingPlan(
+        {"Raw Iron": 60, "Coal": 8, "Iron Ingot": 60, "Iron Pickaxe": 23}, {"Coal": 0.5})
+
+    # Using up the Sticks only touches Sticks and what they are made from.
+    changed = plan.update_inventory({"Sticks": -46})
+    assert changed == {"Sticks", "Planks", "Logs"}
+    assert plan.amounts("Sticks") == (48, 2)
+    assert plan.crafts["Planks"] == 6
+    assert plan.to_plan() == CraftingPlan(
+        {"Raw Iron": 60, "Logs": 6, "Planks": 24, "Sticks": 48,
+         "Coal": 8, "Iron Ingot": 60, "Iron Pickaxe": 23},
+        {"Sticks": 2, "Coal": 0.5})
+
+    # Items that aren't part of the plan change nothing.
+    assert plan.update_inventory({"Dirt": 64}) == set()
+    assert plan.inventory == {"Iron Ingot": 9, "Dirt": 64}
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_plan_matches_new_plan(seed):
+    game_data = load_data_for_game("minecraft")
+    rng = random.Random(seed)
+    products = {"Iron Pickaxe": 5, "Gold Pickaxe": 2, "Furnace": 3, "Torch": 17}
+    plan = IncrementalCraftingPlan(game_data, products)
+    items = list(plan.ingredients())
+
+    for _ in range(50):
+        delta = {rng.choice(items): rng.randint(-10, 10) for _ in range(rng.randint(1, 3))}
+        plan.update_inventory(delta)
+        fresh = IncrementalCraftingPlan(game_data, products, plan.inventory)
+        assert plan.crafts == fresh.crafts
+        assert plan.ingredients() == pytest.approx(fresh.ingredients())
+        assert plan.leftovers() == pytest.approx(fresh.leftovers())
@@ -0,0 +1,174 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import random
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from crafterlib import GameCraftingData, Item, Recipe, load_data_for_game
+from crafterlib._internal import simplex
+from crafterlib.craftutils import make_crafting_plan, make_optimal_crafting_plan
+from crafterlib.craftutils import optimal_plan
+
+def _random_game(seed: int) -> GameCraftingData:
+    # Alternative recipes, by-products and the odd cycle.
+    rng = random.Random(seed)
+    names = [f"Item {i}" for i in range(25)]
+    recipes = []
+    for recipe_id in range(40):
+        product = rng.randrange(5, 25)
+        ingredients = rng.sample(range(min(product + (2 if rng.random() < 0.1 else 0), 25)),
+                                 rng.randint(1, 3))
+        products = {names[product]: rng.choice([1, 2, 4])}
+        if rng.random() < 0.3:
+            products[names[rng.randrange(5, 25)]] = 1
+        recipes.append(Recipe(recipe_id, "Crafting",
+                              ingredients={names[i]: rng.randint(1, 3) for i in ingredients
+                                           if names[i] not in products},
+                              products=products))
+    return GameCraftingData("random", [Item(i, name, []) for i, name in enumerate(names)], recipes)
+
+def _layered_game(num_items: int, num_recipes: int) -> GameCraftingData:
+    # Every item is crafted from items with a lower index, with
+    # alternative recipes for random items, like big modpacks.
+    rng = random.Random(0)
+    names = [f"Item {i}" for i in range(num_items)]
+    num_basic = num_items // 10
+    recipes = []
+    for recipe_id in range(num_recipes):
+        product = num_basic + recipe_id if num_basic + recipe_id < num_items else \
+            rng.randrange(num_basic, num_items)
+        ingredients = rng.sample(range(product), min(rng.randint(1, 4), product))
+        recipes.append(Recipe(recipe_id, "Crafting",
+                              ingredients={names[i]: rng.randint(1, 4) for i in ingredients},
+                              products={names[product]: rng.choice([1, 1, 1, 2, 4])}))
+    return GameCraftingData("layered", [Item(i, name, []) for i, name in enumerate(names)], recipes)
+
+def test_optimal_plan_matches_breakdown():
+    game_data = load_data_for_game("minecraft")
+
+    plan = make_optimal_crafting_plan(game_data, {"Iron Pickaxe": 23}, solver="simplex")
+    breakdown = game_data.item_graph.get_basic_breakdown("Iron Pickaxe")
+    assert plan.gathered == pytest.approx({item: amount * 23 for item, amount in breakdown.items()})
+    assert plan.cost == pytest.approx(23 * sum(breakdown.values()))
+    assert plan.taken == {} and plan.leftovers == {}
+
+def test_optimal_plan_whole_crafts():
+    game_data = load_data_for_game("minecraft")
+
+    plan = make_optimal_crafting_plan(game_data, {"Iron Pickaxe": 23}, integer=True, solver="simplex")
+    expected = make_crafting_plan(game_data, {"Iron Pickaxe": 23})
+    assert plan.gathered == {"Raw Iron": 69, "Logs": 6, "Coal": 9}
+    assert plan.leftovers == pytest.approx(expected.leftovers)
+
+    # Every recipe comes after the recipes making its ingredients.
+    made = set()
+    for recipe_id in plan.crafts:
+        recipe = game_data.get_recipe_by_id(recipe_id)
+        assert all(ingredient in made or ingredient in plan.gathered
+                   for ingredient in recipe.ingredients)
+        made.update(recipe.products)
+
+def test_optimal_plan_picks_cheapest_recipe():
+    game_data = load_data_for_game("minecraft")
+
+    # The item graph crafts Gold Ingots from Gold Nuggets, which are
+    # only made from Gold Ingots. Smelting Raw Gold is the way to go.
+    plan = make_optimal_crafting_plan(game_data, {"Gold Ingot": 2}, solver="simplex")
+    assert plan.gathered == pytest.approx({"Raw Gold": 2, "Coal": 0.25})
+    assert [game_data.get_recipe_by_id(recipe_id).ingredients for recipe_id in plan.crafts] == \
+        [{"Raw Gold": 1, "Coal": 0.125}]
+
+    # Unless Raw Gold is expensive enough and nuggets can be gathered.
+    plan = make_optimal_crafting_plan(game_data, {"Gold Ingot": 2},
+                                      costs={"Raw Gold": 10, "Gold Nugget": 0.5}, solver="simplex")
+    assert plan.gathered == pytest.approx({"Gold Nugget": 18})
+    assert plan.cost == pytest.approx(9)
+
+def test_optimal_plan_uses_inventory():
+    game_data = load_data_for_game("minecraft")
+
+    plan = make_optimal_crafting_plan(game_data, {"Iron Pickaxe": 2},
+                                      inventory={"Iron Ingot": 4, "Sticks": 10}, solver="simplex")
+    assert plan.taken == pytest.approx({"Iron Ingot": 4, "Sticks": 4})
+    assert plan.gathered == pytest.approx({"Raw Iron": 2, "Coal": 0.25})
+
+def test_optimal_plan_by_products():
+    recipes = [
+        Recipe(1, "Crafting", ingredients={"Brick": 2}, products={"Pillar": 1}),
+        Recipe(2, "Crafting", ingredients={"Stone": 3}, products={"Pillar": 1}),
+        Recipe(3, "Crafting", ingredients={"Stone": 3}, products={"Slab": 6, "Gravel": 1}),
+        Recipe(4, "Crafting", ingredients={"Gravel": 2}, products={"Brick": 1}),
+    ]
+    game_data = GameCraftingData("test", [Item(i, name, []) for i, name in enumerate(
+        ["Brick", "Stone", "Pillar", "Slab", "Gravel"])], recipes)
+
+    # The Gravel left over from the Slabs makes a Brick, which covers
+    # half a Pillar, so half a Pillar less is made from Stone.
+    plan = make_optimal_crafting_plan(game_data, {"Slab": 12, "Pillar": 1},
+                                      costs={"Brick": 5}, solver="simplex")
+    assert plan.crafts == pytest.approx({3: 2, 4: 1, 1: 0.5, 2: 0.5})
+    assert plan.gathered == pytest.approx({"Stone": 7.5})
+
+def test_optimal_plan_impossible():
+    recipes = [
+        Recipe(1, "Crafting", ingredients={"Gold Ingot": 1}, products={"Gold Nugget": 9}),
+        Recipe(2, "Crafting", ingredients={"Gold Nugget": 9}, products={"Gold Ingot": 1}),
+    ]
+    game_data = GameCraftingData("test", [], recipes)
+
+    assert make_optimal_crafting_plan(game_data, {"Gold Ingot": 1}, solver="simplex") is None
+    plan = make_optimal_crafting_plan(game_data, {"Gold Ingot": 1},
+                                      inventory={"Gold Nugget": 9}, solver="simplex")
+    assert plan.taken == {"Gold Nugget": 9}
+
+    with pytest.raises(ValueError):
+        make_optimal_crafting_plan(game_data, {"Gold Ingot": 1}, costs={"Gold Nugget": -1})
+
+@pytest.mark.parametrize("integer", [False, True])
+@pytest.mark.parametrize(
+    "seed", [*range(5), *(pytest.param(seed, marks=pytest.mark.slow) for seed in range(5, 10))])
+def test_optimal_plan_matches_whole_program(seed, integer, monkeypatch):
+    game_data = _random_game(seed)
+    rng = random.Random(seed)
+    products = {f"Item {i}": rng.randint(1, 5) for i in rng.sample(range(15, 25), 3)}
+    inventory = {f"Item {i}": rng.randint(1, 10) for i in rng.sample(range(25), 6)}
+
+    plan = make_optimal_crafting_plan(game_data, products, inventory, integer=integer, solver="simplex")
+
+    # The same, with every recipe in the program from the start.
+    def solve_whole(c, columns, b, upper, integer, solver, guess, price_guess):
+        return simplex.solve_covering_lp(c, columns, b, upper, integer, solver)
+
+    monkeypatch.setattr(optimal_plan, "solve_covering_lp", solve_whole)
+    expected = make_optimal_crafting_plan(game_data, products, inventory, integer=integer,
+                                          solver="simplex")
+    if expected is None:
+        assert plan is None
+    else:
+        assert plan.optimal and expected.optimal
+        assert plan.cost == pytest.approx(expected.cost, abs=1e-4)
+
+@pytest.mark.slow
+def test_optimal_plan_whole_crafts_in_time():
+    game_data = _layered_game(1_500, 3_000)
+    rng = random.Random(0)
+    products = {f"Item {i}": rng.randint(1, 64) for i in rng.sample(range(1_300, 1_500), 10)}
+
+    start = time.perf_counter()
+    plan = make_optimal_crafting_plan(game_data, products, integer=True, solver="simplex")
+    assert time.perf_counter() - start < 1
+    assert all(runs == round(runs) for runs in plan.crafts.values())
+    assert all(amount == round(amount) for amount in plan.gathered.values())
+
+def test_highs_needs_scipy(monkeypatch):
+    monkeypatch.setattr(simplex, "has_highs", lambda: False)
+    game_data = load_data_for_game("minecraft")
+
+    with pytest.raises(ImportError):
+        make_optimal_crafting_plan(game_data, {"Iron Pickaxe": 1}, solver="highs")
+    assert make_optimal_crafting_plan(game_data, {"Iron Pickaxe": 1}).solver == "simplex"
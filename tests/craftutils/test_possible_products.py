@@ -0,0 +1,36 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from crafterlib import load_data_for_game
+from crafterlib.craftutils import get_possible_products
+
+def test_possible_products_direct():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Milk is only used for Cheese.
+    assert get_possible_products(game_data, "Milk") == ["Cheese"]
+    # Pepperoni Pizza is not used in any recipe.
+    assert get_possible_products(game_data, "Pepperoni Pizza") == []
+
+def test_possible_products_recursive():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Milk -> Cheese -> Pepperoni Pizza, in crafting order.
+    assert get_possible_products(game_data, "Milk", recursive=True) == ["Cheese", "Pepperoni Pizza"]
+
+def test_possible_products_not_found():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    assert get_possible_products(game_data, "Cornstarch") == []
+    assert get_possible_products(game_data, "Cornstarch", recursive=True) == []
+
+def test_possible_products_cycle():
+    game_data = load_data_for_game("minecraft")
+
+    # Gold Nuggets can be crafted into Gold Ingots and back.
+    products = get_possible_products(game_data, "Gold Nugget", recursive=True)
+    assert "Gold Ingot" in products
+    assert "Gold Nugget" in products
+    assert "Gold Pickaxe" in products
+    assert "Planks" not in products
@@ -159,4 +159,14 @@ def test_combine_ingredients_complex():
             "ingredients": { "Sand Castle": 1 },
             "products": { "Large Sand Castle": 1 }
         }
-    ]
\ No newline at end of file
+    ]
+def test_compact_graph_backend():
+    game_data = load_data_for_game("test_game3", "test_data")
+    compact_data = load_data_for_game("test_game3", "test_data", graph_backend="compact")
+
+    # Both backends give the same chains for every pair of items.
+    for ingredient in game_data.item_name_map:
+        for product in game_data.item_name_map:
+            for combine_ingredients in (False, True):
+                assert get_recipe_chain(compact_data, ingredient, product, combine_ingredients) == \
+                    get_recipe_chain(game_data, ingredient, product, combine_ingredients)
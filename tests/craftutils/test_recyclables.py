@@ -0,0 +1,17 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from crafterlib import load_data_for_game
+from crafterlib.craftutils import get_recyclables
+
+def test_recyclables_gold():
+    game_data = load_data_for_game("minecraft")
+
+    # Gold Nuggets -> Gold Ingot -> Gold Nuggets
+    assert get_recyclables(game_data) == ["Gold Ingot", "Gold Nugget"]
+
+def test_no_recyclables():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    assert get_recyclables(game_data) == []
@@ -0,0 +1,168 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import random
+
+import pytest
+from crafterlib import Item, Recipe, GameCraftingData, load_data_for_game
+from crafterlib.craftutils import (get_adv_resources, get_basic_resources, get_basic_resources_for,
+                                   get_intermed_resources, get_intermed_resources_for)
+from crafterlib.graph import ItemGraph, item_graph as item_graph_module, resource_classes
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_resource_classes_minecraft(backend):
+    game_data = load_data_for_game("minecraft", graph_backend=backend)
+
+    basic = set(get_basic_resources(game_data))
+    intermed = set(get_intermed_resources(game_data))
+    adv = set(get_adv_resources(game_data))
+    assert {"Logs", "Raw Iron", "Coal"} <= basic
+    assert {"Planks", "Sticks", "Iron Ingot", "Gold Ingot", "Gold Nugget"} <= intermed
+    assert {"Iron Pickaxe", "Torch"} <= adv
+    # Dirt has no recipes at all.
+    assert game_data.resource_classes.label_of("Dirt") == resource_classes.ISOLATED
+    assert game_data.resource_classes.label_of("Not An Item") is None
+
+    # Every item has exactly one label.
+    isolated = set(game_data.resource_classes.isolated())
+    item_graph = game_data.item_graph
+    assert len(basic) + len(intermed) + len(adv) + len(isolated) == item_graph.num_items()
+    assert basic | intermed | adv | isolated == set(item_graph.items())
+    for item in item_graph.items():
+        crafted, used = item_graph.in_degree(item) > 0, item_graph.out_degree(item) > 0
+        assert (item in basic) == (used and not crafted)
+        assert (item in intermed) == (used and crafted)
+        assert (item in adv) == (crafted and not used)
+
+def test_resource_classes_cached_until_changed():
+    items = [Item(1, "Logs", []), Item(2, "Planks", []), Item(3, "Sticks", [])]
+    recipes = [Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4})]
+    game_data = GameCraftingData("test", items, recipes)
+
+    assert game_data.resource_classes is game_data.resource_classes
+    assert list(game_data.resource_classes.labels) == [
+        resource_classes.BASIC, resource_classes.ADVANCED, resource_classes.ISOLATED]
+
+    game_data.item_graph.add_recipes(
+        [Recipe(2, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4})])
+    assert list(get_basic_resources(game_data)) == ["Logs"]
+    assert list(get_intermed_resources(game_data)) == ["Planks"]
+    assert list(get_adv_resources(game_data)) == ["Sticks"]
+
+def test_resources_for_minecraft():
+    game_data = load_data_for_game("minecraft")
+
+    assert get_basic_resources_for(game_data, "Iron Pickaxe") == {}
+    assert get_basic_resources_for(game_data, "Iron Pickaxe", recursive=True) == pytest.approx(
+        {"Raw Iron": 3, "Coal": 0.375, "Logs": 0.25})
+    assert get_intermed_resources_for(game_data, "Iron Pickaxe") == {"Iron Ingot": 3, "Sticks": 2}
+    assert get_intermed_resources_for(game_data, "Iron Pickaxe", recursive=True) == pytest.approx(
+        {"Iron Ingot": 3, "Sticks": 2, "Planks": 1})
+    assert get_basic_resources_for(game_data, "Torch") == {"Coal": 0.25}
+    assert get_intermed_resources_for(game_data, "Torch") == {"Sticks": 0.25}
+
+    # Gold Ingot and Gold Nugget are only crafted from each other, so
+    # they are intermediate resources, and the cycle is followed for
+    # one step.
+    assert get_basic_resources_for(game_data, "Gold Pickaxe") == {}
+    assert get_basic_resources_for(game_data, "Gold Pickaxe", recursive=True) == pytest.approx(
+        {"Logs": 0.25})
+    assert get_intermed_resources_for(game_data, "Gold Pickaxe") == {"Gold Ingot": 3, "Sticks": 2}
+    assert get_intermed_resources_for(game_data, "Gold Pickaxe", recursive=True) == pytest.approx(
+        {"Gold Ingot": 3, "Gold Nugget": 27, "Sticks": 2, "Planks": 1})
+    assert get_basic_resources_for(game_data, "Gold Ingot", recursive=True) == {}
+    assert get_intermed_resources_for(game_data, "Gold Ingot", recursive=True) == {"Gold Nugget": 9}
+
+    assert get_basic_resources_for(game_data, "Logs", recursive=True) == {}
+    assert get_basic_resources_for(game_data, "Not An Item", recursive=True) == {}
+    assert get_intermed_resources_for(game_data, "Not An Item") == {}
+
+def _basic_breakdown_of_basic_items(item_graph: ItemGraph, item: str):
+    # The bill of materials counts the items of cycles that aren't
+    # crafted from anything else as basic, but they are intermediate.
+    classes = item_graph.get_resource_classes()
+    return {resource: amount for resource, amount in item_graph.get_basic_breakdown(item).items()
+            if classes.label_of(resource) == resource_classes.BASIC}
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_resources_for_match_bill_of_materials_minecraft(backend):
+    item_graph = load_data_for_game("minecraft", graph_backend=backend).item_graph
+    bill_of_materials = item_graph.get_bill_of_materials()
+    for item in item_graph.items():
+        if not bill_of_materials.is_basic(item):
+            assert item_graph.get_resource_breakdown(item).basic == pytest.approx(
+                _basic_breakdown_of_basic_items(item_graph, item))
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_resources_for_direct_and_recursive_agree(backend):
+    game_data = load_data_for_game("minecraft", graph_backend=backend)
+    for item in game_data.item_graph.items():
+        basic = get_basic_resources_for(game_data, item, recursive=True)
+        intermed = get_intermed_resources_for(game_data, item, recursive=True)
+        assert get_basic_resources_for(game_data, item).keys() <= basic.keys()
+        assert get_intermed_resources_for(game_data, item).keys() <= intermed.keys()
+        assert not basic.keys() & intermed.keys()
+
+def test_resources_for_match_bill_of_materials_with_cycles(monkeypatch):
+    monkeypatch.setattr(item_graph_module, "BREAKDOWN_CACHE_ENTRIES", 5)
+    for seed in range(5):
+        rng = random.Random(seed)
+        recipes = []
+        for product in range(5, 40):
+            # Mostly earlier items, sometimes later ones, for cycles.
+            ingredients = {rng.randrange(product) for _ in range(rng.randint(1, 3))}
+            if product < 39 and rng.random() < 0.15:
+                ingredients.add(rng.randrange(product + 1, 40))
+            recipes.append(Recipe(product, "Crafting",
+                                  ingredients={f"Item {i}": rng.choice([1, 2, 3]) for i in ingredients},
+                                  products={f"Item {product}": rng.choice([1, 2, 4])}))
+        item_graph = ItemGraph()
+        item_graph.add_recipes(recipes)
+        bill_of_materials = item_graph.get_bill_of_materials()
+        items = list(item_graph.items())
+        rng.shuffle(items)
+        for item in items:
+            if not bill_of_materials.is_basic(item):
+                assert item_graph.get_resource_breakdown(item).basic == pytest.approx(
+                    _basic_breakdown_of_basic_items(item_graph, item))
+
+def test_resources_for_match_bill_of_materials(monkeypatch):
+    # Small enough that breakdowns are evicted while others are worked out.
+    monkeypatch.setattr(item_graph_module, "BREAKDOWN_CACHE_ENTRIES", 5)
+    for seed in range(2):
+        rng = random.Random(seed)
+        recipes = []
+        for product in range(10, 60):
+            ingredients = rng.sample(range(product), rng.randint(1, 3))
+            recipes.append(Recipe(product, "Crafting",
+                                  ingredients={f"Item {i}": rng.choice([1, 2, 3]) for i in ingredients},
+                                  products={f"Item {product}": rng.choice([1, 2, 4])}))
+        item_graph = ItemGraph()
+        item_graph.add_recipes(recipes)
+        items = [f"Item {i}" for i in range(10, 60)]
+        rng.shuffle(items)
+        for item in items:
+            breakdown = item_graph.get_resource_breakdown(item)
+            assert breakdown.basic == pytest.approx(item_graph.get_basic_breakdown(item))
+            for resource, amount in breakdown.intermediate.items():
+                assert amount == pytest.approx(item_graph.get_total_amount(resource, item))
+
+def test_resources_for_cached_until_changed():
+    items = [Item(1, "Logs", []), Item(2, "Planks", []), Item(3, "Sticks", [])]
+    recipes = [Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4}),
+               Recipe(2, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4})]
+    game_data = GameCraftingData("test", items, recipes)
+    item_graph = game_data.item_graph
+
+    assert item_graph.get_resource_breakdown("Sticks") is item_graph.get_resource_breakdown("Sticks")
+    basic = get_basic_resources_for(game_data, "Sticks", recursive=True)
+    assert basic == {"Logs": 0.125}
+    # Callers get copies.
+    basic["Logs"] = 10
+    assert get_basic_resources_for(game_data, "Sticks", recursive=True) == {"Logs": 0.125}
+
+    # Logs aren't basic anymore.
+    item_graph.add_recipes([Recipe(3, "Growing", ingredients={"Sapling": 1}, products={"Logs": 2})])
+    assert get_basic_resources_for(game_data, "Sticks", recursive=True) == {"Sapling": 0.0625}
+    assert get_intermed_resources_for(game_data, "Sticks", recursive=True) == {"Planks": 0.5, "Logs": 0.125}
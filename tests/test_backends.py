@@ -0,0 +1,126 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import pickle
+import threading
+import time
+
+import pytest
+
+from crafterlib.graph import CompactBackend, NetworkXBackend, backends
+from crafterlib.graph.backends import make_backend
+
+EDGES = [
+    ("Planks", "Sticks", 0.5),
+    ("Sticks", "Pickaxe", 2.0),
+    ("Iron", "Pickaxe", 3.0),
+    ("Logs", "Planks", 0.25),
+]
+
+@pytest.fixture(params=[NetworkXBackend, CompactBackend])
+def backend(request):
+    backend = request.param()
+    backend.add_nodes(["Logs", "Dirt"])
+    backend.add_weighted_edges(EDGES)
+    return backend
+
+def test_nodes_and_edges(backend):
+    assert list(backend.nodes()) == ["Logs", "Dirt", "Planks", "Sticks", "Pickaxe", "Iron"]
+    assert backend.number_of_nodes() == 6
+    assert backend.number_of_edges() == 4
+    assert sorted(backend.edges()) == sorted(EDGES)
+    assert backend.has_node("Dirt")
+    assert not backend.has_node("Stone")
+
+def test_neighbors(backend):
+    # Predecessors and successors are in edge insertion order.
+    assert list(backend.predecessors("Pickaxe")) == [("Sticks", 2.0), ("Iron", 3.0)]
+    assert list(backend.successors("Planks")) == [("Sticks", 0.5)]
+    assert list(backend.successors("Pickaxe")) == []
+    assert list(backend.predecessors("Stone")) == []
+    assert backend.in_degree("Pickaxe") == 2
+    assert backend.out_degree("Pickaxe") == 0
+    assert backend.in_degree("Stone") == 0
+
+def test_edge_weight(backend):
+    assert backend.edge_weight("Iron", "Pickaxe") == 3.0
+    assert backend.edge_weight("Pickaxe", "Iron") is None
+    assert backend.edge_weight("Stone", "Pickaxe") is None
+
+def test_add_existing_edge_replaces_weight(backend):
+    backend.add_edge("Sticks", "Pickaxe", 4.0)
+    assert backend.number_of_edges() == 4
+    assert list(backend.predecessors("Pickaxe")) == [("Sticks", 4.0), ("Iron", 3.0)]
+
+def test_add_after_query(backend):
+    assert backend.number_of_edges() == 4
+    backend.add_edge("Iron", "Shovel", 1.0)
+    backend.add_nodes(["Stone"])
+    assert backend.number_of_edges() == 5
+    assert list(backend.successors("Iron")) == [("Pickaxe", 3.0), ("Shovel", 1.0)]
+    assert backend.has_node("Stone")
+
+def test_subgraph(backend):
+    subgraph = backend.subgraph(["Planks", "Sticks", "Pickaxe"])
+    assert type(subgraph) is type(backend)
+    assert sorted(subgraph.nodes()) == ["Pickaxe", "Planks", "Sticks"]
+    assert sorted(subgraph.edges()) == [("Planks", "Sticks", 0.5), ("Sticks", "Pickaxe", 2.0)]
+
+def test_to_networkx(backend):
+    graph = backend.to_networkx()
+    assert set(graph.nodes) == set(backend.nodes())
+    assert sorted(graph.edges(data="weight")) == sorted(EDGES)
+
+def test_pickle(backend):
+    restored = pickle.loads(pickle.dumps(backend))
+    assert list(restored.nodes()) == list(backend.nodes())
+    assert list(restored.edges()) == list(backend.edges())
+
+def test_compact_first_queries_concurrently(monkeypatch):
+    backend = CompactBackend()
+    backend.add_weighted_edges(EDGES)
+    # Slow down building the CSR structures, so the threads overlap.
+    builds = []
+    group_edges = backends._group_edges
+
+    def slow_group_edges(*args):
+        builds.append(args)
+        time.sleep(0.02)
+        return group_edges(*args)
+
+    monkeypatch.setattr(backends, "_group_edges", slow_group_edges)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker(k):
+        barrier.wait()
+        # Staggered, so some threads query while the others build.
+        time.sleep(0.005 * k)
+        results.append((list(backend.predecessors("Pickaxe")), list(backend.successors("Planks"))))
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [([("Sticks", 2.0), ("Iron", 3.0)], [("Sticks", 0.5)])] * 8
+    # Forward and reverse, once.
+    assert len(builds) == 2
+
+def test_make_backend():
+    assert isinstance(make_backend(None), NetworkXBackend)
+    assert isinstance(make_backend("compact"), CompactBackend)
+    backend = CompactBackend()
+    assert make_backend(backend) is backend
+    with pytest.raises(ValueError):
+        make_backend("igraph")
+
+
+def test_shortest_path_tree(backend):
+    backend.add_edge("Logs", "Pickaxe", 10.0)
+    dist, pred = backend.shortest_path_tree("Logs")
+    assert dist == {"Logs": 0, "Planks": 0.25, "Sticks": 0.75, "Pickaxe": 2.75}
+    assert pred == {"Planks": "Logs", "Sticks": "Planks", "Pickaxe": "Sticks"}
+    assert backend.shortest_path_tree("Dirt") == ({"Dirt": 0}, {})
@@ -0,0 +1,119 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import math
+import random
+
+import networkx as nx
+import pytest
+
+from crafterlib import load_data_for_game
+from crafterlib.graph import ItemGraph
+from crafterlib.graph import bom
+
+# Only the first seed runs by default, the others are marked slow.
+SEEDS = [0, *(pytest.param(seed, marks=pytest.mark.slow) for seed in range(1, 5))]
+
+def _random_dag(seed: int, num_nodes: int = 40, num_edges: int = 70) -> nx.DiGraph:
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f"Item {i}" for i in range(num_nodes))
+    while graph.number_of_edges() < num_edges:
+        u, v = sorted(rng.sample(range(num_nodes), 2))
+        graph.add_edge(f"Item {u}", f"Item {v}", weight=rng.choice([0.25, 1, 2, 3]))
+    return graph
+
+def _path_sum(graph: nx.DiGraph, source: str, target: str) -> float:
+    return sum(math.prod(graph.edges[u, v]["weight"] for u, v in zip(path, path[1:]))
+               for path in nx.all_simple_paths(graph, source, target))
+
+def test_breakdown_pizza():
+    item_graph = load_data_for_game("test_game", "test_data").item_graph
+
+    assert item_graph.get_basic_breakdown("Pepperoni Pizza") == pytest.approx({
+        "Flour": 4, "Water": 4, "Meat": 0.5, "Salt": 1.5,
+        "Milk": 6, "Vinegar": 2, "Tomato": 4, "Basil": 1,
+    })
+    # A basic item is made of itself.
+    assert item_graph.get_basic_breakdown("Flour") == {"Flour": 1}
+    assert item_graph.get_basic_breakdown("Not An Item") == {}
+
+def test_breakdown_adds_up_branches():
+    item_graph = load_data_for_game("test_game3", "test_data").item_graph
+
+    # Water goes into a Large Sand Castle directly (2), through the
+    # Sand Castle (1) and through the Sand Pile of the Sand Castle (3).
+    assert item_graph.get_basic_breakdown("Large Sand Castle") == pytest.approx(
+        {"Water": 6, "Sand": 3, "Bucket": 2, "Shovel": 1})
+    assert item_graph.get_total_amount("Water", "Large Sand Castle") == pytest.approx(6)
+    assert item_graph.get_total_amount("Sand Pile", "Large Sand Castle") == pytest.approx(1)
+    assert item_graph.get_total_amount("Shovel", "Bucket") is None
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_total_amount_matches_all_paths(seed):
+    graph = _random_dag(seed)
+    item_graph = ItemGraph(graph)
+
+    for source in graph.nodes:
+        for target in graph.nodes:
+            expected = _path_sum(graph, source, target) if source != target else 1.0
+            amount = item_graph.get_total_amount(source, target)
+            if expected == 0:
+                assert amount is None
+            else:
+                assert amount == pytest.approx(expected)
+
+    for item in graph.nodes:
+        expected = {source: _path_sum(graph, source, item) for source in graph.nodes
+                    if graph.in_degree(source) == 0 and nx.has_path(graph, source, item)}
+        if graph.in_degree(item) == 0:
+            expected = {item: 1.0}
+        assert item_graph.get_basic_breakdown(item) == pytest.approx(expected)
+
+def test_cycles():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([
+        ("Gold Nugget", "Gold Ingot", 9), ("Gold Ingot", "Gold Nugget", 1 / 9),
+        ("Gold Ingot", "Gold Pickaxe", 3), ("Stick", "Gold Pickaxe", 2),
+        ("Iron Ore", "Iron Ingot", 1), ("Iron Ingot", "Iron Nugget", 1 / 9),
+        ("Iron Nugget", "Iron Ingot", 9),
+    ])
+    item_graph = ItemGraph(graph)
+    bill = item_graph.get_bill_of_materials()
+
+    # Nothing outside the cycle makes gold, so both items are basic.
+    assert bill.is_basic("Gold Nugget") and bill.is_basic("Gold Ingot")
+    assert item_graph.get_basic_breakdown("Gold Pickaxe") == {"Gold Ingot": 3, "Stick": 2}
+    assert item_graph.get_total_amount("Gold Nugget", "Gold Pickaxe") == pytest.approx(27)
+    assert item_graph.get_total_amount("Gold Nugget", "Gold Ingot") == pytest.approx(9)
+
+    # Iron comes from outside the cycle, one step around it is followed.
+    assert not bill.is_basic("Iron Ingot")
+    assert item_graph.get_basic_breakdown("Iron Nugget") == pytest.approx({"Iron Ore": 1 / 9})
+    assert item_graph.get_total_amount("Iron Ore", "Iron Nugget") == pytest.approx(1 / 9)
+
+def test_numpy_and_python_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    # A copy, so the cached game data is left alone.
+    item_graph = ItemGraph(load_data_for_game("minecraft").item_graph.graph.copy())
+    with_numpy = item_graph.get_bill_of_materials()
+
+    monkeypatch.setattr(bom, "np", None)
+    item_graph.clear_caches()
+    without_numpy = item_graph.get_bill_of_materials()
+
+    assert with_numpy.matrix.shape == without_numpy.matrix.shape
+    assert list(with_numpy.matrix.indptr) == list(without_numpy.matrix.indptr)
+    assert list(with_numpy.matrix.indices) == list(without_numpy.matrix.indices)
+    assert list(with_numpy.matrix.data) == pytest.approx(list(without_numpy.matrix.data))
+
+def test_cache_follows_changes():
+    item_graph = ItemGraph(backend="compact")
+    item_graph.add_items(["Log", "Planks"])
+    item_graph.backend.add_edge("Log", "Planks", 0.25)
+    assert item_graph.get_basic_breakdown("Planks") == {"Log": 0.25}
+
+    item_graph.add_items(["Stick"])
+    item_graph.backend.add_edge("Planks", "Stick", 0.5)
+    assert item_graph.get_basic_breakdown("Stick") == {"Log": 0.125}
@@ -0,0 +1,58 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+from crafterlib._internal.cache import LRUCache
+
+def test_lru_eviction_order():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Using "a" makes "b" the least recently used entry.
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+def test_lru_size_limit():
+    cache = LRUCache(max_size=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("c", "xxxx")
+
+    assert len(cache) == 2
+    assert cache.stats().size == 8
+
+    # A value larger than the whole cache is never stored.
+    cache.put("d", "x" * 11)
+    assert "d" not in cache
+
+def test_lru_stats_and_invalidation():
+    cache = LRUCache()
+    cache.put(("x", 1), "one")
+    cache.put(("x", 2), "two")
+    cache.put(("y", 1), "three")
+
+    assert cache.get(("x", 1)) == "one"
+    assert cache.get(("z", 1)) is None
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+    # Peeking doesn't count.
+    assert cache.peek(("y", 1)) == "three"
+    assert cache.peek(("z", 1)) is None
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+    assert cache.invalidate_where(lambda key: key[0] == "x") == 2
+    assert cache.invalidate(("y", 1))
+    assert not cache.invalidate(("y", 1))
+    assert len(cache) == 0
+
+    cache.put("a", 1)
+    cache.clear()
+    assert len(cache) == 0
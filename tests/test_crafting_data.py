@@ -0,0 +1,101 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import threading
+
+from crafterlib import GameCraftingData, Item, Recipe
+
+def _make_game_data(**kwargs) -> GameCraftingData:
+    items = [Item(1, "Planks", []), Item(2, "Sticks", [])]
+    recipes = [Recipe(1, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4})]
+    return GameCraftingData("test", items, recipes, **kwargs)
+
+def test_derived_data_is_lazy():
+    game_data = _make_game_data()
+
+    # Lookups that don't need the graph don't build it.
+    assert game_data.get_item_by_name("Sticks").id == 2
+    assert "item_graph" not in game_data._derived
+
+    assert game_data.item_graph.get_recipe_for("Sticks") == {"Planks": 0.5}
+    assert game_data.item_graph is game_data.item_graph
+
+def test_derived_data_eager():
+    game_data = _make_game_data(lazy=False)
+    assert set(game_data._derived) == set(GameCraftingData._DERIVED_BUILDERS)
+
+def test_derived_data_eager_builds_compact_graph():
+    game_data = _make_game_data(lazy=False, graph_backend="compact")
+    assert game_data.item_graph.backend._forward is not None
+
+def test_derived_data_built_once_concurrently():
+    game_data = _make_game_data()
+    barrier = threading.Barrier(8)
+    graphs = []
+
+    def worker():
+        barrier.wait()
+        graphs.append(game_data.item_graph)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(graph is graphs[0] for graph in graphs)
+
+def test_compact_records_share_strings_and_maps():
+    recipes = [
+        Recipe.from_dict({"id": recipe_id,
+                          "category": "Crafting",
+                          "ingredients": {"Planks": 2},
+                          "products": {"Sticks": 4}})
+        for recipe_id in (1, 2)
+    ]
+    recipe_dicts = [recipe.to_dict() for recipe in recipes]
+    game_data = GameCraftingData("test", [Item(1, "Planks", [])], recipes, compact=True)
+
+    first, second = game_data.recipes
+    assert first.ingredients is second.ingredients
+    assert first.requirements is second.requirements
+    assert next(iter(first.products)) is game_data.string_table["Sticks"]
+
+    # Compacting doesn't change the content of the records.
+    assert [recipe.to_dict() for recipe in game_data.recipes] == recipe_dicts
+    assert Recipe.from_dict(first.to_dict()).ingredients == {"Planks": 2}
+
+    # Changing a copy doesn't change the records that share the map.
+    first.to_dict()["ingredients"]["Planks"] = 99
+    assert second.ingredients == {"Planks": 2}
+
+def test_records_not_compacted_by_default():
+    recipes = [
+        Recipe.from_dict({"id": recipe_id, "ingredients": {"Planks": 2}, "products": {"Sticks": 4}})
+        for recipe_id in (1, 2)
+    ]
+    ingredients = [recipe.ingredients for recipe in recipes]
+    game_data = GameCraftingData("test", [Item(1, "Planks", [])], recipes)
+
+    assert [recipe.ingredients for recipe in game_data.recipes] == ingredients
+    assert all(recipe.ingredients is original
+               for recipe, original in zip(game_data.recipes, ingredients))
+    assert not game_data.string_table
+
+def test_compact_records_keep_value_types():
+    recipes = [
+        Recipe.from_dict({"id": 1, "ingredients": {"Logs": 1}, "products": {"Planks": 4}}),
+        Recipe.from_dict({"id": 2, "ingredients": {"Logs": 1.0}, "products": {"Planks": 4}}),
+    ]
+    game_data = GameCraftingData("test", [Item(1, "Logs", [])], recipes, compact=True)
+
+    first, second = game_data.recipes
+    assert first.ingredients is not second.ingredients
+    assert type(first.ingredients["Logs"]) is int
+    assert type(second.ingredients["Logs"]) is float
+
+def test_records_have_no_instance_dict():
+    game_data = _make_game_data()
+    assert not hasattr(game_data.items[0], "__dict__")
+    assert not hasattr(game_data.recipes[0], "__dict__")
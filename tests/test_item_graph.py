@@ -2,7 +2,14 @@
 
 SPDX-License-Identifier: MIT
 """
-from crafterlib import load_data_for_game
+import logging
+import pickle
+
+import networkx as nx
+import pytest
+
+from crafterlib import Recipe, load_data_for_game
+from crafterlib.graph import AddRecipesSummary, CompactBackend, ItemGraph
 
 # Test min and max values
 def test_min_max_test_game():
@@ -27,3 +34,157 @@ def test_min_max_multiple_ingredient():
     game_data = load_data_for_game("test_multiple_ingredients", "test_data")
     assert game_data.item_graph.min_ingredient_amount() == 0.5
     assert game_data.item_graph.max_ingredient_amount() == 15
+
+# Both backends give the same answers
+@pytest.mark.parametrize("game", ["test_game", "test_game2", "test_game3",
+                                  pytest.param("minecraft", marks=pytest.mark.slow)])
+def test_backends_agree(game):
+    root_dir = None if game == "minecraft" else "test_data"
+    item_graph = load_data_for_game(game, root_dir).item_graph
+    compact_graph = load_data_for_game(game, root_dir, graph_backend="compact").item_graph
+    assert isinstance(compact_graph.backend, CompactBackend)
+
+    assert list(compact_graph.items()) == list(item_graph.items())
+    assert sorted(compact_graph.edges()) == sorted(item_graph.edges())
+    for item in item_graph.items():
+        assert compact_graph.get_recipe_for(item) == item_graph.get_recipe_for(item)
+        assert compact_graph.get_products_using(item) == item_graph.get_products_using(item)
+        for target in item_graph.items():
+            assert compact_graph.shortest_path(item, target) == item_graph.shortest_path(item, target)
+
+# Shortest paths match networkx
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_shortest_path_matches_networkx(backend):
+    item_graph = load_data_for_game("minecraft", graph_backend=backend).item_graph
+    graph = item_graph.graph
+    for source in list(graph)[:50]:
+        for target, path in nx.single_source_dijkstra_path(graph, source, weight="weight").items():
+            assert item_graph.shortest_path(source, target) == path
+    assert item_graph.shortest_path("Not An Item", "Stick") is None
+
+# Reverse reachable subgraph
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_reverse_reachable_subgraph(backend):
+    item_graph = load_data_for_game("test_game", "test_data", graph_backend=backend).item_graph
+    subgraph = item_graph.get_reverse_reachable_subgraph("Dough")
+    assert sorted(subgraph.items()) == ["Dough", "Flour", "Water"]
+    assert subgraph.get_recipe_for("Dough") == item_graph.get_recipe_for("Dough")
+    # A copy by default, which can be changed on its own.
+    subgraph.add_items(["Stone"])
+    assert not item_graph.has_item("Stone")
+    with pytest.raises(nx.NetworkXError):
+        item_graph.get_reverse_reachable_subgraph("Not An Item")
+
+# Wrapping an existing networkx graph
+def test_wrap_networkx_graph():
+    graph = nx.DiGraph()
+    graph.add_edge("Planks", "Sticks", weight=0.5)
+    item_graph = ItemGraph(graph)
+    assert item_graph.graph is graph
+    assert item_graph.get_amount("Planks", "Sticks") == 0.5
+    with pytest.raises(ValueError):
+        ItemGraph(graph, backend="compact")
+
+# Adding recipes reports skipped alternatives instead of printing them
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_add_recipes_summary(backend, capsys, caplog):
+    brick = Recipe(1, "Crafting", ingredients={"Brick": 2}, products={"Pillar": 1})
+    stone = Recipe(2, "Crafting", ingredients={"Stone": 3}, products={"Pillar": 1})
+    slab = Recipe(3, "Crafting", ingredients={"Stone": 3}, products={"Slab": 6})
+
+    item_graph = ItemGraph(backend=backend)
+    with caplog.at_level(logging.DEBUG, logger="crafterlib.graph.item_graph"):
+        summary = item_graph.add_recipes([brick, stone])
+    assert summary == AddRecipesSummary(added=1, edges=1, skipped=[(stone, "Pillar")])
+    assert item_graph.get_recipe_for("Pillar") == {"Brick": 2}
+    assert capsys.readouterr().out == ""
+    assert any("Pillar" in record.getMessage() for record in caplog.records)
+
+    # Outputs covered by an earlier call are skipped too.
+    summary = item_graph.add_recipes([stone, slab])
+    assert summary == AddRecipesSummary(added=1, edges=1, skipped=[(stone, "Pillar")])
+    assert item_graph.get_recipe_for("Slab") == {"Stone": 0.5}
+
+# Strongly connected components, topological order and crafting depth
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_condensation_accessors(backend):
+    item_graph = load_data_for_game("minecraft", graph_backend=backend).item_graph
+
+    components = item_graph.get_strongly_connected_components()
+    assert ["Gold Ingot", "Gold Nugget"] in components
+    assert sum(len(component) for component in components) == item_graph.num_items()
+
+    order = item_graph.get_topological_order()
+    assert sorted(order) == sorted(item_graph.items())
+    position = {item: i for i, item in enumerate(order)}
+    for ingredient, product, _ in item_graph.edges():
+        if {ingredient, product} != {"Gold Ingot", "Gold Nugget"}:
+            assert position[ingredient] < position[product]
+
+    assert item_graph.get_crafting_depth("Logs") == 0
+    assert item_graph.get_crafting_depth("Planks") == 1
+    assert item_graph.get_crafting_depth("Iron Pickaxe") == 3
+    assert item_graph.get_crafting_depth("Not An Item") is None
+    assert item_graph.has_cycles()
+    assert item_graph.get_items_on_cycles() == ["Gold Ingot", "Gold Nugget"]
+
+def test_condensation_cache_invalidated():
+    item_graph = ItemGraph()
+    item_graph.add_recipes([Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4})])
+    assert not item_graph.has_cycles()
+    assert item_graph.get_topological_order() == ["Logs", "Planks"]
+    assert item_graph.get_condensation() is item_graph.get_condensation()
+
+    item_graph.add_recipes([Recipe(2, "Crafting", ingredients={"Planks": 4}, products={"Logs": 1})])
+    assert item_graph.has_cycles()
+    assert item_graph.get_crafting_depth("Planks") == 0
+    assert item_graph.get_strongly_connected_components() == [["Logs", "Planks"]]
+
+def test_csr_built_once_per_version(monkeypatch):
+    item_graph = ItemGraph()
+    item_graph.add_recipes([Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4})])
+    calls = []
+    to_csr = item_graph.backend.to_csr
+    monkeypatch.setattr(item_graph.backend, "to_csr", lambda: calls.append(1) or to_csr())
+
+    item_graph.get_condensation()
+    item_graph.get_bill_of_materials()
+    item_graph.get_resource_classes()
+    assert len(calls) == 1
+
+    item_graph.add_recipes([Recipe(2, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4})])
+    assert item_graph.get_basic_breakdown("Sticks") == {"Logs": 0.125}
+    assert len(calls) == 2
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_shortest_path_tree(backend):
+    item_graph = ItemGraph(backend=backend)
+    item_graph.add_recipes([
+        Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4}),
+        Recipe(2, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4}),
+        Recipe(3, "Crafting", ingredients={"Sticks": 2, "Iron Ingot": 3}, products={"Iron Pickaxe": 1}),
+    ])
+
+    tree = item_graph.get_shortest_path_tree("Logs")
+    assert tree.path_to("Iron Pickaxe") == ["Logs", "Planks", "Sticks", "Iron Pickaxe"]
+    assert tree.distance("Iron Pickaxe") == pytest.approx(0.25 + 0.5 + 2)
+    assert tree.hops_to("Sticks") == [("Logs", "Planks", 1), ("Planks", "Sticks", 2)]
+    assert tree.path_to("Iron Ingot") is None
+    assert item_graph.get_recipe_id_for("Iron Pickaxe") == 3
+    assert item_graph.get_shortest_path_tree("Not An Item") is None
+
+    # The tree is cached until the graph changes.
+    assert item_graph.get_shortest_path_tree("Logs") is tree
+    item_graph.add_recipes([Recipe(4, "Crafting", ingredients={"Logs": 2}, products={"Torch": 4})])
+    assert item_graph.get_shortest_path_tree("Logs") is not tree
+    assert item_graph.shortest_path("Logs", "Torch") == ["Logs", "Torch"]
+
+def test_item_graph_pickles_without_caches():
+    item_graph = ItemGraph(backend="compact")
+    item_graph.add_recipes([Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4})])
+    item_graph.shortest_path("Logs", "Planks")
+
+    copy = pickle.loads(pickle.dumps(item_graph))
+    assert copy._cache == {}
+    assert copy.get_recipe_id_for("Planks") == 1
+    assert copy.shortest_path("Logs", "Planks") == ["Logs", "Planks"]
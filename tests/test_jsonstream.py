@@ -0,0 +1,33 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import io
+import json
+
+import pytest
+
+from crafterlib._internal.jsonstream import iter_json_array, iter_json_lines
+
+def test_iter_json_array_small_chunks():
+    values = [{"id": 1, "name": "Flour"}, 12345, "a string, with ] chars", [1, [2, 3]], None, 1.5e3]
+    text = " \n" + json.dumps(values, indent=2) + "\n"
+
+    # A tiny chunk size forces every value to span several chunks.
+    for chunk_size in (1, 2, 7, 1 << 16):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == values
+
+def test_iter_json_array_empty():
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "", "[1, 2", "[1 2]", "[1, 2] 3", "[1, {]"])
+def test_iter_json_array_invalid(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), chunk_size=2))
+
+def test_iter_json_lines():
+    text = '{"id": 1}\n\n  {"id": 2}  \n'
+    assert list(iter_json_lines(io.StringIO(text))) == [{"id": 1}, {"id": 2}]
+
+    with pytest.raises(ValueError):
+        list(iter_json_lines(io.StringIO('{"id": 1}\n{"id":\n')))
@@ -2,7 +2,20 @@
 
 SPDX-License-Identifier: MIT
 """
-from crafterlib import load_data_for_game
+import bz2
+import gzip
+import json
+import lzma
+import shutil
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from crafterlib import load_data_for_game, loader
+from crafterlib.loader import clear_cache, configure_cache, get_cache_stats, invalidate_cache
 
 def test_load_data():
     game_data = load_data_for_game("test_game", "test_data")
@@ -29,4 +42,305 @@ def test_load_data_cached():
     # We can test if two variables refer to the same object
     # with the `is` operator in Python.
     assert game_data is game_data_2
-    
\ No newline at end of file
+
+def test_load_data_cache_stats():
+    clear_cache()
+    stats = get_cache_stats()
+    load_data_for_game("test_game", "test_data")
+    load_data_for_game("test_game", "test_data")
+
+    # One miss for the cold load, one hit for the second load.
+    stats_after = get_cache_stats()
+    assert stats_after.misses == stats.misses + 1
+    assert stats_after.hits == stats.hits + 1
+
+def test_recipe_indexes():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    assert [recipe.id for recipe in game_data.get_recipes_for_item("Cheese")] == [3]
+    assert [recipe.id for recipe in game_data.get_recipes_using_item("Cheese")] == [5]
+    assert game_data.get_recipes_for_item("Flour") == []
+    assert game_data.get_recipes_using_item("Not An Item") == []
+    assert game_data.get_recipes_requiring_item("Oven") == []
+
+    # The returned lists are copies, modifying them must not
+    # affect later lookups.
+    game_data.get_recipes_for_item("Cheese").clear()
+    assert len(game_data.get_recipes_for_item("Cheese")) == 1
+
+def test_crafting_grid_index():
+    game_data = load_data_for_game("minecraft")
+
+    grids = game_data.get_crafting_grid_for_item("Furnace")
+    assert len(grids) == 1
+    assert grids[0].has_product("Furnace")
+    assert game_data.get_crafting_grid_for_item("Not An Item") == []
+
+def test_load_data_cache_keyed_by_root_dir(tmp_path):
+    # The same game id in a different root folder is a different dataset.
+    data_dir = tmp_path / "games" / "test_game"
+    shutil.copytree("test_data/games/test_game2", data_dir)
+
+    game_data = load_data_for_game("test_game", "test_data")
+    other_game_data = load_data_for_game("test_game", tmp_path)
+
+    assert other_game_data is not game_data
+    assert other_game_data.get_item_by_name("Computer") is not None
+    assert game_data.get_item_by_name("Computer") is None
+
+def test_load_data_cache_invalidate(tmp_path):
+    shutil.copytree("test_data/games/test_game", tmp_path / "games" / "test_game")
+
+    game_data = load_data_for_game("test_game", tmp_path)
+    assert invalidate_cache("test_game", tmp_path) == 1
+    assert invalidate_cache("test_game", tmp_path) == 0
+
+    game_data_2 = load_data_for_game("test_game", tmp_path)
+    assert game_data_2 is not game_data
+    assert load_data_for_game("test_game", tmp_path) is game_data_2
+
+def test_load_data_cache_hit_skips_root_json(tmp_path, monkeypatch):
+    data_dir = tmp_path / "games" / "test_game"
+    shutil.copytree("test_data/games/test_game", data_dir)
+    game_data = load_data_for_game("test_game", tmp_path)
+
+    parsed = []
+    read_root_json = loader._read_root_json
+    def counting_read_root_json(subdir, game):
+        parsed.append(game)
+        return read_root_json(subdir, game)
+
+    monkeypatch.setattr(loader, "_read_root_json", counting_read_root_json)
+    assert load_data_for_game("test_game", tmp_path) is game_data
+    assert parsed == []
+
+    # A changed root.json is parsed again.
+    root_json_path = data_dir / "root.json"
+    root_data = json.loads(root_json_path.read_text(encoding="utf-8"))
+    root_data["game"] = "Renamed Game"
+    root_json_path.write_text(json.dumps(root_data), encoding="utf-8")
+    reloaded = load_data_for_game("test_game", tmp_path)
+    assert parsed == ["test_game"]
+    assert reloaded is not game_data and reloaded.name == "Renamed Game"
+
+def test_load_data_cache_eviction(tmp_path):
+    shutil.copytree("test_data/games/test_game", tmp_path / "games" / "test_game")
+    shutil.copytree("test_data/games/test_game2", tmp_path / "games" / "test_game2")
+
+    clear_cache()
+    configure_cache(max_entries=1)
+    try:
+        game_data = load_data_for_game("test_game", tmp_path)
+        stats = get_cache_stats()
+        assert stats.entries == 1
+
+        load_data_for_game("test_game2", tmp_path)
+        stats_after = get_cache_stats()
+        assert stats_after.entries == 1
+        assert stats_after.evictions == stats.evictions + 1
+
+        # test_game was evicted, so it is loaded again.
+        assert load_data_for_game("test_game", tmp_path) is not game_data
+    finally:
+        configure_cache()
+
+def _load_concurrently(game: str, root_dir, num_threads: int = 8):
+    barrier = threading.Barrier(num_threads)
+    results = [None] * num_threads
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = load_data_for_game(game, root_dir)
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_load_data_concurrent_single_flight(tmp_path, monkeypatch):
+    shutil.copytree("test_data/games/test_game", tmp_path / "games" / "test_game")
+
+    build_calls = []
+    original_build = loader._build_crafting_data
+
+    def slow_build(*args, **kwargs):
+        build_calls.append(args)
+        time.sleep(0.1)
+        return original_build(*args, **kwargs)
+
+    monkeypatch.setattr(loader, "_build_crafting_data", slow_build)
+    results = _load_concurrently("test_game", tmp_path)
+
+    assert len(build_calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_load_data_concurrent_failure(tmp_path, monkeypatch):
+    shutil.copytree("test_data/games/test_game", tmp_path / "games" / "test_game")
+
+    def failing_build(*args, **kwargs):
+        time.sleep(0.1)
+        raise ValueError("broken data")
+
+    monkeypatch.setattr(loader, "_build_crafting_data", failing_build)
+    results = _load_concurrently("test_game", tmp_path)
+
+    # Every waiter sees the error, and nothing is cached.
+    assert all(isinstance(result, ValueError) for result in results)
+    monkeypatch.undo()
+    assert load_data_for_game("test_game", tmp_path).num_recipes() == 5
+
+def _write_split_game(root_dir, game: str):
+    """Write a game whose recipes are split across several files."""
+    data_dir = root_dir / "games" / game
+    data_dir.mkdir(parents=True)
+
+    items = [{"id": i, "name": f"Item {i}", "sources": []} for i in range(40)]
+    (data_dir / "items.json").write_text(json.dumps(items), encoding="utf-8")
+
+    recipe_files = []
+    for file_index in range(8):
+        recipes = [
+            {
+                "id": file_index * 10 + i,
+                "category": "Crafting",
+                "ingredients": {f"Item {file_index * 4 + i}": 2},
+                "products": {f"Item {file_index * 4 + i + 1}": 1},
+            }
+            for i in range(4)
+        ]
+        filename = f"recipes_{file_index}.json"
+        (data_dir / filename).write_text(json.dumps(recipes), encoding="utf-8")
+        recipe_files.append(filename)
+
+    root = {"game": game, "item_files": ["items.json"], "recipe_files": recipe_files}
+    (data_dir / "root.json").write_text(json.dumps(root), encoding="utf-8")
+
+@pytest.mark.parametrize("parallel", ["thread", "process"])
+def test_load_data_parallel(tmp_path, parallel):
+    _write_split_game(tmp_path, "split_game")
+
+    serial = load_data_for_game("split_game", tmp_path)
+    clear_cache()
+    parallel_data = load_data_for_game("split_game", tmp_path, parallel=parallel, max_workers=4)
+
+    assert parallel_data is not serial
+    assert [item.id for item in parallel_data.items] == [item.id for item in serial.items]
+    assert [recipe.id for recipe in parallel_data.recipes] == [recipe.id for recipe in serial.recipes]
+
+def test_load_data_parallel_duplicate_ids(tmp_path):
+    _write_split_game(tmp_path, "split_game")
+    data_dir = tmp_path / "games" / "split_game"
+    # Give the last recipe file the same recipe ids as the first one.
+    (data_dir / "recipes_7.json").write_text((data_dir / "recipes_0.json").read_text(encoding="utf-8"),
+                                            encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_data_for_game("split_game", tmp_path, parallel="thread")
+
+def test_load_data_parallel_invalid_mode(tmp_path):
+    _write_split_game(tmp_path, "split_game")
+
+    with pytest.raises(ValueError):
+        load_data_for_game("split_game", tmp_path, parallel="gpu")
+
+def test_load_data_streaming(tmp_path):
+    shutil.copytree("test_data/games/test_game", tmp_path / "games" / "test_game")
+
+    game_data = load_data_for_game("test_game", "test_data")
+    streamed = load_data_for_game("test_game", tmp_path, streaming=True)
+
+    assert streamed is not game_data
+    assert [recipe.to_dict() for recipe in streamed.recipes] == \
+        [recipe.to_dict() for recipe in game_data.recipes]
+    assert [item.to_dict() for item in streamed.items] == \
+        [item.to_dict() for item in game_data.items]
+
+def test_load_data_json_lines(tmp_path):
+    data_dir = tmp_path / "games" / "test_game"
+    shutil.copytree("test_data/games/test_game", data_dir)
+
+    # Convert the recipe file to JSON Lines.
+    recipes = json.loads((data_dir / "recipes.json").read_text(encoding="utf-8"))
+    lines = "\n".join(json.dumps(recipe) for recipe in recipes)
+    (data_dir / "recipes.jsonl").write_text(lines, encoding="utf-8")
+
+    root = json.loads((data_dir / "root.json").read_text(encoding="utf-8"))
+    root["recipe_files"] = ["recipes.jsonl"]
+    (data_dir / "root.json").write_text(json.dumps(root), encoding="utf-8")
+
+    game_data = load_data_for_game("test_game", tmp_path)
+    assert game_data.num_recipes() == 5
+    assert game_data.get_recipe_by_id(5).ingredients["Cheese"] == 4
+
+def _assert_same_data(game_data, other_game_data):
+    assert other_game_data.name == game_data.name
+    assert [item.to_dict() for item in other_game_data.items] == \
+        [item.to_dict() for item in game_data.items]
+    assert [recipe.to_dict() for recipe in other_game_data.recipes] == \
+        [recipe.to_dict() for recipe in game_data.recipes]
+    assert [grid.to_dict() for grid in other_game_data.crafting_grids] == \
+        [grid.to_dict() for grid in game_data.crafting_grids]
+    assert set(other_game_data.item_graph.graph.edges(data="weight")) == \
+        set(game_data.item_graph.graph.edges(data="weight"))
+
+def test_load_data_compressed(tmp_path):
+    data_dir = tmp_path / "games" / "test_game"
+    shutil.copytree("test_data/games/test_game", data_dir)
+
+    # Compress every data file with a different codec.
+    codecs = {
+        "items.json": (gzip, ".gz"),
+        "recipes.json": (lzma, ".xz"),
+        "crafting_grids.json": (bz2, ".bz2"),
+    }
+    for filename, (codec, suffix) in codecs.items():
+        content = (data_dir / filename).read_bytes()
+        (data_dir / (filename + suffix)).write_bytes(codec.compress(content))
+        (data_dir / filename).unlink()
+
+    root = json.loads((data_dir / "root.json").read_text(encoding="utf-8"))
+    root["item_files"] = ["items.json.gz"]
+    root["recipe_files"] = ["recipes.json.xz"]
+    root["crafting_grid_files"] = ["crafting_grids.json.bz2"]
+    (data_dir / "root.json").write_text(json.dumps(root), encoding="utf-8")
+
+    _assert_same_data(load_data_for_game("test_game", "test_data"),
+                      load_data_for_game("test_game", tmp_path, streaming=True))
+
+def test_load_data_zip_archive(tmp_path):
+    archive_path = tmp_path / "pack.zip"
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for file_path in Path("test_data/games/test_game").iterdir():
+            archive.write(file_path, f"games/test_game/{file_path.name}")
+
+    game_data = load_data_for_game("test_game", "test_data")
+    zipped = load_data_for_game("test_game", archive_path)
+
+    assert zipped is not game_data
+    _assert_same_data(game_data, zipped)
+
+    # The archive is fingerprinted like a folder, so loading it
+    # again hits the cache.
+    assert load_data_for_game("test_game", archive_path) is zipped
+    assert invalidate_cache("test_game", archive_path) == 1
+
+    with pytest.raises(NotADirectoryError):
+        load_data_for_game("no_such_game", archive_path)
+
+def test_load_data_graph_backend(tmp_path):
+    game_data = load_data_for_game("test_game", "test_data")
+    compact_data = load_data_for_game("test_game", "test_data", graph_backend="compact")
+
+    # Each backend is cached on its own.
+    assert compact_data is not game_data
+    assert load_data_for_game("test_game", "test_data", graph_backend="compact") is compact_data
+    assert compact_data.graph_backend == "compact"
+    assert sorted(compact_data.item_graph.edges()) == sorted(game_data.item_graph.edges())
+
+    with pytest.raises(ValueError):
+        load_data_for_game("test_game", "test_data", graph_backend="igraph")
@@ -0,0 +1,111 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from crafterlib import Recipe
+from crafterlib.graph import ItemGraph
+from crafterlib.graph.condensation import Condensation
+
+# Only the first seed runs by default, the others are marked slow.
+SEEDS = [0, *(pytest.param(seed, marks=pytest.mark.slow) for seed in range(1, 5))]
+
+def _random_graph(seed: int, num_nodes: int = 60, num_edges: int = 90) -> nx.DiGraph:
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f"Item {i}" for i in range(num_nodes))
+    while graph.number_of_edges() < num_edges:
+        u, v = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        graph.add_edge(f"Item {u}", f"Item {v}", weight=rng.choice([0.25, 1, 2]))
+    return graph
+
+def _item_graph(graph: nx.DiGraph, backend: str) -> ItemGraph:
+    item_graph = ItemGraph(backend=backend)
+    item_graph.add_items(graph.nodes)
+    item_graph.backend.add_weighted_edges(graph.edges(data="weight"))
+    return item_graph
+
+@pytest.mark.parametrize("seed", range(5))
+def test_condensation_matches_networkx(seed):
+    graph = _random_graph(seed)
+    condensation = Condensation(*ItemGraph(graph).backend.to_csr())
+
+    components = {frozenset(condensation.members(comp))
+                  for comp in range(condensation.num_components)}
+    assert components == {frozenset(scc) for scc in nx.strongly_connected_components(graph)}
+
+    # Components are numbered in topological order.
+    for u, v in graph.edges:
+        assert condensation.component_of(u) <= condensation.component_of(v)
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_reachability_matches_networkx(seed, backend):
+    graph = _random_graph(seed)
+    item_graph = _item_graph(graph, backend)
+
+    for u in graph.nodes:
+        descendants = nx.descendants(graph, u)
+        ancestors = nx.ancestors(graph, u)
+        # An item on a cycle counts as its own descendant and ancestor.
+        on_cycle = any(nx.has_path(graph, v, u) for v in graph.successors(u))
+        if on_cycle:
+            descendants.add(u)
+            ancestors.add(u)
+
+        assert set(item_graph.get_descendants(u)) == descendants
+        assert set(item_graph.get_ancestors(u)) == ancestors
+        for v in graph.nodes:
+            assert item_graph.can_reach(u, v) == (u == v or v in descendants)
+
+def test_reachability_long_chain():
+    # Deep enough to overflow a recursive implementation.
+    num_items = 1500
+    item_graph = ItemGraph(backend="compact")
+    item_graph.add_recipes(
+        Recipe(i, "Crafting", ingredients={f"Item {i}": 1}, products={f"Item {i + 1}": 1})
+        for i in range(num_items)
+    )
+    assert item_graph.can_reach("Item 0", f"Item {num_items}")
+    assert not item_graph.can_reach(f"Item {num_items}", "Item 0")
+    assert item_graph.get_descendants("Item 0") == [f"Item {i}" for i in range(1, num_items + 1)]
+
+def test_reachability_cache_invalidated():
+    item_graph = ItemGraph()
+    item_graph.add_recipes([Recipe(1, "Crafting", ingredients={"Logs": 1}, products={"Planks": 4})])
+    index = item_graph.get_reachability_index()
+    assert item_graph.get_reachability_index() is index
+    assert not item_graph.can_reach("Logs", "Sticks")
+
+    item_graph.add_recipes([Recipe(2, "Crafting", ingredients={"Planks": 2}, products={"Sticks": 4})])
+    assert item_graph.get_reachability_index() is not index
+    assert item_graph.can_reach("Logs", "Sticks")
+
+    # Direct changes to the networkx graph need an explicit clear_caches().
+    item_graph.graph.add_edge("Sticks", "Torch", weight=1)
+    item_graph.clear_caches()
+    assert item_graph.get_descendants("Logs") == ["Planks", "Sticks", "Torch"]
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_reverse_reachable_subgraph_view(backend):
+    item_graph = _item_graph(_random_graph(0), backend)
+    item = "Item 7"
+
+    view = item_graph.get_reverse_reachable_subgraph(item, copy=False)
+    copy = item_graph.get_reverse_reachable_subgraph(item)
+    expected = nx.ancestors(item_graph.graph, item) | {item}
+
+    for subgraph in (view, copy):
+        assert set(subgraph.items()) == expected
+        assert sorted(subgraph.edges()) == sorted(item_graph.graph.subgraph(expected).edges(data="weight"))
+        assert subgraph.get_recipe_for(item) == item_graph.get_recipe_for(item)
+
+    with pytest.raises(nx.NetworkXError):
+        view.add_items(["Stone"])
+    copy.add_items(["Stone"])
+    assert copy.has_item("Stone")
+    assert not item_graph.has_item("Stone")
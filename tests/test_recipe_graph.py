@@ -0,0 +1,69 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import pickle
+
+from crafterlib import GameCraftingData, Item, Recipe, load_data_for_game
+from crafterlib.graph import RecipeGraph
+
+def _make_recipes():
+    return [
+        Recipe(1, "Crafting", ingredients={"Brick": 2}, products={"Pillar": 1}),
+        Recipe(2, "Crafting", ingredients={"Stone": 3}, products={"Pillar": 1}),
+        Recipe(3, "Crafting", ingredients={"Stone": 3}, products={"Slab": 6, "Gravel": 1}),
+    ]
+
+def test_alternative_recipes():
+    recipes = _make_recipes()
+    recipe_graph = RecipeGraph.from_recipes(recipes)
+
+    assert recipe_graph.num_items() == 5
+    assert recipe_graph.num_recipes() == 3
+    assert recipe_graph.num_edges() == 7
+
+    # Both recipes for Pillar are kept.
+    assert recipe_graph.get_recipes_for("Pillar") == recipes[:2]
+    assert recipe_graph.get_recipes_using("Stone") == recipes[1:]
+    assert list(recipe_graph.producers("Slab")) == [(2, 6)]
+    assert list(recipe_graph.consumers("Stone")) == [(1, 3), (2, 3)]
+    assert dict(recipe_graph.ingredients(2)) == {"Stone": 3}
+    assert dict(recipe_graph.products(2)) == {"Slab": 6, "Gravel": 1}
+
+    assert recipe_graph.get_recipes_for("Dirt") == []
+    assert not recipe_graph.has_item("Dirt")
+
+def test_game_crafting_data_recipe_graph():
+    items = [Item(1, "Stone", []), Item(2, "Dirt", [])]
+    game_data = GameCraftingData("test", items, _make_recipes())
+    recipe_graph = game_data.recipe_graph
+
+    # Shares the item numbering and matrices of the crafting data.
+    assert recipe_graph.item_names is game_data.item_names
+    assert recipe_graph.ingredient_matrix is game_data.ingredient_matrix
+    assert recipe_graph.has_item("Dirt")
+    assert [recipe.id for recipe in recipe_graph.get_recipes_for("Pillar")] == [1, 2]
+
+    # The item graph only keeps the first recipe.
+    assert game_data.item_graph.get_recipe_for("Pillar") == {"Brick": 2}
+
+    restored = pickle.loads(pickle.dumps(recipe_graph))
+    assert list(restored.consumers("Stone")) == list(recipe_graph.consumers("Stone"))
+
+def test_recipe_graph_matches_recipe_indexes():
+    game_data = load_data_for_game("minecraft")
+    recipe_graph = game_data.recipe_graph
+    for item_name in game_data.item_names:
+        assert recipe_graph.get_recipes_for(item_name) == game_data.get_recipes_for_item(item_name)
+        assert recipe_graph.get_recipes_using(item_name) == game_data.get_recipes_using_item(item_name)
+
+def test_to_networkx():
+    recipe_graph = RecipeGraph.from_recipes(_make_recipes())
+    graph = recipe_graph.to_networkx()
+
+    assert graph.number_of_nodes() == 8
+    assert graph.number_of_edges() == 7
+    assert graph.nodes["Pillar"]["bipartite"] == 0
+    assert graph.nodes[("recipe", 2)]["bipartite"] == 1
+    assert graph["Stone"][("recipe", 3)]["weight"] == 3
+    assert graph[("recipe", 3)]["Slab"]["weight"] == 6
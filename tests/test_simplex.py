@@ -0,0 +1,109 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import itertools
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from crafterlib._internal import simplex
+from crafterlib._internal.simplex import solve_covering_lp
+from crafterlib.sparse import CSRMatrix
+
+def _columns(A) -> CSRMatrix:
+    return CSRMatrix.from_rows(([(row, value) for row, value in enumerate(column) if value]
+                                for column in A.T), A.shape[0])
+
+def _random_problem(seed: int, num_rows: int = 4, num_vars: int = 4):
+    rng = random.Random(seed)
+    A = np.array([[rng.choice([-2, -1, 0, 0, 1, 2, 3]) for _ in range(num_vars)]
+                  for _ in range(num_rows)], dtype=float)
+    b = np.array([rng.choice([-2, 0, 1, 3]) for _ in range(num_rows)], dtype=float)
+    c = np.array([rng.choice([0, 1, 2, 5]) for _ in range(num_vars)], dtype=float)
+    return c, A, b
+
+def _guess(seed: int, A):
+    # For some rows, a column that makes them, so that the solver
+    # starts with a few columns and has to add the others.
+    rng = random.Random(seed)
+    return np.array([rng.choice([-1, *np.flatnonzero(row > 0)]) for row in A])
+
+def _best_vertex(c, A, b):
+    # Every vertex of {A x >= b, x >= 0} is where some `num_vars` of
+    # the constraints hold with equality.
+    num_rows, num_vars = A.shape
+    constraints = np.vstack([A, np.eye(num_vars)])
+    bounds = np.concatenate([b, np.zeros(num_vars)])
+    best = None
+    for active in itertools.combinations(range(len(constraints)), num_vars):
+        matrix = constraints[list(active)]
+        if abs(np.linalg.det(matrix)) < 1e-9:
+            continue
+        x = np.linalg.solve(matrix, bounds[list(active)])
+        if (constraints @ x >= bounds - 1e-7).all():
+            cost = c @ x
+            best = cost if best is None else min(best, cost)
+    return best
+
+@pytest.mark.parametrize("with_guess", [False, True])
+@pytest.mark.parametrize("seed", range(40))
+def test_simplex_matches_vertex_enumeration(seed, with_guess):
+    c, A, b = _random_problem(seed)
+    upper = np.full(len(c), math.inf)
+    guess = _guess(seed, A) if with_guess else None
+    x, solver, optimal = solve_covering_lp(c, _columns(A), b, upper, solver="simplex", guess=guess)
+    assert solver == "simplex" and optimal
+
+    expected = _best_vertex(c, A, b)
+    if x is None:
+        # With costs >= 0, a feasible problem always has a best vertex.
+        assert expected is None
+    else:
+        assert (A @ x >= b - 1e-7).all() and (x >= -1e-9).all()
+        assert c @ x == pytest.approx(expected)
+
+@pytest.mark.parametrize("with_guess", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_simplex_integer_matches_brute_force(seed, with_guess):
+    c, A, b = _random_problem(seed, num_rows=3, num_vars=3)
+    upper = np.full(len(c), 4.0)
+    guess = _guess(seed, A) if with_guess else None
+    x, _, optimal = solve_covering_lp(c, _columns(A), b, upper, integer=True, solver="simplex",
+                                      guess=guess)
+    assert optimal
+
+    feasible = [np.array(point, dtype=float) for point in itertools.product(range(5), repeat=3)
+                if (A @ np.array(point) >= b).all()]
+    if not feasible:
+        assert x is None
+    else:
+        assert (A @ x >= b - 1e-7).all() and (x == np.round(x)).all() and (x <= 4).all()
+        assert c @ x == pytest.approx(min(c @ point for point in feasible))
+
+def test_simplex_integer_cut_short(monkeypatch):
+    # x = 1.5 without whole numbers, so it takes more than one node.
+    c, A, b = np.ones(1), np.array([[2.0]]), np.array([3.0])
+    monkeypatch.setattr(simplex, "MAX_BRANCH_NODES", 2)
+    x, _, optimal = solve_covering_lp(c, _columns(A), b, np.full(1, math.inf), integer=True,
+                                      solver="simplex")
+    assert x.tolist() == [2] and not optimal
+
+def test_simplex_integer_rounds_up_without_search(monkeypatch):
+    # Two of every three gathered items are used up by a craft, so the
+    # extra half craft rounding up adds needs another gathered item.
+    c = np.array([0.001, 1.0])
+    A = np.array([[2.0, 0.0], [-3.0, 1.0]])
+    b = np.array([3.0, 0.0])
+    monkeypatch.setattr(simplex, "MAX_BRANCH_NODES", 0)
+    for guess in (None, np.array([0, 1])):
+        x, _, optimal = solve_covering_lp(c, _columns(A), b, np.full(2, math.inf), integer=True,
+                                          solver="simplex", guess=guess)
+        assert x.tolist() == [2, 6] and not optimal
+
+def test_unknown_solver():
+    with pytest.raises(ValueError):
+        solve_covering_lp(np.ones(1), _columns(np.ones((1, 1))), np.ones(1), np.ones(1), solver="magic")
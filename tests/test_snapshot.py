@@ -0,0 +1,128 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import json
+import shutil
+import struct
+from importlib.metadata import PackageNotFoundError
+from pathlib import Path
+
+import pytest
+
+from crafterlib import load_data_for_game, snapshot
+from crafterlib.loader import _read_root_json
+from crafterlib.snapshot import compute_fingerprint, snapshot_path_for, load_snapshot, save_snapshot
+
+def _copy_test_game(tmp_path: Path, game: str) -> Path:
+    data_dir = tmp_path / "games" / game
+    shutil.copytree("test_data/games/test_game", data_dir)
+    return data_dir
+
+def test_snapshot_written_and_reloaded(tmp_path):
+    data_dir = _copy_test_game(tmp_path, "snapshot_game")
+    snapshot_dir = tmp_path / "snapshots"
+
+    game_data = load_data_for_game("snapshot_game", tmp_path, snapshot_dir=snapshot_dir)
+
+    snapshot_path = snapshot_path_for(snapshot_dir, "snapshot_game", data_dir)
+    assert snapshot_path.is_file()
+
+    fingerprint = compute_fingerprint(data_dir, _read_root_json(data_dir, "snapshot_game"))
+    restored = load_snapshot(snapshot_path, fingerprint)
+
+    assert restored is not None
+    assert restored.num_items() == game_data.num_items()
+    assert restored.num_recipes() == game_data.num_recipes()
+    assert restored.num_crafting_grids() == game_data.num_crafting_grids()
+    assert restored.get_item_by_name("Milk").id == 7
+    assert set(restored.item_graph.graph.edges(data="weight")) == \
+        set(game_data.item_graph.graph.edges(data="weight"))
+
+def test_snapshot_compact_backend(tmp_path):
+    data_dir = _copy_test_game(tmp_path, "snapshot_game_compact")
+    snapshot_dir = tmp_path / "snapshots"
+
+    game_data = load_data_for_game("snapshot_game_compact", tmp_path,
+                                   snapshot_dir=snapshot_dir, graph_backend="compact")
+
+    snapshot_path = snapshot_path_for(snapshot_dir, "snapshot_game_compact", data_dir, "compact")
+    assert snapshot_path.is_file()
+    assert not snapshot_path_for(snapshot_dir, "snapshot_game_compact", data_dir).exists()
+
+    fingerprint = compute_fingerprint(data_dir, _read_root_json(data_dir, "snapshot_game_compact"))
+    restored = load_snapshot(snapshot_path, fingerprint)
+    assert restored.graph_backend == "compact"
+    assert list(restored.item_graph.edges()) == list(game_data.item_graph.edges())
+
+def test_snapshot_invalidated_on_change(tmp_path):
+    data_dir = _copy_test_game(tmp_path, "snapshot_game2")
+    game_data = load_data_for_game("snapshot_game2", tmp_path)
+
+    snapshot_path = tmp_path / "test.snapshot"
+    fingerprint = compute_fingerprint(data_dir, _read_root_json(data_dir, "snapshot_game2"))
+    save_snapshot(snapshot_path, game_data, fingerprint)
+    assert load_snapshot(snapshot_path, fingerprint) is not None
+
+    # Adding a recipe changes the recipe file, so the fingerprint
+    # changes and the old snapshot must be rejected.
+    recipes_path = data_dir / "recipes.json"
+    recipes = json.loads(recipes_path.read_text(encoding="utf-8"))
+    recipes.append({"id": 6, "category": "Crafting", "ingredients": {"Dough": 1}, "products": {"Bread": 1}})
+    recipes_path.write_text(json.dumps(recipes), encoding="utf-8")
+
+    new_fingerprint = compute_fingerprint(data_dir, _read_root_json(data_dir, "snapshot_game2"))
+    assert new_fingerprint != fingerprint
+    assert load_snapshot(snapshot_path, new_fingerprint) is None
+
+def test_snapshot_missing_or_corrupt(tmp_path):
+    assert load_snapshot(tmp_path / "missing.snapshot", "abc") is None
+
+    corrupt_path = tmp_path / "corrupt.snapshot"
+    corrupt_path.write_bytes(b"not a snapshot")
+    assert load_snapshot(corrupt_path, "abc") is None
+
+@pytest.mark.parametrize("payload", [
+    # A class that was renamed, and one from a module that was removed.
+    b"ccrafterlib.crafting_data\nRenamedCraftingData\n.",
+    b"cremoved_crafterlib_module\nGameCraftingData\n.",
+])
+def test_snapshot_of_moved_classes(tmp_path, payload):
+    header = json.dumps({
+        "format": snapshot.SNAPSHOT_FORMAT_VERSION,
+        "crafterlib": snapshot._crafterlib_version(),
+        "fingerprint": "abc",
+    }).encode("utf-8")
+    path = tmp_path / "stale.snapshot"
+    path.write_bytes(b"CRFTSNAP" + struct.pack("<I", len(header)) + header + payload)
+    assert load_snapshot(path, "abc") is None
+
+def test_snapshot_without_installed_crafterlib(tmp_path, monkeypatch):
+    def not_installed(name):
+        raise PackageNotFoundError(name)
+
+    monkeypatch.setattr(snapshot, "_v", not_installed)
+    _copy_test_game(tmp_path, "uninstalled_game")
+    crafting_data = load_data_for_game("uninstalled_game", tmp_path)
+    path = tmp_path / "uninstalled.snapshot"
+    save_snapshot(path, crafting_data, "abc")
+    assert load_snapshot(path, "abc") is not None
+
+def test_snapshot_without_installed_crafterlib_stale_after_source_change(tmp_path, monkeypatch):
+    def not_installed(name):
+        raise PackageNotFoundError(name)
+
+    package_dir = tmp_path / "crafterlib"
+    package_dir.mkdir()
+    (package_dir / "recipe.py").write_text("VERSION = 1\n")
+    monkeypatch.setattr(snapshot, "_v", not_installed)
+    monkeypatch.setattr(snapshot, "_PACKAGE_DIR", package_dir)
+    _copy_test_game(tmp_path, "uninstalled_game")
+    crafting_data = load_data_for_game("uninstalled_game", tmp_path)
+    path = tmp_path / "uninstalled.snapshot"
+    save_snapshot(path, crafting_data, "abc")
+    assert load_snapshot(path, "abc") is not None
+
+    # Still not installed, but the sources changed.
+    (package_dir / "recipe.py").write_text("VERSION = 2\n")
+    assert load_snapshot(path, "abc") is None
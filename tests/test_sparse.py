@@ -0,0 +1,50 @@
+"""This file is part of crafterlib.
+
+SPDX-License-Identifier: MIT
+"""
+import pytest
+
+from crafterlib import load_data_for_game
+from crafterlib.sparse import CSRMatrix
+
+def test_csr_from_rows_and_transpose():
+    matrix = CSRMatrix.from_rows([[(0, 1.0), (2, 2.0)], [], [(1, 3.0)]], num_cols=3)
+
+    assert matrix.shape == (3, 3)
+    assert matrix.nnz == 3
+    assert list(matrix.row(0)) == [(0, 1.0), (2, 2.0)]
+    assert list(matrix.row(1)) == []
+    assert matrix.to_dense() == [[1.0, 0.0, 2.0], [0.0, 0.0, 0.0], [0.0, 3.0, 0.0]]
+
+    transposed = matrix.transpose()
+    assert transposed.shape == (3, 3)
+    assert transposed.to_dense() == [[1.0, 0.0, 0.0], [0.0, 0.0, 3.0], [2.0, 0.0, 0.0]]
+
+def test_recipe_matrices():
+    game_data = load_data_for_game("test_game", "test_data")
+
+    # Items come first, in their original order.
+    assert game_data.item_names[:len(game_data.items)] == [item.name for item in game_data.items]
+    assert game_data.get_item_index("Flour") == game_data.item_names.index("Flour")
+    assert game_data.get_item_index("Not An Item") is None
+
+    ingredients = game_data.ingredient_matrix
+    products = game_data.product_matrix
+    assert ingredients.shape == (game_data.num_recipes(), len(game_data.item_names))
+    assert products.shape == ingredients.shape
+
+    for r, recipe in enumerate(game_data.recipes):
+        assert {game_data.item_names[i]: amount for i, amount in ingredients.row(r)} == recipe.ingredients
+        assert {game_data.item_names[i]: amount for i, amount in products.row(r)} == recipe.products
+
+def test_recipe_matrices_numpy():
+    np = pytest.importorskip("numpy")
+    game_data = load_data_for_game("test_game", "test_data")
+
+    indptr, indices, data = game_data.ingredient_matrix.to_numpy()
+    assert indptr.dtype == np.int64 and indices.dtype == np.int32 and data.dtype == np.float64
+    assert len(indptr) == game_data.num_recipes() + 1
+    # Dough needs 2 Flour and 2 Water.
+    dough_row = indices[indptr[0]:indptr[1]]
+    assert sorted(game_data.item_names[i] for i in dough_row) == ["Flour", "Water"]
+    assert data[indptr[0]:indptr[1]].sum() == 4